@@ -0,0 +1,170 @@
+"""
+benchmarks of Miner reports on a synthetic corpus
+
+    python -m benchmarks.bench --sentences 10000 --scheme BIOES --save base.json
+    python -m benchmarks.bench --sentences 10000 --scheme BIOES --compare base.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from miner import Miner
+from miner import scheme
+
+from .corpus import SCHEMES, make_corpus
+
+BENCHMARKS: Dict[str, Callable[[Miner], object]] = {
+    "default_report": lambda m: m.default_report(),
+    "unknown_only_report": lambda m: m.unknown_only_report(),
+    "segmentation_score": lambda m: m.segmentation_score(print_=False),
+    "return_predict_named_entities": lambda m: m.return_predict_named_entities(),
+}
+if scheme.np is not None:
+    # label scheme checks require numpy (predicts are checked as IOB2)
+    BENCHMARKS["validate_scheme"] = lambda m: scheme.validate(m.predicts)
+    BENCHMARKS["repair_scheme"] = lambda m: scheme.repair(m.predicts)
+
+
+def measure(fn: Callable[[Miner], object], corpus, repeat: int = 3) -> Dict[str, float]:
+    """
+    measure a benchmark on a fresh Miner
+    (decoding is included, since Miner keeps decoded named entities)
+    :param fn: benchmark
+    :param corpus: answers, predicts, sentences, known_words
+    :param repeat: number of timed runs (the best one is reported)
+    :return: {'seconds': best time, 'tokens_per_sec': throughput,
+              'peak_bytes': peak memory allocated by python during a run}
+    """
+
+    answers, predicts, sentences, known_words = corpus
+    n_tokens = sum(len(sentence) for sentence in sentences)
+
+    def run():
+        fn(Miner(answers, predicts, sentences, dict(known_words)))
+
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    # traced separately since tracing slows allocation down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "tokens_per_sec": n_tokens / seconds if seconds > 0 else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(
+    config: Dict[str, object], names: List[str] = None, repeat: int = 3
+) -> Dict[str, object]:
+    """
+    run benchmarks on a corpus generated from config
+    :param config: keyword arguments of make_corpus
+    :param names: benchmarks to run (all if None)
+    :param repeat: number of timed runs of each benchmark
+    :return: {'config': config, 'results': {'name': result, ... }}
+    """
+
+    corpus = make_corpus(**config)
+    names = list(BENCHMARKS) if names is None else names
+    results = {name: measure(BENCHMARKS[name], corpus, repeat) for name in names}
+    return {"config": config, "results": results}
+
+
+def compare(
+    current: Dict[str, object], baseline: Dict[str, object], tolerance: float = 0.2
+) -> List[str]:
+    """
+    compare results with a baseline
+    :param current: results of run_benchmarks
+    :param baseline: saved results of run_benchmarks
+    :param tolerance: allowed rate of slowdown or memory growth
+    :return: descriptions of regressions
+    """
+
+    regressions = []
+    if current["config"] != baseline["config"]:
+        regressions.append("config differs from the baseline")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for key in ("seconds", "peak_bytes"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    "{}: {} {:.4g} -> {:.4g}".format(name, key, base[key], result[key])
+                )
+    return regressions
+
+
+def print_results(current: Dict[str, object], baseline: Dict[str, object] = None):
+    print("\n{:32s}{:>12s}{:>16s}{:>14s}".format("", "sec", "tokens/sec", "peak MiB"))
+    for name, result in current["results"].items():
+        print(
+            "{:32s}{:12.4f}{:16.0f}{:14.2f}".format(
+                name,
+                result["seconds"],
+                result["tokens_per_sec"],
+                result["peak_bytes"] / 2**20,
+            ),
+            end="",
+        )
+        base = (baseline or {}).get("results", {}).get(name)
+        if base is not None:
+            print("  ({:+.1%} time)".format(result["seconds"] / base["seconds"] - 1))
+        else:
+            print()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=10000)
+    parser.add_argument("--scheme", choices=SCHEMES, default="IOB2")
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--types", type=int, default=4)
+    parser.add_argument("--dict-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--save", help="save results as a baseline (json)")
+    parser.add_argument("--compare", help="compare results with a baseline (json)")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    config = {
+        "n_sentences": args.sentences,
+        "scheme": args.scheme,
+        "density": args.density,
+        "n_types": args.types,
+        "dict_size": args.dict_size,
+        "seed": args.seed,
+    }
+    current = run_benchmarks(config, args.only, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(current, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if baseline is not None:
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print("regression: " + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import random
+from typing import Dict, List, Tuple
+
+SCHEMES = ("IOB2", "BIOES", "BIOUL")
+# prefixes of (single morph, first morph, inside morph, last morph)
+_PREFIXES = {
+    "IOB2": ("B", "B", "I", "I"),
+    "BIOES": ("S", "B", "I", "E"),
+    "BIOUL": ("U", "B", "I", "L"),
+}
+
+Span = Tuple[int, int, str]
+
+
+def encode(spans: List[Span], length: int, scheme: str = "IOB2") -> List[str]:
+    """
+    encode named entities of a sentence into labels
+    :param spans: [(begin index, end index, type), ... ] (not overlapping)
+    :param length: number of morphs of the sentence
+    :param scheme: IOB2, BIOES, or BIOUL
+    :return: labels
+    """
+
+    single, first, inside, last = _PREFIXES[scheme]
+    labels = ["O"] * length
+    for begin, end, type_ in spans:
+        if begin == end:
+            labels[begin] = single + "-" + type_
+            continue
+        labels[begin] = first + "-" + type_
+        for i in range(begin + 1, end):
+            labels[i] = inside + "-" + type_
+        labels[end] = last + "-" + type_
+    return labels
+
+
+def _perturb(
+    rng: random.Random, spans: List[Span], length: int, types: List[str]
+) -> List[Span]:
+    """
+    make predicted named entities by dropping, retyping or moving a boundary
+    of answer named entities
+    """
+
+    predicted = []
+    for begin, end, type_ in spans:
+        error = rng.randrange(3)
+        if error == 0:
+            continue
+        elif error == 1:
+            type_ = rng.choice(types)
+        elif end + 1 < length:
+            # spans are separated by a morph, so the span stays disjoint
+            end += 1
+        predicted.append((begin, end, type_))
+    return predicted
+
+
+def make_corpus(
+    n_sentences: int = 1000,
+    sentence_length: Tuple[int, int] = (5, 40),
+    scheme: str = "IOB2",
+    density: float = 0.2,
+    n_types: int = 4,
+    dict_size: int = 1000,
+    vocab_size: int = 5000,
+    error_rate: float = 0.1,
+    seed: int = 0,
+) -> Tuple[List[List[str]], List[List[str]], List[List[str]], Dict[str, List[str]]]:
+    """
+    generate a synthetic corpus
+    :param n_sentences: number of sentences
+    :param sentence_length: minimum and maximum number of morphs of a sentence
+    :param scheme: IOB2, BIOES, or BIOUL
+    :param density: expected rate of morphs inside named entities
+    :param n_types: number of NER label types
+    :param dict_size: number of known words (over all types)
+    :param vocab_size: number of distinct morphs
+    :param error_rate: rate of answer named entities predicted wrongly
+    :param seed: random seed
+    :return: answers, predicts, sentences, known_words
+    """
+
+    if scheme not in SCHEMES:
+        raise ValueError("unknown scheme: {}".format(scheme))
+    if not 0 <= density < 1:
+        raise ValueError("density must be in [0, 1)")
+    rng = random.Random(seed)
+    types = ["T{}".format(i) for i in range(n_types)]
+    # entities have 1-4 morphs (2.5 on average) and are followed by a morph
+    start_rate = density / (2.5 * (1 - density))
+    answers, predicts, sentences = [], [], []
+    surfaces: Dict[str, List[str]] = {type_: [] for type_ in types}
+    for _ in range(n_sentences):
+        length = rng.randint(*sentence_length)
+        words = ["w{}".format(rng.randrange(vocab_size)) for _ in range(length)]
+        spans = []
+        i = 0
+        while i < length:
+            if rng.random() < start_rate:
+                end = min(i + rng.randint(0, 3), length - 1)
+                type_ = rng.choice(types)
+                spans.append((i, end, type_))
+                stop = end + 1
+                surfaces[type_].append("".join(words[i:stop]))
+                i = end + 2
+            else:
+                i += 1
+        wrong = [span for span in spans if rng.random() < error_rate]
+        right = [span for span in spans if span not in wrong]
+        predicted = sorted(right + _perturb(rng, wrong, length, types))
+        sentences.append(words)
+        answers.append(encode(spans, length, scheme))
+        predicts.append(encode(predicted, length, scheme))
+
+    # half of the known words appear in the corpus
+    known_words = {}
+    for type_ in types:
+        size = dict_size // n_types
+        found = rng.sample(surfaces[type_], min(size // 2, len(surfaces[type_])))
+        unseen = ["x{}{}".format(type_, i) for i in range(size - len(found))]
+        known_words[type_] = found + unseen
+    return answers, predicts, sentences, known_words
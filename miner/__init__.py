@@ -1,7 +1,28 @@
-from collections import defaultdict
-from typing import Dict, List, Tuple, Union
-
-from .utils import entity_indexes, is_begin_of_label, is_end_of_label
+import threading
+from typing import Dict, Hashable, Iterator, List, Tuple, Union
+
+from .analysis import ErrorIndex
+from .buckets import BucketFunction, bucket_counts, build_bucketed_report
+from .cache import cached_decode
+from .confusion import ConfusionMatrix, confusion_matrix, entity_mask
+from .encoding import EncodedCorpus, LabelVocab
+from .export import SpanExport, export_spans
+from .known import KnownWordIndex
+from .parallel import parallel_counts, resolve_n_jobs
+from .scoring import (
+    ANS,
+    Counts,
+    build_report,
+    check_scorer,
+    count_spans,
+    print_report,
+    scores,
+)
+from .profiling import stage
+from .relaxed import RelaxedCounts, build_relaxed_report, relaxed_counts
+from .spans import SpanTable, decode
+from .stats import SurfaceStats
+from .backend import entity_indexes
 
 
 class Miner:
@@ -10,34 +31,122 @@ class Miner:
         answers: List[List[str]],
         predicts: List[List[str]],
         sentences: List[List[str]],
-        known_words: Dict[str, List[str]] = None,
+        known_words: Union[Dict[str, List[str]], KnownWordIndex] = None,
+        compact: bool = False,
+        scorer: str = "python",
+        n_jobs: int = 1,
+        cache_dir: str = None,
     ):
         """
         :param answers: answer labels list [[labels], [labels], ...]
+                        or EncodedCorpus
         :param predicts: predicrt labels list [[labels], [labels], ...]
+                         or EncodedCorpus (sharing LabelVocab with answers)
         :param sentences: morphs list [[morphs], [morphs], ...]
         :param known_words: known words of each label
                             {'label0': [word0, word1, ... ],
                             'label1': [word0, word1, ... ],
                             ... }
+                            or KnownWordIndex built from them
+        :param compact: if True, store answers and predicts
+                        as integer-encoded labels (EncodedCorpus)
+        :param scorer: backend to count matched named entities,
+                       'python' (reference) or 'numpy'
+        :param n_jobs: number of processes to decode and count named entities
+                       (-1 means all CPUs). sentences are sharded across them.
+        :param cache_dir: directory to keep decoded answer named entities.
+                          they are keyed by the content hash of answers,
+                          sentences and known_words, and loaded from there
+                          by later Miners instead of decoding answers again
+                          (also with n_jobs, where shards of them are sent
+                          to the worker processes).
         """
 
+        check_scorer(scorer)
+        self.scorer = scorer
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self._lock = threading.RLock()
+        self._tables = None
+        self._counts_cache = None
+        self._relaxed_cache = None
+        if compact:
+            vocab = LabelVocab()
+            answers = EncodedCorpus.from_labels(answers, vocab)
+            predicts = EncodedCorpus.from_labels(predicts, vocab)
         self.answers = answers
         self.predicts = predicts
         self.sentences = sentences
-        types = list(
-            set([t.split("-")[-1] for seq in self.answers for t in seq if t != "O"])
-        )
-        self.types = sorted(types) + ["overall"]
-        self.known_words = (
-            {type_: [] for type_ in self.types} if known_words is None else known_words
-        )
-        self.known_words.update(
-            {"overall": [NE for k, v in self.known_words.items() for NE in v]}
-        )
+        self.known_words = known_words
         self.check_known = True
         self.check_unknown = True
 
+    @property
+    def answers(self) -> List[List[str]]:
+        return self._answers
+
+    @answers.setter
+    def answers(self, answers: List[List[str]]):
+        self._answers = answers
+        if isinstance(answers, EncodedCorpus):
+            types = answers.types()
+        else:
+            types = list(
+                set([t.split("-")[-1] for seq in answers for t in seq if t != "O"])
+            )
+        self.types = sorted(types) + ["overall"]
+        self.invalidate()
+
+    @property
+    def predicts(self) -> List[List[str]]:
+        return self._predicts
+
+    @predicts.setter
+    def predicts(self, predicts: List[List[str]]):
+        self._predicts = predicts
+        self.invalidate()
+
+    @property
+    def sentences(self) -> List[List[str]]:
+        return self._sentences
+
+    @sentences.setter
+    def sentences(self, sentences: List[List[str]]):
+        self._sentences = sentences
+        self.invalidate()
+
+    @property
+    def known_words(self) -> Union[Dict[str, List[str]], KnownWordIndex]:
+        return self._known_words
+
+    @known_words.setter
+    def known_words(self, known_words: Union[Dict[str, List[str]], KnownWordIndex]):
+        if isinstance(known_words, KnownWordIndex):
+            self._known_words = self.known_index = known_words
+        else:
+            self._known_words = (
+                {type_: [] for type_ in self.types}
+                if known_words is None
+                else known_words
+            )
+            self._known_words.update(
+                {"overall": [NE for k, v in self._known_words.items() for NE in v]}
+            )
+            self.known_index = KnownWordIndex(self._known_words)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        drop decoded named entities and counters.
+        they are dropped automatically when answers, predicts, sentences
+        or known_words is assigned. call this after modifying them in place.
+        """
+
+        with self._lock:
+            self._tables = None
+            self._counts_cache = None
+            self._relaxed_cache = None
+
     def default_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
         """
         return report of named entity recognition
@@ -52,25 +161,7 @@ class Miner:
                              'f1_score': f-measure}, ... }
         """
 
-        self.check_known = True
-        self.check_unknown = True
-
-        report = {type_: defaultdict(float) for type_ in self.types}
-
-        for type_ in self.types:
-            p, r, f1 = self.evaluations(type_)
-            report[type_]["precision"] = p
-            report[type_]["recall"] = r
-            report[type_]["f1_score"] = f1
-            report[type_]["num"] = self.num_of_ne(type_)
-
-        for type_ in self.types:
-            report[type_] = dict(report[type_])
-
-        if print_:
-            self._print_report(report)
-
-        return report
+        return self._report("default", print_)
 
     def known_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
         """
@@ -86,25 +177,7 @@ class Miner:
                              'f1_score': f-measure}, ... }
         """
 
-        self.check_known = True
-        self.check_unknown = False
-
-        report = {type_: defaultdict(float) for type_ in self.types}
-
-        for type_ in self.types:
-            p, r, f1 = self.evaluations(type_)
-            report[type_]["precision"] = p
-            report[type_]["recall"] = r
-            report[type_]["f1_score"] = f1
-            report[type_]["num"] = self.num_of_ne(type_)
-
-        for type_ in self.types:
-            report[type_] = dict(report[type_])
-
-        if print_:
-            self._print_report(report)
-
-        return report
+        return self._report("known", print_)
 
     def unknown_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
         """
@@ -120,25 +193,64 @@ class Miner:
                              'f1_score': f-measure}, ... }
         """
 
-        self.check_known = False
-        self.check_unknown = True
-
-        report = {type_: defaultdict(float) for type_ in self.types}
+        return self._report("unknown", print_)
 
-        for type_ in self.types:
-            p, r, f1 = self.evaluations(type_)
-            report[type_]["precision"] = p
-            report[type_]["recall"] = r
-            report[type_]["f1_score"] = f1
-            report[type_]["num"] = self.num_of_ne(type_)
+    def relaxed_report(
+        self, mode: str = "default", print_: bool = False
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        return reports of named entity recognition in SemEval style schemes.
+        strict: same span and type, exact: same span,
+        partial: overlapping span (half correct unless the same span),
+        type: overlapping span and same type
+        :param mode: default, known, or unknown
+        :param print_: print flag.
+                       if this flag equal 'True', print reports of NER result.
+        :return: {'strict': report, 'exact': report,
+                  'partial': report, 'type': report}
+                 (report has 'correct', 'incorrect', 'partial', 'missed' and
+                 'spurious' counts in addition to default_report)
+        """
 
-        for type_ in self.types:
-            report[type_] = dict(report[type_])
+        reports = build_relaxed_report(self._relaxed_counts(), self.types, mode)
 
         if print_:
-            self._print_report(report)
+            for scheme, report in reports.items():
+                print("\n" + scheme, end="")
+                self._print_report(report)
 
-        return report
+        return reports
+
+    def bucketed_report(
+        self, bucket_fns: Dict[str, BucketFunction], mode: str = "default"
+    ) -> Dict[str, Dict[Hashable, Dict[str, Dict[str, float]]]]:
+        """
+        return reports of named entity recognition broken down into buckets.
+        all buckets are counted in a single pass over the named entities.
+        :param bucket_fns: {'name': function of an Entity returning its bucket}
+                           (see miner.buckets.by_length, by_frequency,
+                           and by_sentence_length)
+        :param mode: default, known, or unknown
+        :return: {'name': {bucket: report}}
+                 (report has the same format as default_report)
+        """
+
+        counts = bucket_counts(*self._span_tables(), self.sentences, bucket_fns)
+        return build_bucketed_report(counts, bucket_fns, self.types, mode)
+
+    def confusion_matrix(self, mode: str = "default") -> ConfusionMatrix:
+        """
+        return token-level confusion matrix of answer and predicted labels
+        :param mode: default (all tokens),
+                     known (tokens inside known answer or predicted
+                     named entities), or unknown (inside unknown ones)
+        :return: confusion matrix (see ConfusionMatrix.report)
+        """
+
+        mask = None
+        if mode != "default":
+            mask = entity_mask(self._span_tables(), map(len, self.answers), mode)
+        return confusion_matrix(self.answers, self.predicts, mask)
 
     def return_miss_labelings(self) -> List[Dict[str, List[str]]]:
         """
@@ -151,11 +263,68 @@ class Miner:
                  ]
         """
 
-        return [
-            {"sentence": s, "answer": a, "predict": p}
-            for p, a, s in zip(self.predicts, self.answers, self.sentences)
-            if p != a
-        ]
+        return list(self.iter_miss_labelings())
+
+    def iter_miss_labelings(self) -> Iterator[Dict[str, List[str]]]:
+        """
+        iterate miss labeling sentences, predict labels, and answer labels
+        :return: the same items as return_miss_labelings, lazily
+        """
+
+        for p, a, s in zip(self.predicts, self.answers, self.sentences):
+            if p != a:
+                yield {"sentence": s, "answer": a, "predict": p}
+
+    def error_index(self) -> ErrorIndex:
+        """
+        return span-level error index
+        (classify answer and predicted named entities as exact, boundary,
+        type, spurious, or missed)
+        :return: error index
+        """
+
+        return ErrorIndex(*self._span_tables(), self.sentences)
+
+    def surface_stats(
+        self,
+        budget: int = 100000,
+        k: int = 100,
+        width: int = 1 << 16,
+        depth: int = 4,
+        sep: str = "",
+    ) -> SurfaceStats:
+        """
+        return frequencies of surface strings of named entities found,
+        missed and predicted spuriously, for each type and known / unknown,
+        counted from the decoded named entities in bounded memory.
+        tables are exact up to budget distinct strings, and beyond it
+        keep the top k strings (space-saving) and a count-min sketch.
+        :param budget: maximum number of exactly counted strings of a table
+        :param k: number of strings kept by a table beyond the budget
+        :param width: width of count-min sketches
+        :param depth: depth of count-min sketches
+        :param sep: separator to join morphs of a surface string
+        :return: statistics (e.g. stats.top('PSN', 'missed', known=False))
+        """
+
+        stats = SurfaceStats(budget, k, width, depth, sep)
+        with stage("surface_stats"):
+            return stats.update(*self._span_tables(), self.sentences)
+
+    def export_spans(self, sep: str = "", classify: bool = False) -> SpanExport:
+        """
+        return answer and predicted named entities as a columnar table
+        (sentence, begin, end, type id, known flag, source, category
+        and interned surface string of each named entity).
+        it can be saved as a NumPy file or streamed as JSON lines
+        without building nested dictionaries.
+        :param sep: separator to join morphs of a surface string
+        :param classify: if True, unmatched named entities are classified
+                         into boundary and type errors (slower)
+        :return: columnar table
+        """
+
+        return export_spans(*self._span_tables(), self.sentences, sep, classify)
 
     def return_answer_named_entities(self) -> Dict[str, Dict[str, List[str]]]:
         return self._return_named_entities(self.answers)
@@ -173,31 +342,35 @@ class Miner:
     ) -> Dict[str, Dict[str, List[str]]]:
         return self._return_named_entities(self.predicts, False, to_join)
 
-    def evaluations(self, type_select: str) -> Tuple[float, float, float]:
+    def evaluations(
+        self, type_select: str, mode: str = None
+    ) -> Tuple[float, float, float]:
         """
         return precision score
         :param type_select: NER label type
+        :param mode: default, known, or unknown.
+                     if None, follow check_known and check_unknown.
         :return: precision score
         """
 
-        ans_entities = set(self._entity_indexes(self.answers, type_select))
-        pred_entities = set(self._entity_indexes(self.predicts, type_select))
-        correct_num = len(ans_entities & pred_entities)
-        pred_num = len(pred_entities)
-        ans_num = len(ans_entities)
-        p = correct_num / pred_num if pred_num > 0 else 0.0
-        r = correct_num / ans_num if ans_num > 0 else 0.0
-        f1 = 2 * p * r / (p + r) if p + r > 0 else 0
-        return p, r, f1
+        mode = self._legacy_mode() if mode is None else mode
+        if mode is None:
+            return 0.0, 0.0, 0
+        return scores(*self._counts().get(type_select, mode))
 
-    def num_of_ne(self, type_select: str) -> int:
+    def num_of_ne(self, type_select: str, mode: str = None) -> int:
         """
         return number of Named Entity
         :param type_select: NER label type
+        :param mode: default, known, or unknown.
+                     if None, follow check_known and check_unknown.
         :return:
         """
 
-        return len(self._entity_indexes(self.answers, type_select))
+        mode = self._legacy_mode() if mode is None else mode
+        if mode is None:
+            return 0
+        return self._counts().get(type_select, mode)[ANS]
 
     def segmentation_score(
         self, mode: str = "default", print_: bool = True
@@ -211,34 +384,139 @@ class Miner:
         :return segmentation score
         """
 
-        if mode == "unknown":
-            self.check_known = False
-            self.check_unknown = True
-        elif mode == "known":
-            self.check_known = True
-            self.check_unknown = False
-        else:
-            self.check_known = True
-            self.check_unknown = True
+        report = build_report(self._counts(), ["overall"], mode)["overall"]
 
-        p, r, f1 = self.evaluations("overall")
-        report = {
-            "precision": p,
-            "recall": r,
-            "f1_score": f1,
-            "num": self.num_of_ne("overall"),
-        }
+        if print_:
+            print_report({"SEG": report}, ["SEG"])
+
+        return report
+
+    def _report(self, mode: str, print_: bool) -> Dict[str, Dict[str, float]]:
+        """
+        return report of named entity recognition of all types
+        :param mode: default, known, or unknown
+        :param print_: print flag.
+                       if this flag equal 'True', print report of NER result.
+        :return: reports of NER result
+        """
+
+        counts = self._counts()
+        with stage("report"):
+            report = build_report(counts, self.types, mode)
 
         if print_:
-            print("\n\tprecision    recall    f1_score   num")
-            print("SEG", end="\t")
-            print("{0: .3f}".format(report["precision"]), end="       ")
-            print("{0: .3f}".format(report["recall"]), end="    ")
-            print("{0: .3f}".format(report["f1_score"]), end="     ")
-            print("{0: d}".format(int(report["num"])), end="\n")
+            self._print_report(report)
 
         return report
 
+    def _span_tables(self) -> Tuple[SpanTable, SpanTable]:
+        """
+        decode answer and predicted named entities of all types
+        (decoded once and kept until the inputs change)
+        :return: table of answer named entities, table of predicted named entities
+        """
+
+        tables = self._tables
+        if tables is None:
+            with self._lock:
+                if self._tables is None:
+                    if self.cache_dir is None:
+                        ans_table = decode(
+                            self.answers, self.sentences, self.known_index, {}
+                        )
+                    else:
+                        ans_table = cached_decode(
+                            self.cache_dir,
+                            self.answers,
+                            self.sentences,
+                            self.known_index,
+                        )
+                    pred_table = decode(
+                        self.predicts,
+                        self.sentences,
+                        self.known_index,
+                        ans_table.type_ids,
+                    )
+                    self._tables = (ans_table, pred_table)
+                tables = self._tables
+        return tables
+
+    def _counts(self) -> Counts:
+        """
+        count matched, predicted and answer named entities of all types
+        from a single decoding of answers and predicts
+        (counted once and kept until the inputs change)
+        :return: counters
+        """
+
+        counts = self._counts_cache
+        if counts is None:
+            with self._lock:
+                if self._counts_cache is None:
+                    if resolve_n_jobs(self.n_jobs) > 1:
+                        # decoding is done in the worker processes,
+                        # except for answers kept in the cache
+                        answers = self.answers
+                        if self.cache_dir is not None:
+                            answers = cached_decode(
+                                self.cache_dir,
+                                self.answers,
+                                self.sentences,
+                                self.known_index,
+                            )
+                        with stage("parallel_count"):
+                            self._counts_cache = parallel_counts(
+                                answers,
+                                self.predicts,
+                                self.sentences,
+                                self.known_index,
+                                self.n_jobs,
+                                self.scorer,
+                            )
+                    else:
+                        tables = self._span_tables()
+                        with stage("count") as timer:
+                            self._counts_cache = count_spans(
+                                *tables, backend=self.scorer
+                            )
+                            if timer:
+                                timer.add(spans=len(tables[0]) + len(tables[1]))
+                counts = self._counts_cache
+        return counts
+
+    def _relaxed_counts(self) -> RelaxedCounts:
+        """
+        count outcomes of named entities in SemEval style schemes
+        (counted once and kept until the inputs change)
+        :return: counters
+        """
+
+        counts = self._relaxed_cache
+        if counts is None:
+            with self._lock:
+                if self._relaxed_cache is None:
+                    tables = self._span_tables()
+                    with stage("relaxed_count") as timer:
+                        self._relaxed_cache = relaxed_counts(*tables)
+                        if timer:
+                            timer.add(spans=len(tables[0]) + len(tables[1]))
+                counts = self._relaxed_cache
+        return counts
+
+    def _legacy_mode(self) -> str:
+        """
+        return mode corresponding to check_known and check_unknown
+        :return: default, known, unknown, or None (neither)
+        """
+
+        if self.check_known and self.check_unknown:
+            return "default"
+        elif self.check_known:
+            return "known"
+        elif self.check_unknown:
+            return "unknown"
+        return None
+
     def _entity_indexes(
         self, seqs: List[List[str]], type_select: str
     ) -> List[Tuple[str, int, int]]:
@@ -252,18 +530,27 @@ class Miner:
                   (type, begin index, end index), ... ]
         """
 
-        sequences = [label for seq in seqs for label in seq + ["O"]]
-        sentences = [word for sentence in self.sentences for word in sentence + [""]]
+        with stage("flatten") as timer:
+            sequences = [label for seq in seqs for label in seq + ["O"]]
+            sentences = [
+                word for sentence in self.sentences for word in sentence + [""]
+            ]
+            if timer:
+                timer.add(tokens=len(sequences))
 
         seq_label_pairs = zip(sequences + ["O"], sentences + [""])
-        return entity_indexes(
-            sentences,
-            seq_label_pairs,
-            type_select,
-            self.check_known,
-            self.check_unknown,
-            self.known_words,
-        )
+        with stage("entity_indexes") as timer:
+            entities = entity_indexes(
+                sentences,
+                seq_label_pairs,
+                type_select,
+                self.check_known,
+                self.check_unknown,
+                self.known_index,
+            )
+            if timer:
+                timer.add(tokens=len(sequences), spans=len(entities))
+        return entities
 
     def _return_named_entities(
         self, labels: List[List[str]], to_set: bool = True, to_join: bool = True
@@ -279,36 +566,28 @@ class Miner:
                               type2: [...] }}
         """
 
+        if labels is self.answers:
+            table = self._span_tables()[0]
+        elif labels is self.predicts:
+            table = self._span_tables()[1]
+        else:
+            table = decode(labels, self.sentences, self.known_index)
+        types = table.types
+
         knownentities = {type_: [] for type_ in self.types}
         unknownentities = {type_: [] for type_ in self.types}
-        sequences = [seq for label in labels for seq in label + ["O"]]
-        sentences = [word for sentence in self.sentences for word in sentence + [""]]
-        prev_top = "O"
-        prev_type = ""
-        focus_idx = 0
-
-        seq_label_pairs = zip(sequences + ["O"], sentences + [""])
-        for i, (label, words) in enumerate(seq_label_pairs):
-            top = label[0]
-            type_ = label.split("-")[-1]
-
-            if is_end_of_label(prev_top, top, prev_type, type_):
-                word = "".join(sentences[focus_idx:i])
-                entity = word if to_join else sentences[focus_idx:i]
-                if word in self.known_words[prev_type]:
-                    knownentities[prev_type].append(entity)
-                else:
-                    unknownentities[prev_type].append(entity)
-
-            if is_begin_of_label(top, prev_type, type_):
-                focus_idx = i
-            prev_top = top
-            prev_type = type_
+        for sent, begin, end, type_id, known, _ in table.rows():
+            stop = end + 1
+            morphs = self.sentences[sent][begin:stop]
+            entities = knownentities if known else unknownentities
+            entity = "".join(morphs) if to_join else morphs
+            entities.setdefault(types[type_id], []).append(entity)
 
         if to_set:
-            for type_ in self.types:
-                knownentities[type_] = list(set(knownentities[type_]))
-                unknownentities[type_] = list(set(unknownentities[type_]))
+            for entities in (knownentities, unknownentities):
+                for type_, values in entities.items():
+                    unique = {tuple(v) if isinstance(v, list) else v: v for v in values}
+                    entities[type_] = list(unique.values())
 
         return {"known": knownentities, "unknown": unknownentities}
 
@@ -324,13 +603,7 @@ class Miner:
                                    'f1_score': f-measure}, ... }
         """
 
-        print("\n\tprecision    recall    f1_score   num")
-        for type_ in self.types:
-            print(type_, end="\t")
-            print("{0: .3f}".format(result[type_]["precision"]), end="       ")
-            print("{0: .3f}".format(result[type_]["recall"]), end="    ")
-            print("{0: .3f}".format(result[type_]["f1_score"]), end="     ")
-            print("{0: d}".format(int(result[type_]["num"])), end="\n")
+        print_report(result, self.types)
 
     def _check_add_entity(self, word: str, type_: str) -> bool:
         """
@@ -342,8 +615,9 @@ class Miner:
 
         if self.check_known and self.check_unknown:
             return True
-        elif self.check_known and word in self.known_words[type_]:
+        known = self.known_index.is_known(word, type_)
+        if self.check_known and known:
             return True
-        elif self.check_unknown and word not in self.known_words[type_]:
+        elif self.check_unknown and not known:
             return True
         return False
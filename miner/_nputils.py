@@ -0,0 +1,93 @@
+from array import array
+
+import numpy as np
+
+from ._pyutils import (  # noqa: F401
+    P_O,
+    P_OTHER,
+    PREFIXES,
+    _is_begin,
+    _is_end,
+    check_add_entity,
+    entity_indexes,
+    entity_spans,
+    is_begin_of_label,
+    is_end_of_label,
+)
+
+# (previous prefix code, prefix code) -> end of a named entity by prefixes only
+_END = np.array(
+    [
+        [_is_end(prev, now, 0, 0) for now in range(P_OTHER + 1)]
+        for prev in range(P_OTHER + 1)
+    ]
+)
+# prefix code -> begin of a named entity by prefixes only
+_BEGIN = np.array([_is_begin(now, 0, 0) for now in range(P_OTHER + 1)])
+
+
+def _to_array(values: "np.ndarray") -> array:
+    column = array("l")
+    column.frombytes(np.ascontiguousarray(values, dtype="l").tobytes())
+    return column
+
+
+def encoded_entity_spans(tags, prefix_of, type_of, offsets):
+    """
+    return named entities of integer-encoded labels
+    (same decoding rules as entity_spans).
+    the decoding rules only look at a label and the previous label,
+    so ends and begins are found with array operations over all labels,
+    and the begin of each named entity is the last begin before its end.
+    :param tags: label ids of all sentences concatenated
+    :param prefix_of: prefix code of each label id (index of PREFIXES,
+                      len(PREFIXES) for other prefixes)
+    :param type_of: type id of each label id
+    :param offsets: begin index of each sentence in tags,
+                    followed by len(tags)
+    :return: sentence indexes, begin indexes, end indexes and type ids
+             of named entities (array('l') each)
+    """
+
+    tags = np.asarray(tags, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    tops = np.asarray(prefix_of, dtype=np.int64)[tags]
+    types = np.asarray(type_of, dtype=np.int64)[tags]
+    n = len(tags)
+
+    # sentence of each label, and the first label of each sentence
+    lengths = np.diff(offsets)
+    sent_of = np.repeat(np.arange(len(lengths)), lengths)
+    first = np.zeros(n, dtype=bool)
+    first[offsets[:-1][lengths > 0]] = True
+
+    # previous label (O of no type at the beginning of a sentence)
+    prev_top = np.empty(n, dtype=np.int64)
+    prev_type = np.empty(n, dtype=np.int64)
+    prev_top[1:], prev_type[1:] = tops[:-1], types[:-1]
+    prev_top[first], prev_type[first] = P_O, -1
+
+    is_end = _END[prev_top, tops] | ((prev_top != P_O) & (prev_type != types))
+    is_begin = _BEGIN[tops] | ((tops != P_O) & (prev_type >= 0) & (prev_type != types))
+
+    # a named entity ends at the label before an end,
+    # or at the last label of a sentence unless it is O
+    last = np.zeros(n, dtype=bool)
+    last[offsets[1:][lengths > 0] - 1] = True
+    closed = np.zeros(n, dtype=bool)
+    closed[:-1] = is_end[1:]
+    closed &= ~last
+    closed |= last & (tops != P_O)
+    end_pos = np.flatnonzero(closed)
+
+    # the begin of a named entity is the last begin (or sentence start) before it
+    focus = np.where(is_begin | first, np.arange(n), 0)
+    np.maximum.accumulate(focus, out=focus)
+    sents = sent_of[end_pos]
+    starts = offsets[sents]
+    return (
+        _to_array(sents),
+        _to_array(focus[end_pos] - starts),
+        _to_array(end_pos - starts),
+        _to_array(types[end_pos]),
+    )
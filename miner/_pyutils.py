@@ -0,0 +1,210 @@
+from array import array
+from typing import Dict, List
+
+# prefix codes of integer-encoded labels
+# (any other prefix is encoded as OTHER)
+P_O, P_B, P_I, P_E, P_S, P_L, P_U, P_OTHER = range(8)
+PREFIXES = ("O", "B", "I", "E", "S", "L", "U")
+
+
+def entity_indexes(
+    sentences,
+    seq_label_pairs,
+    type_select: str,
+    check_known: bool,
+    check_unknown: bool,
+    known_words: Dict[str, List[str]],
+):
+    """
+    return named entities indexes
+    :param seqs: labels list [[labels0], [labels1], ... ]
+    :param type_select: NER label type
+    :return: chunks of NER label type, index of begin of named entity
+             and index of end of named entity
+             [(type, begin index, end index),
+              (type, begin index, end index), ... ]
+    """
+
+    prev_top, prev_type = "O", ""
+    focus_idx = 0
+    filtering = not (check_known and check_unknown)
+    entities = []
+
+    for i, (label, _) in enumerate(seq_label_pairs):
+        top = label[0]
+        type_ = label.split("-")[-1]
+
+        if is_end_of_label(prev_top, top, prev_type, type_) and type_select in [
+            prev_type,
+            "",
+            "overall",
+        ]:
+            # build a surface string only when a span is closed
+            # and known / unknown filtering needs it
+            if not filtering:
+                entities.append((prev_type, focus_idx, i - 1))
+            else:
+                word = "".join(sentences[focus_idx:i])
+                if check_add_entity(
+                    word, type_select, check_known, check_unknown, known_words
+                ):
+                    entities.append((prev_type, focus_idx, i - 1))
+
+        if is_begin_of_label(top, prev_type, type_):
+            focus_idx = i
+        prev_top = top
+        prev_type = type_
+
+    return entities
+
+
+def is_end_of_label(prev_top: str, now_top: str, prev_type: str, now_type: str):
+    """
+    check if named entity label is end
+    :param prev_top: previous scheme
+    :param now_top: now scheme
+    :param prev_type: previous label
+    :param now_type: now label
+    :return: end -> True, not end -> False
+    """
+
+    if prev_top in ["E", "S", "L", "U"]:
+        return True
+    elif prev_top == "B" and now_top in ["B", "O"]:
+        return True
+    elif prev_top == "I" and now_top in ["B", "O", "S", "U"]:
+        return True
+    elif prev_top != "O" and prev_type != now_type:
+        return True
+    return False
+
+
+def is_begin_of_label(now_top: str, prev_type: str, now_type: str):
+    """
+    check if named entity label is begin
+    :param now_top: now scheme
+    :param prev_type: previous label
+    :param now_type: now label
+    :return: begin -> True, not begin -> False
+    """
+
+    if now_top in ["B", "S", "U"]:
+        return True
+    elif now_top != "O" and prev_type and prev_type != now_type:
+        return True
+    return False
+
+
+def check_add_entity(
+    word: str,
+    type_: str,
+    check_known: bool,
+    check_unknown: bool,
+    known_words: Dict[str, List[str]],
+) -> bool:
+    """
+    adding entity check
+    :param word: a named entity
+    :param type_: NER label type
+    :return: can add entities -> True, cannot add entities -> False
+    """
+
+    if check_known and check_unknown:
+        return True
+    elif check_known and word in known_words[type_]:
+        return True
+    elif check_unknown and word not in known_words[type_]:
+        return True
+    return False
+
+
+def entity_spans(labels) -> list:
+    """
+    return named entities of all NER label types in a sentence
+    (same decoding rules as entity_indexes, in a single pass)
+    :param labels: labels of a sentence [label0, label1, ... ]
+    :return: chunks of NER label type, index of begin of named entity
+             and index of end of named entity
+             [(type, begin index, end index),
+              (type, begin index, end index), ... ]
+    """
+
+    prev_top, prev_type = "O", ""
+    focus_idx = 0
+    entities = []
+
+    for i, label in enumerate(list(labels) + ["O"]):
+        top = label[0]
+        type_ = label.split("-")[-1]
+
+        if is_end_of_label(prev_top, top, prev_type, type_):
+            entities.append((prev_type, focus_idx, i - 1))
+
+        if is_begin_of_label(top, prev_type, type_):
+            focus_idx = i
+        prev_top = top
+        prev_type = type_
+
+    return entities
+
+
+def _is_end(prev_top: int, now_top: int, prev_type: int, now_type: int) -> bool:
+    if prev_top in (P_E, P_S, P_L, P_U):
+        return True
+    elif prev_top == P_B and now_top in (P_B, P_O):
+        return True
+    elif prev_top == P_I and now_top in (P_B, P_O, P_S, P_U):
+        return True
+    elif prev_top != P_O and prev_type != now_type:
+        return True
+    return False
+
+
+def _is_begin(now_top: int, prev_type: int, now_type: int) -> bool:
+    if now_top in (P_B, P_S, P_U):
+        return True
+    elif now_top != P_O and prev_type >= 0 and prev_type != now_type:
+        return True
+    return False
+
+
+def encoded_entity_spans(tags, prefix_of, type_of, offsets):
+    """
+    return named entities of integer-encoded labels in a single pass
+    (same decoding rules as entity_spans)
+    :param tags: label ids of all sentences concatenated
+    :param prefix_of: prefix code of each label id (index of PREFIXES,
+                      len(PREFIXES) for other prefixes)
+    :param type_of: type id of each label id
+    :param offsets: begin index of each sentence in tags,
+                    followed by len(tags)
+    :return: sentence indexes, begin indexes, end indexes and type ids
+             of named entities (array('l') each)
+    """
+
+    sents, begins, ends, types = array("l"), array("l"), array("l"), array("l")
+
+    for sent in range(len(offsets) - 1):
+        begin, stop = offsets[sent], offsets[sent + 1]
+        prev_top, prev_type = P_O, -1
+        focus_idx = 0
+        for i in range(begin, stop):
+            top = prefix_of[tags[i]]
+            type_ = type_of[tags[i]]
+            if _is_end(prev_top, top, prev_type, type_):
+                sents.append(sent)
+                begins.append(focus_idx)
+                ends.append(i - begin - 1)
+                types.append(prev_type)
+            if _is_begin(top, prev_type, type_):
+                focus_idx = i - begin
+            prev_top = top
+            prev_type = type_
+        # the end of a sentence closes an open named entity
+        if prev_top != P_O:
+            sents.append(sent)
+            begins.append(focus_idx)
+            ends.append(stop - begin - 1)
+            types.append(prev_type)
+
+    return sents, begins, ends, types
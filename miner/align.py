@@ -0,0 +1,160 @@
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence, Union
+
+from .backend import PREFIXES
+from .encoding import EncodedCorpus, LabelVocab
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# first: label of the first subword of each word.
+# majority: most frequent type among the subwords (ties: the earliest type),
+#           with the prefix of its first subword.
+# any_b: label of the first subword with a beginning prefix (B, S or U),
+#        or of the first subword if there is none.
+POLICIES = ("first", "majority", "any_b")
+
+
+def _runs(keys: "np.ndarray") -> "np.ndarray":
+    """
+    return flags of the first element of each run of equal keys
+    """
+
+    heads = np.ones(len(keys), dtype=bool)
+    heads[1:] = keys[1:] != keys[:-1]
+    return heads
+
+
+def align_tags(
+    tags: "np.ndarray",
+    word_of: "np.ndarray",
+    n_words: int,
+    vocab: LabelVocab,
+    policy: str = "first",
+) -> "np.ndarray":
+    """
+    map label ids of subwords to label ids of words
+    :param tags: label ids of subwords (all sentences concatenated)
+    :param word_of: word index of each subword over all sentences concatenated,
+                    non-decreasing (-1 for subwords not in any word,
+                    e.g. special tokens)
+    :param n_words: number of words
+    :param vocab: vocabulary of the label ids
+    :param policy: first, majority, or any_b
+    :return: label ids of words ('O' for words without subwords)
+    """
+
+    if np is None:
+        raise ImportError("alignment requires numpy")
+    if policy not in POLICIES:
+        raise ValueError("unknown policy: {}".format(policy))
+    tags = np.asarray(tags, dtype=np.int64)
+    word_of = np.asarray(word_of, dtype=np.int64)
+    keep = word_of >= 0
+    tags, word_of = tags[keep], word_of[keep]
+    if np.any(word_of[1:] < word_of[:-1]):
+        raise ValueError("word indexes of subwords must be non-decreasing")
+    result = np.zeros(n_words, dtype=np.uint16)
+
+    # first subword of each word
+    heads = _runs(word_of)
+    result[word_of[heads]] = tags[heads]
+
+    if policy == "any_b":
+        beginning = np.zeros(len(PREFIXES) + 1, dtype=bool)
+        beginning[[PREFIXES.index(p) for p in "BSU"]] = True
+        positions = np.flatnonzero(beginning[np.asarray(vocab.prefix_of)[tags]])
+        firsts = positions[_runs(word_of[positions])]
+        result[word_of[firsts]] = tags[firsts]
+
+    elif policy == "majority":
+        types = np.asarray(vocab.type_of, dtype=np.int64)[tags]
+        n_types = len(vocab.types)
+        keys, first_index, counts = np.unique(
+            word_of * n_types + types, return_index=True, return_counts=True
+        )
+        words = keys // n_types
+        # the most frequent type of each word (ties: the earliest one)
+        order = np.lexsort((-first_index, counts, words))
+        sorted_words = words[order]
+        tails = np.ones(len(order), dtype=bool)
+        tails[:-1] = sorted_words[1:] != sorted_words[:-1]
+        best = order[tails]
+        result[words[best]] = tags[first_index[best]]
+    return result
+
+
+def _flat_word_ids(
+    word_ids: Union[Iterable[Sequence[Optional[int]]], "np.ndarray"],
+    n_subwords: int,
+) -> "np.ndarray":
+    """
+    return word index in its sentence of each subword (-1 for None)
+    """
+
+    if isinstance(word_ids, np.ndarray):
+        flat = word_ids.astype(np.int64)
+    else:
+        flat = np.fromiter(
+            (-1 if i is None else i for i in chain.from_iterable(word_ids)),
+            np.int64,
+        )
+    if len(flat) != n_subwords:
+        raise ValueError("word_ids do not match subwords")
+    return flat
+
+
+def align(
+    predicts: Union[List[List[str]], EncodedCorpus],
+    word_ids: Union[List[List[Optional[int]]], "np.ndarray"],
+    lengths: Iterable[int] = None,
+    policy: str = "first",
+) -> Union[List[List[str]], EncodedCorpus]:
+    """
+    map labels of subwords to labels of words
+    :param predicts: labels of subwords [[labels0], [labels1], ... ]
+                     or EncodedCorpus
+    :param word_ids: word index of each subword in its sentence
+                     [[0, 0, 1, None, ... ], ... ] (None for special tokens),
+                     or a flat array of them (-1 for special tokens)
+    :param lengths: number of words of each sentence
+                    (e.g. map(len, sentences)).
+                    if None, the last word index of each sentence + 1
+    :param policy: first, majority, or any_b
+    :return: labels of words (EncodedCorpus sharing the vocabulary
+             if predicts is EncodedCorpus), to be passed to Miner directly
+    """
+
+    if np is None:
+        raise ImportError("alignment requires numpy")
+    corpus = (
+        predicts
+        if isinstance(predicts, EncodedCorpus)
+        else EncodedCorpus.from_labels(predicts)
+    )
+    sub_offsets = np.asarray(corpus.offsets, dtype=np.int64)
+    n_sentences = len(sub_offsets) - 1
+    local = _flat_word_ids(word_ids, int(sub_offsets[-1]))
+    sub_lengths = np.diff(sub_offsets)
+    if lengths is None:
+        # the last word index of each sentence (subwords of a word are contiguous)
+        last = np.full(n_sentences, -1, dtype=np.int64)
+        nonempty = sub_lengths > 0
+        if nonempty.any():
+            last[nonempty] = np.maximum.reduceat(local, sub_offsets[:-1][nonempty])
+        lengths = last + 1
+    else:
+        lengths = np.fromiter(lengths, np.int64, n_sentences)
+    offsets = np.zeros(n_sentences + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if np.any(local >= np.repeat(lengths, sub_lengths)):
+        raise ValueError("word index out of the sentence")
+
+    word_of = np.where(local >= 0, local + np.repeat(offsets[:-1], sub_lengths), -1)
+    tags = align_tags(corpus.tags, word_of, int(offsets[-1]), corpus.vocab, policy)
+    result = EncodedCorpus(tags, offsets, corpus.vocab)
+    if isinstance(predicts, EncodedCorpus):
+        return result
+    return [result[i] for i in range(len(result))]
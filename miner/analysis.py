@@ -0,0 +1,134 @@
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterator, List
+
+from .scoring import match_spans
+from .spans import SpanTable, overlap_pairs
+
+CATEGORIES = ("exact", "boundary", "type", "spurious", "missed")
+EXACT, BOUNDARY, TYPE, SPURIOUS, MISSED = range(len(CATEGORIES))
+SOURCES = ("answer", "predict")
+
+ErrorRecord = namedtuple(
+    "ErrorRecord",
+    ["sentence", "begin", "end", "type", "source", "category", "known"],
+)
+
+
+def classify_spans(answers: SpanTable, predicts: SpanTable):
+    """
+    classify answer and predicted named entities.
+    exact: same span and type in the other table.
+    type: same span with another type in the other table.
+    boundary: overlapping span in the other table (of any type).
+    missed / spurious: no overlapping span in predicts / answers.
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :return: category codes of answer named entities (array('b')),
+             category codes of predicted named entities (array('b'))
+    """
+
+    ans_matched, pred_matched = match_spans(answers, predicts)
+    ans_codes = array("b", [EXACT if m else MISSED for m in ans_matched])
+    pred_codes = array("b", [EXACT if m else SPURIOUS for m in pred_matched])
+    for ans_row, pred_row in overlap_pairs(answers, predicts):
+        same_span = (
+            answers.begins[ans_row] == predicts.begins[pred_row]
+            and answers.ends[ans_row] == predicts.ends[pred_row]
+        )
+        code = TYPE if same_span else BOUNDARY
+        # a more specific category wins (exact < boundary < type)
+        for codes, row in ((ans_codes, ans_row), (pred_codes, pred_row)):
+            if codes[row] != EXACT and (codes[row] > TYPE or code == TYPE):
+                codes[row] = code
+    return ans_codes, pred_codes
+
+
+class ErrorIndex:
+    def __init__(
+        self, answers: SpanTable, predicts: SpanTable, sentences: List[List[str]]
+    ):
+        """
+        span-level error index built once from decoded named entities.
+        query() iterates classified named entities lazily.
+        :param answers: table of answer named entities
+        :param predicts: table of predicted named entities
+                         (sharing type vocabulary with answers)
+        :param sentences: morphs list [[morphs], [morphs], ...]
+        """
+
+        self.tables = (answers, predicts)
+        self.sentences = sentences
+        self.codes = classify_spans(answers, predicts)
+
+    def query(
+        self,
+        type_: str = None,
+        category: str = None,
+        known: bool = None,
+        source: str = None,
+    ) -> Iterator[ErrorRecord]:
+        """
+        iterate classified named entities
+        :param type_: NER label type (all types if None)
+        :param category: exact, boundary, type, spurious, or missed
+                         (all categories if None)
+        :param known: True: known only, False: unknown only, None: both
+        :param source: answer or predict (both if None)
+        :return: records of named entities
+        """
+
+        if category is not None and category not in CATEGORIES:
+            raise ValueError("unknown category: {}".format(category))
+        if source is not None and source not in SOURCES:
+            raise ValueError("unknown source: {}".format(source))
+        code = None if category is None else CATEGORIES.index(category)
+        for source_id, (table, codes) in enumerate(zip(self.tables, self.codes)):
+            if source is not None and SOURCES[source_id] != source:
+                continue
+            types = table.types
+            type_id = table.type_ids.get(type_, -1)
+            if type_ is not None and type_id < 0:
+                continue
+            for row, (sent, begin, end, t, flag, _) in enumerate(table.rows()):
+                if (
+                    (code is None or codes[row] == code)
+                    and (type_ is None or t == type_id)
+                    and (known is None or bool(flag) == known)
+                ):
+                    yield ErrorRecord(
+                        sent,
+                        begin,
+                        end,
+                        types[t],
+                        SOURCES[source_id],
+                        CATEGORIES[codes[row]],
+                        bool(flag),
+                    )
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        return numbers of named entities of each type and category
+        :return: {'label0': {'exact': num, 'boundary': num, ... }, ... }
+        """
+
+        summary = {}
+        for table, codes in zip(self.tables, self.codes):
+            types = table.types
+            for t, code in zip(table.type_col, codes):
+                row = summary.setdefault(types[t], dict.fromkeys(CATEGORIES, 0))
+                row[CATEGORIES[code]] += 1
+        return summary
+
+    def surface(self, record: ErrorRecord, to_join: bool = True):
+        """
+        return morphs of a named entity
+        :param record: record of a named entity
+        :param to_join: if True, return a joined str. if False, list format.
+        :return: named entity
+        """
+
+        begin, stop = record.begin, record.end + 1
+        morphs = self.sentences[record.sentence][begin:stop]
+        return "".join(morphs) if to_join else morphs
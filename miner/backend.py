@@ -0,0 +1,70 @@
+"""
+decoder backends.
+'cython' is the compiled extension (miner.utils), 'numpy' decodes
+integer-encoded labels with array operations, and 'python' needs nothing
+but the standard library. the first available one is chosen at import,
+unless the environment variable MINER_BACKEND names one.
+"""
+
+import importlib
+import os
+from types import ModuleType
+from typing import List
+
+BACKENDS = ("cython", "numpy", "python")
+_MODULES = {"cython": ".utils", "numpy": "._nputils", "python": "._pyutils"}
+
+
+def load(name: str) -> ModuleType:
+    """
+    import a decoder backend
+    :param name: cython, numpy, or python
+    :return: module of the backend
+    """
+
+    if name not in _MODULES:
+        raise ValueError("unknown backend: {}".format(name))
+    return importlib.import_module(_MODULES[name], __package__)
+
+
+def available() -> List[str]:
+    """
+    return decoder backends which can be imported
+    :return: names of backends (fastest first)
+    """
+
+    names = []
+    for name in BACKENDS:
+        try:
+            load(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _select() -> str:
+    name = os.environ.get("MINER_BACKEND")
+    if name:
+        load(name)
+        return name
+    for name in BACKENDS[:-1]:
+        try:
+            load(name)
+        except ImportError:
+            continue
+        return name
+    return BACKENDS[-1]
+
+
+# name of the chosen backend
+NAME = _select()
+_backend = load(NAME)
+
+PREFIXES = _backend.PREFIXES
+entity_indexes = _backend.entity_indexes
+is_end_of_label = _backend.is_end_of_label
+is_begin_of_label = _backend.is_begin_of_label
+check_add_entity = _backend.check_add_entity
+entity_spans = _backend.entity_spans
+encoded_entity_spans = _backend.encoded_entity_spans
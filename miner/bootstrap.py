@@ -0,0 +1,238 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from . import Miner
+from .parallel import resolve_n_jobs
+from .scoring import ANS, PRED, TP, match_spans
+from .spans import SpanTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# matrix of a worker process given by _init_worker
+_shared = None
+
+
+def sentence_counts(
+    answers: SpanTable,
+    predicts: SpanTable,
+    n_sentences: int,
+    types: List[str],
+    mode: str = "default",
+) -> "np.ndarray":
+    """
+    return matched, predicted and answer numbers of each sentence and type
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :param n_sentences: number of sentences
+    :param types: NER label types (including 'overall')
+    :param mode: default, known, or unknown
+    :return: matrix (sentence, type, [TP, PRED, ANS])
+    """
+
+    if np is None:
+        raise ImportError("bootstrap requires numpy")
+
+    columns = {type_: i for i, type_ in enumerate(types)}
+    # type id of the tables -> column (-1: not reported)
+    to_column = np.array(
+        [columns.get(type_, -1) for type_ in answers.types] + [-1], dtype=np.int64
+    )
+    overall = columns.get("overall", -1)
+    n_types = len(types)
+    matrix = np.zeros((n_sentences, n_types, 3), dtype=np.float64)
+    ans_matched, _ = match_spans(answers, predicts)
+
+    def accumulate(table: SpanTable, field: int, rows=slice(None)):
+        sents = np.asarray(table.sents, dtype=np.int64)[rows]
+        type_col = to_column[np.asarray(table.type_col, dtype=np.int64)[rows]]
+        for column, known in [
+            (type_col, np.asarray(table.known, dtype=bool)[rows]),
+            (
+                np.full(len(sents), overall),
+                np.asarray(table.known_overall, dtype=bool)[rows],
+            ),
+        ]:
+            keep = column >= 0
+            if mode == "known":
+                keep &= known
+            elif mode == "unknown":
+                keep &= ~known
+            np.add.at(matrix, (sents[keep], column[keep], field), 1)
+
+    accumulate(answers, ANS)
+    accumulate(predicts, PRED)
+    accumulate(answers, TP, np.asarray(ans_matched, dtype=bool))
+    return matrix
+
+
+def f1_scores(totals: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    return precision, recall and f-measure of summed counts
+    (same definition as Miner.evaluations)
+    :param totals: array (..., [TP, PRED, ANS])
+    :return: precision, recall, f-measure arrays
+    """
+
+    tp, pred, ans = totals[..., TP], totals[..., PRED], totals[..., ANS]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(pred > 0, tp / pred, 0.0)
+        r = np.where(ans > 0, tp / ans, 0.0)
+        f1 = np.where(p + r > 0, 2 * p * r / (p + r), 0.0)
+    return p, r, f1
+
+
+def _resample_chunk(
+    matrices: List["np.ndarray"], seed, size: int
+) -> List["np.ndarray"]:
+    """
+    draw bootstrap resamples of sentences as weighted sums
+    :param matrices: sentence count matrices (sentence, type, 3)
+    :param seed: seed sequence of the chunk
+    :param size: number of resamples
+    :return: totals (resample, type, 3) of each matrix
+    """
+
+    rng = np.random.default_rng(seed)
+    n = matrices[0].shape[0]
+    if n == 0:
+        # resamples of no sentences are empty
+        return [np.zeros((size,) + m.shape[1:]) for m in matrices]
+    # sentences without named entities only take part in the weights
+    nonzero = np.flatnonzero(sum(m.reshape(n, -1).any(axis=1) for m in matrices))
+    weights = np.empty((size, len(nonzero)), dtype=np.float64)
+    for i in range(size):
+        weights[i] = np.bincount(rng.integers(0, n, n), minlength=n)[nonzero]
+    return [
+        (weights @ m.reshape(n, -1)[nonzero]).reshape((size,) + m.shape[1:])
+        for m in matrices
+    ]
+
+
+def _init_worker(matrices):
+    global _shared
+    _shared = matrices
+
+
+def _resample_worker(args) -> List["np.ndarray"]:
+    return _resample_chunk(_shared, *args)
+
+
+def resample(
+    matrices: List["np.ndarray"],
+    n_resamples: int = 1000,
+    seed: int = 0,
+    n_jobs: int = 1,
+    chunk_size: int = 50,
+) -> List["np.ndarray"]:
+    """
+    draw the same bootstrap resamples of sentences for every matrix.
+    resamples are split into chunks with their own seed,
+    so the result does not depend on n_jobs.
+    :param matrices: sentence count matrices (sentence, type, 3)
+    :param n_resamples: number of resamples
+    :param seed: random seed
+    :param n_jobs: number of processes (-1 means all CPUs)
+    :param chunk_size: number of resamples of a chunk
+    :return: totals (resample, type, 3) of each matrix
+    """
+
+    if np is None:
+        raise ImportError("bootstrap requires numpy")
+    sizes = [
+        min(chunk_size, n_resamples - start)
+        for start in range(0, n_resamples, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        chunks = [_resample_chunk(matrices, s, size) for s, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(matrices,)
+        ) as executor:
+            chunks = list(executor.map(_resample_worker, zip(seeds, sizes)))
+    return [
+        np.concatenate([chunk[i] for chunk in chunks]) for i in range(len(matrices))
+    ]
+
+
+def _matrix(miner: Miner, types: List[str], mode: str) -> "np.ndarray":
+    answers, predicts = miner._span_tables()
+    return sentence_counts(answers, predicts, len(miner.sentences), types, mode)
+
+
+def confidence_intervals(
+    miner: Miner,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    mode: str = "default",
+    seed: int = 0,
+    n_jobs: int = 1,
+) -> Dict[str, Dict[str, Tuple[float, float]]]:
+    """
+    return bootstrap confidence intervals of the report of a Miner
+    (percentile intervals over resamples of sentences)
+    :param miner: evaluator
+    :param n_resamples: number of resamples
+    :param confidence: confidence level
+    :param mode: default, known, or unknown
+    :param seed: random seed
+    :param n_jobs: number of processes (-1 means all CPUs)
+    :return: {'label0': {'precision': (lower, upper),
+                         'recall': (lower, upper),
+                         'f1_score': (lower, upper)}, ... }
+    """
+
+    types = miner.types
+    (totals,) = resample([_matrix(miner, types, mode)], n_resamples, seed, n_jobs)
+    alpha = (1 - confidence) / 2
+    intervals = {}
+    for name, values in zip(("precision", "recall", "f1_score"), f1_scores(totals)):
+        lower, upper = np.quantile(values, [alpha, 1 - alpha], axis=0)
+        for i, type_ in enumerate(types):
+            intervals.setdefault(type_, {})[name] = (float(lower[i]), float(upper[i]))
+    return intervals
+
+
+def paired_test(
+    miner_a: Miner,
+    miner_b: Miner,
+    n_resamples: int = 1000,
+    mode: str = "default",
+    seed: int = 0,
+    n_jobs: int = 1,
+) -> Dict[str, Dict[str, float]]:
+    """
+    paired bootstrap test of f-measure between two prediction sets
+    of the same sentences.
+    p_value is the rate of resamples where the difference deviates from
+    the observed difference by at least the observed difference
+    (two-sided).
+    :param miner_a: evaluator of system A
+    :param miner_b: evaluator of system B
+    :param n_resamples: number of resamples
+    :param mode: default, known, or unknown
+    :param seed: random seed
+    :param n_jobs: number of processes (-1 means all CPUs)
+    :return: {'label0': {'delta': f1 of A - f1 of B, 'p_value': p-value}, ... }
+    """
+
+    if len(miner_a.sentences) != len(miner_b.sentences):
+        raise ValueError("both systems must be evaluated on the same sentences")
+    types = sorted(set(miner_a.types[:-1]) | set(miner_b.types[:-1])) + ["overall"]
+    matrices = [_matrix(miner_a, types, mode), _matrix(miner_b, types, mode)]
+    observed = (
+        f1_scores(matrices[0].sum(axis=0))[2] - f1_scores(matrices[1].sum(axis=0))[2]
+    )
+    totals_a, totals_b = resample(matrices, n_resamples, seed, n_jobs)
+    deltas = f1_scores(totals_a)[2] - f1_scores(totals_b)[2]
+    extreme = np.abs(deltas - observed) >= np.abs(observed) - 1e-12
+    p_values = extreme.mean(axis=0)
+    return {
+        type_: {"delta": float(observed[i]), "p_value": float(p_values[i])}
+        for i, type_ in enumerate(types)
+    }
@@ -0,0 +1,155 @@
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Callable, Dict, Hashable, List, Sequence, Union
+
+from .scoring import ANS, PRED, TP, Counts, build_report, match_spans
+from .spans import SpanTable
+
+Entity = namedtuple(
+    "Entity", ["sentence", "begin", "end", "type", "morphs", "sentence_length"]
+)
+BucketFunction = Callable[[Entity], Hashable]
+
+
+class Buckets:
+    def __init__(self, edges: Sequence[int], key: Callable[[Entity], int]):
+        """
+        bucket function of an integer feature of named entities.
+        edges are lower bounds of the buckets, e.g. edges (1, 2, 4) give
+        buckets '1', '2-3' and '4+' (and '<1' for smaller values).
+        :param edges: increasing lower bounds of the buckets
+        :param key: feature of a named entity
+        """
+
+        if not edges:
+            raise ValueError("edges must not be empty")
+        self.edges = sorted(edges)
+        self.key = key
+        self.labels = ["<{}".format(self.edges[0])]
+        for lower, upper in zip(self.edges, self.edges[1:] + [None]):
+            if upper is None:
+                self.labels.append("{}+".format(lower))
+            elif upper == lower + 1:
+                self.labels.append(str(lower))
+            else:
+                self.labels.append("{}-{}".format(lower, upper - 1))
+
+    def __call__(self, entity: Entity) -> str:
+        return self.labels[bisect_right(self.edges, self.key(entity))]
+
+
+def by_length(edges: Sequence[int] = (1, 2, 3, 4)) -> Buckets:
+    """
+    bucket named entities by number of morphs
+    :param edges: lower bounds of the buckets
+    :return: bucket function
+    """
+
+    return Buckets(edges, lambda entity: entity.end - entity.begin + 1)
+
+
+def by_sentence_length(edges: Sequence[int] = (1, 10, 20, 40)) -> Buckets:
+    """
+    bucket named entities by number of morphs of their sentence
+    :param edges: lower bounds of the buckets
+    :return: bucket function
+    """
+
+    return Buckets(edges, lambda entity: entity.sentence_length)
+
+
+def by_frequency(
+    frequencies: Dict[str, int], edges: Sequence[int] = (0, 1, 2, 10, 100)
+) -> Buckets:
+    """
+    bucket named entities by frequency of their surface
+    (e.g. in the training data)
+    :param frequencies: {'named entity': frequency, ... }
+    :param edges: lower bounds of the buckets
+    :return: bucket function
+    """
+
+    return Buckets(edges, lambda entity: frequencies.get("".join(entity.morphs), 0))
+
+
+def bucket_counts(
+    answers: SpanTable,
+    predicts: SpanTable,
+    sentences: List[List[str]],
+    bucket_fns: Dict[str, BucketFunction],
+) -> Dict[str, Dict[Hashable, Counts]]:
+    """
+    count matched, predicted and answer named entities of every bucket
+    in a single pass over the named entities.
+    bucket functions are applied to answer and predicted named entities alike,
+    so a matched pair always falls into the same bucket
+    as long as the function only looks at the span.
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param bucket_fns: {'name': function of an Entity returning its bucket}
+    :return: {'name': {bucket: counters}}
+    """
+
+    counts: Dict[str, Dict[Hashable, Counts]] = {name: {} for name in bucket_fns}
+    types = answers.types
+    ans_matched, _ = match_spans(answers, predicts)
+
+    for table, matched in ((answers, ans_matched), (predicts, None)):
+        for row, (sent, begin, end, type_id, known, known_overall) in enumerate(
+            table.rows()
+        ):
+            if matched is None:
+                fields = (PRED,)
+            else:
+                fields = (ANS, TP) if matched[row] else (ANS,)
+            sentence = sentences[sent]
+            stop = end + 1
+            entity = Entity(
+                sent, begin, end, types[type_id], sentence[begin:stop], len(sentence)
+            )
+            for name, fn in bucket_fns.items():
+                key = fn(entity)
+                bucket = counts[name].get(key)
+                if bucket is None:
+                    bucket = counts[name][key] = Counts()
+                for field in fields:
+                    bucket.add(entity.type, field, known)
+                    bucket.add("overall", field, known_overall)
+    return counts
+
+
+def build_bucketed_report(
+    counts: Dict[str, Dict[Hashable, Counts]],
+    bucket_fns: Dict[str, BucketFunction],
+    types: List[str],
+    mode: str = "default",
+) -> Dict[str, Dict[Hashable, Dict[str, Dict[str, Union[float, int]]]]]:
+    """
+    return reports of every bucket
+    (buckets of Buckets are ordered by their edges, others are sorted)
+    :param counts: counters of buckets
+    :param bucket_fns: bucket functions
+    :param types: NER label types to report (including 'overall')
+    :param mode: default, known, or unknown
+    :return: {'name': {bucket: report}}
+    """
+
+    reports = {}
+    for name, fn in bucket_fns.items():
+        order = _order(fn, counts[name])
+        reports[name] = {
+            bucket: build_report(counts[name][bucket], types, mode) for bucket in order
+        }
+    return reports
+
+
+def _order(fn: BucketFunction, buckets: Dict[Hashable, Counts]) -> List[Hashable]:
+    labels = getattr(fn, "labels", None)
+    if labels is not None:
+        return [label for label in labels if label in buckets]
+    try:
+        return sorted(buckets)
+    except TypeError:
+        return list(buckets)
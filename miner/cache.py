@@ -0,0 +1,163 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import List, Optional, Union
+
+from .encoding import EncodedCorpus
+from .known import KnownWordIndex
+from .spans import SpanTable, decode
+
+MAGIC = b"MINERSPN"
+VERSION = 1
+# magic, version, header size
+_PREFIX = struct.Struct("<8sII")
+# integer columns are stored as int64, flag columns as int8
+_INT_COLUMNS = ("sents", "begins", "ends", "type_col")
+_FLAG_COLUMNS = ("known", "known_overall")
+
+
+def fingerprint(
+    seqs: Union[List[List[str]], EncodedCorpus],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex = None,
+) -> str:
+    """
+    return content hash of a labels list, morphs and known words
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :return: hex digest
+    """
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update(_PREFIX.pack(MAGIC, VERSION, 0))
+    for rows in (seqs, sentences):
+        for row in rows:
+            h.update("\x1f".join(row).encode("utf-8"))
+            h.update(b"\x1e")
+        h.update(b"\x1d")
+    known_words = KnownWordIndex() if known_words is None else known_words
+    for type_ in sorted(known_words):
+        h.update(type_.encode("utf-8") + b"\x1d")
+        for word in sorted(known_words[type_]):
+            h.update(word.encode("utf-8") + b"\x1f")
+    return h.hexdigest()
+
+
+def _align(n: int) -> int:
+    return (n + 7) // 8 * 8
+
+
+def save_table(path: str, table: SpanTable, key: str):
+    """
+    write a table of named entities to a file
+    (written to a temporary file and renamed, so readers never see a partial file)
+    :param path: file path
+    :param table: table of named entities
+    :param key: fingerprint of the decoded data
+    """
+
+    header = json.dumps(
+        {
+            "key": key,
+            "byteorder": sys.byteorder,
+            "rows": len(table),
+            "types": table.types,
+        }
+    ).encode("utf-8")
+    header += b" " * (_align(_PREFIX.size + len(header)) - _PREFIX.size - len(header))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name in _INT_COLUMNS:
+                f.write(array("q", getattr(table, name)).tobytes())
+            for name in _FLAG_COLUMNS:
+                f.write(array("b", getattr(table, name)).tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_table(path: str, key: str = None) -> Optional[SpanTable]:
+    """
+    map a table of named entities written by save_table into memory.
+    columns are read-only views of the file (no copy).
+    :param path: file path
+    :param key: expected fingerprint (not checked if None)
+    :return: table, or None if the file is missing, broken or stale
+    """
+
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    table = _map_table(mm, key)
+    if table is None:
+        mm.close()
+    return table
+
+
+def _map_table(mm: mmap.mmap, key: Optional[str]) -> Optional[SpanTable]:
+    try:
+        magic, version, header_size = _PREFIX.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            return None
+        begin = _PREFIX.size
+        offset = begin + header_size
+        header = json.loads(mm[begin:offset].decode("utf-8"))
+        n, types = header["rows"], header["types"]
+        if header["byteorder"] != sys.byteorder or (
+            key is not None and header["key"] != key
+        ):
+            return None
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+    if len(mm) != offset + n * (8 * len(_INT_COLUMNS) + len(_FLAG_COLUMNS)):
+        return None
+
+    view = memoryview(mm)
+    table = SpanTable({type_: i for i, type_ in enumerate(types)})
+    columns = [(name, 8, "q") for name in _INT_COLUMNS]
+    columns += [(name, 1, "b") for name in _FLAG_COLUMNS]
+    for name, size, fmt in columns:
+        stop = offset + n * size
+        setattr(table, name, view[offset:stop].cast(fmt))
+        offset = stop
+    return table
+
+
+def cached_decode(
+    cache_dir: str,
+    seqs: Union[List[List[str]], EncodedCorpus],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex = None,
+) -> SpanTable:
+    """
+    decode named entities, or load them from a cache file
+    keyed by the content hash of the inputs.
+    a missing, broken or stale cache file is rebuilt.
+    :param cache_dir: directory of cache files
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :return: table of named entities (with its own type vocabulary)
+    """
+
+    key = fingerprint(seqs, sentences, known_words)
+    path = os.path.join(cache_dir, key + ".spans")
+    table = load_table(path, key)
+    if table is None:
+        table = decode(seqs, sentences, known_words, {})
+        os.makedirs(cache_dir, exist_ok=True)
+        save_table(path, table, key)
+    return table
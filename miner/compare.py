@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+
+from .cache import cached_decode
+from .encoding import EncodedCorpus
+from .known import KnownWordIndex
+from .parallel import resolve_n_jobs
+from .scoring import Counts, build_report, check_scorer, count_spans
+from .spans import SpanTable, decode
+
+# gold index of a worker process given by _init_worker
+_shared = None
+
+
+def _score_system(
+    answers: SpanTable,
+    sentences: List[List[str]],
+    known_index: KnownWordIndex,
+    scorer: str,
+    predicts: Union[List[List[str]], EncodedCorpus],
+) -> Counts:
+    """
+    decode a prediction set and count it against decoded answers
+    :return: counters
+    """
+
+    pred_table = decode(predicts, sentences, known_index, answers.type_ids)
+    return count_spans(answers, pred_table, scorer)
+
+
+def _init_worker(*gold):
+    global _shared
+    _shared = gold
+
+
+def _score_worker(predicts: Union[List[List[str]], EncodedCorpus]) -> Counts:
+    return _score_system(*_shared, predicts)
+
+
+class MultiMiner:
+    def __init__(
+        self,
+        answers: Union[List[List[str]], EncodedCorpus],
+        sentences: List[List[str]],
+        known_words: Union[Dict[str, List[str]], KnownWordIndex] = None,
+        scorer: str = "python",
+        n_jobs: int = 1,
+        cache_dir: str = None,
+    ):
+        """
+        evaluator of many prediction sets against one answer set.
+        answer named entities and their known flags are decoded once
+        and shared by all systems.
+        :param answers: answer labels list [[labels], [labels], ...]
+                        or EncodedCorpus
+        :param sentences: morphs list [[morphs], [morphs], ...]
+        :param known_words: known words of each label or KnownWordIndex
+        :param scorer: backend to count matched named entities,
+                       'python' (reference) or 'numpy'
+        :param n_jobs: number of processes to score systems in parallel
+                       (-1 means all CPUs)
+        :param cache_dir: directory to keep decoded answer named entities
+                          (see Miner)
+        """
+
+        check_scorer(scorer)
+        self.scorer = scorer
+        self.n_jobs = n_jobs
+        self.sentences = sentences
+        self.known_index = (
+            known_words
+            if isinstance(known_words, KnownWordIndex)
+            else KnownWordIndex(known_words)
+        )
+        if isinstance(answers, EncodedCorpus):
+            types = answers.types()
+        else:
+            types = {t.split("-")[-1] for seq in answers for t in seq if t != "O"}
+        self.types = sorted(types) + ["overall"]
+        if cache_dir is None:
+            self.answers = decode(answers, sentences, self.known_index, {})
+        else:
+            self.answers = cached_decode(
+                cache_dir, answers, sentences, self.known_index
+            )
+        self.systems: Dict[str, Counts] = {}
+
+    def add(
+        self, name: str, predicts: Union[List[List[str]], EncodedCorpus]
+    ) -> "MultiMiner":
+        """
+        score a prediction set
+        :param name: name of the system
+        :param predicts: predict labels list [[labels], [labels], ...]
+                         or EncodedCorpus
+        :return: self
+        """
+
+        return self.add_many({name: predicts})
+
+    def add_many(
+        self, systems: Dict[str, Union[List[List[str]], EncodedCorpus]]
+    ) -> "MultiMiner":
+        """
+        score prediction sets (in parallel if n_jobs is not 1)
+        :param systems: {'system0': predicts, 'system1': predicts, ... }
+        :return: self
+        """
+
+        gold = (self.answers, self.sentences, self.known_index, self.scorer)
+        n_jobs = min(resolve_n_jobs(self.n_jobs), len(systems))
+        if n_jobs <= 1:
+            results = [_score_system(*gold, predicts) for predicts in systems.values()]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_init_worker, initargs=gold
+            ) as executor:
+                results = list(executor.map(_score_worker, systems.values()))
+        self.systems.update(zip(systems, results))
+        return self
+
+    def report(self, name: str, mode: str = "default") -> Dict[str, Dict[str, float]]:
+        """
+        return report of a system
+        :param name: name of the system
+        :param mode: default, known, or unknown
+        :return: reports of NER result (same format as Miner.default_report)
+        """
+
+        return build_report(self.systems[name], self.types, mode)
+
+    def reports(self, mode: str = "default") -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        return reports of all systems
+        :param mode: default, known, or unknown
+        :return: {'system0': report, 'system1': report, ... }
+        """
+
+        return {name: self.report(name, mode) for name in self.systems}
+
+    def compare(
+        self, metric: str = "f1_score", mode: str = "default", print_: bool = False
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        return a comparison table of a metric across systems
+        :param metric: precision, recall, f1_score, or num
+        :param mode: default, known, or unknown
+        :param print_: print flag.
+                       if this flag equal 'True', print the comparison table.
+        :return: {'system0': {'label0': value, 'label1': value, ... }, ... }
+        """
+
+        table = {
+            name: {type_: result[metric] for type_, result in report.items()}
+            for name, report in self.reports(mode).items()
+        }
+        if print_:
+            print("\n\t" + "\t".join(self.types))
+            for name, row in table.items():
+                print(name, end="\t")
+                print("\t".join("{0: .3f}".format(row[t]) for t in self.types))
+        return table
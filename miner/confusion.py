@@ -0,0 +1,185 @@
+from itertools import chain
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .encoding import EncodedCorpus, LabelVocab
+from .scoring import MODES, print_report
+from .spans import SpanTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class ConfusionMatrix:
+    def __init__(self, labels: List[str], matrix: "np.ndarray"):
+        """
+        token-level confusion matrix of labels
+        :param labels: labels of rows and columns
+        :param matrix: number of tokens of each answer label (row)
+                       and predicted label (column)
+        """
+
+        self.labels = labels
+        self.matrix = matrix
+
+    def __getitem__(self, key) -> int:
+        """
+        return number of tokens of an answer label and a predicted label
+        :param key: (answer label, predicted label)
+        """
+
+        gold, pred = key
+        return int(self.matrix[self.labels.index(gold), self.labels.index(pred)])
+
+    def accuracy(self) -> float:
+        """
+        return rate of tokens labeled correctly
+        :return: accuracy
+        """
+
+        total = int(self.matrix.sum())
+        return int(self.matrix.trace()) / total if total > 0 else 0.0
+
+    def report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        return per-label scores of tokens
+        :param print_: print flag.
+                       if this flag equal 'True', print reports of labels.
+        :return: {'label0': {'precision': precision param,
+                             'recall': recall param,
+                             'f1_score': f-measure,
+                             'num': number of answer tokens}, ... }
+        """
+
+        correct = np.diag(self.matrix).astype(np.float64)
+        pred_num = self.matrix.sum(axis=0)
+        ans_num = self.matrix.sum(axis=1)
+        p = np.divide(correct, pred_num, out=np.zeros_like(correct), where=pred_num > 0)
+        r = np.divide(correct, ans_num, out=np.zeros_like(correct), where=ans_num > 0)
+        f1 = np.divide(2 * p * r, p + r, out=np.zeros_like(correct), where=p + r > 0)
+        report = {
+            label: {"precision": p_, "recall": r_, "f1_score": f1_, "num": n}
+            for label, p_, r_, f1_, n in zip(
+                self.labels, p.tolist(), r.tolist(), f1.tolist(), ans_num.tolist()
+            )
+        }
+
+        if print_:
+            print_report(report, self.labels)
+
+        return report
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        """
+        return non-zero cells of the matrix
+        :return: {'answer label': {'predicted label': num, ... }, ... }
+        """
+
+        result = {}
+        for gold, pred in zip(*np.nonzero(self.matrix)):
+            result.setdefault(self.labels[gold], {})[self.labels[pred]] = int(
+                self.matrix[gold, pred]
+            )
+        return result
+
+
+def _encode(
+    seqs: Union[List[List[str]], EncodedCorpus], vocab: LabelVocab
+) -> Tuple["np.ndarray", Iterable[int]]:
+    """
+    return label ids of a labels list in a vocabulary and sentence offsets
+    """
+
+    if not isinstance(seqs, EncodedCorpus):
+        # flattened once and looked up without per-sentence arrays
+        flat = list(chain.from_iterable(seqs))
+        get = vocab.label_ids.__getitem__
+        try:
+            tags = np.fromiter(map(get, flat), np.int64, len(flat))
+        except KeyError:
+            for label in set(flat):
+                vocab.add(label)
+            tags = np.fromiter(map(get, flat), np.int64, len(flat))
+        lengths = np.fromiter(map(len, seqs), np.int64, len(seqs))
+        return tags, np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(lengths)])
+    tags = np.asarray(seqs.tags, dtype=np.int64)
+    if seqs.vocab is not vocab:
+        to_id = np.array([vocab.add(label) for label in seqs.vocab.labels])
+        tags = to_id[tags]
+    return tags, seqs.offsets
+
+
+def _label_key(label: str):
+    # 'O' first, then by type and by position in a named entity
+    type_ = label.split("-")[-1]
+    return (label != "O", type_, "BIESLU".find(label[0]), label)
+
+
+def confusion_matrix(
+    answers: Union[List[List[str]], EncodedCorpus],
+    predicts: Union[List[List[str]], EncodedCorpus],
+    mask: Iterable[bool] = None,
+) -> ConfusionMatrix:
+    """
+    count tokens of each pair of answer and predicted labels.
+    labels are encoded to integers and counted by a single bincount
+    :param answers: answer labels list [[labels0], [labels1], ... ]
+                    or EncodedCorpus
+    :param predicts: predicted labels list [[labels0], [labels1], ... ]
+                     or EncodedCorpus
+    :param mask: flags of tokens to count (all sentences concatenated).
+                 all tokens are counted if None
+    :return: confusion matrix
+    """
+
+    if np is None:
+        raise ImportError("confusion matrix requires numpy")
+    vocab = LabelVocab()
+    gold, gold_offsets = _encode(answers, vocab)
+    pred, pred_offsets = _encode(predicts, vocab)
+    if not np.array_equal(gold_offsets, pred_offsets):
+        raise ValueError("answers and predicts have different numbers of labels")
+
+    labels = sorted(vocab.labels, key=_label_key)
+    rank = np.empty(len(vocab), dtype=np.int64)
+    rank[[vocab.label_ids[label] for label in labels]] = np.arange(len(labels))
+    gold, pred = rank[gold], rank[pred]
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        gold, pred = gold[mask], pred[mask]
+    n = len(labels)
+    matrix = np.bincount(gold * n + pred, minlength=n * n).reshape(n, n)
+    return ConfusionMatrix(labels, matrix)
+
+
+def entity_mask(
+    tables: Iterable[SpanTable], lengths: Iterable[int], mode: str = "default"
+) -> "np.ndarray":
+    """
+    return flags of tokens inside named entities of a mode
+    :param tables: tables of named entities (e.g. answers and predicts)
+    :param lengths: number of tokens of each sentence
+    :param mode: default (all named entities), known, or unknown
+    :return: flags of tokens (all sentences concatenated)
+    """
+
+    if np is None:
+        raise ImportError("confusion matrix requires numpy")
+    if mode not in MODES:
+        raise ValueError("unknown mode: {}".format(mode))
+    offsets = np.zeros(1, dtype=np.int64)
+    offsets = np.concatenate([offsets, np.cumsum(np.fromiter(lengths, np.int64))])
+    n = int(offsets[-1])
+    # +1 at the begin and -1 after the end of each named entity
+    delta = np.zeros(n + 1, dtype=np.int64)
+    for table in tables:
+        keep = np.ones(len(table), dtype=bool)
+        if mode != "default":
+            keep = np.asarray(table.known, dtype=bool) == (mode == "known")
+        base = offsets[np.asarray(table.sents, dtype=np.int64)[keep]]
+        begins = base + np.asarray(table.begins, dtype=np.int64)[keep]
+        stops = base + np.asarray(table.ends, dtype=np.int64)[keep] + 1
+        delta += np.bincount(begins, minlength=n + 1)
+        delta -= np.bincount(stops, minlength=n + 1)
+    return np.cumsum(delta[:n]) > 0
@@ -0,0 +1,122 @@
+import mmap
+import os
+from typing import IO, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from .known import KnownWordIndex
+from .stream import StreamingMiner
+
+Sentence = Tuple[List[str], List[str], List[str]]
+
+
+def _lines(
+    source: Union[str, os.PathLike, IO, mmap.mmap], encoding: str, use_mmap: bool
+) -> Iterator[str]:
+    """
+    return lines of a path, a file object or a memory map lazily
+    :param source: path, file object (text or binary) or memory map
+    :param encoding: encoding of bytes
+    :param use_mmap: if True, read a path through a memory map
+    :return: lines
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if use_mmap and os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield from _lines(mm, encoding, False)
+            else:
+                yield from _lines(f, encoding, False)
+        return
+
+    lines = iter(source.readline, b"") if isinstance(source, mmap.mmap) else source
+    for line in lines:
+        yield line.decode(encoding) if isinstance(line, bytes) else line
+
+
+def read_conll(
+    source: Union[str, os.PathLike, IO, mmap.mmap],
+    columns: Sequence[int] = (0, 1, 2),
+    sep: str = None,
+    encoding: str = "utf-8",
+    use_mmap: bool = True,
+) -> Iterator[Sentence]:
+    """
+    read a CoNLL-style file sentence by sentence
+    (one token per line, sentences separated by blank lines.
+    '-DOCSTART-' lines are also treated as sentence boundaries.)
+    :param source: path, file object (text or binary) or memory map
+    :param columns: column indexes of morph, answer label and predict label
+    :param sep: column separator (whitespace if None)
+    :param encoding: encoding of the file
+    :param use_mmap: if True, read a path through a memory map
+    :return: (morphs, answer labels, predict labels) of each sentence
+    """
+
+    morph_col, answer_col, predict_col = columns
+    morphs, answers, predicts = [], [], []
+    for line in _lines(source, encoding, use_mmap):
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("-DOCSTART-"):
+            if morphs:
+                yield morphs, answers, predicts
+                morphs, answers, predicts = [], [], []
+            continue
+        fields = line.split(sep)
+        try:
+            morphs.append(fields[morph_col])
+            answers.append(fields[answer_col])
+            predicts.append(fields[predict_col])
+        except IndexError:
+            raise ValueError("too few columns: {!r}".format(line)) from None
+    if morphs:
+        yield morphs, answers, predicts
+
+
+def iter_batches(
+    sentences: Iterable[Sentence], batch_size: int = 1000
+) -> Iterator[Tuple[List[List[str]], List[List[str]], List[List[str]]]]:
+    """
+    group sentences into batches
+    :param sentences: (morphs, answer labels, predict labels) of each sentence
+    :param batch_size: number of sentences of a batch
+    :return: (answers, predicts, sentences) of each batch
+    """
+
+    answers, predicts, morphs = [], [], []
+    for sentence, answer, predict in sentences:
+        morphs.append(sentence)
+        answers.append(answer)
+        predicts.append(predict)
+        if len(morphs) >= batch_size:
+            yield answers, predicts, morphs
+            answers, predicts, morphs = [], [], []
+    if morphs:
+        yield answers, predicts, morphs
+
+
+def evaluate_conll(
+    source: Union[str, os.PathLike, IO, mmap.mmap],
+    known_words: Union[Dict[str, List[str]], KnownWordIndex] = None,
+    columns: Sequence[int] = (0, 1, 2),
+    sep: str = None,
+    encoding: str = "utf-8",
+    batch_size: int = 1000,
+    scorer: str = "python",
+) -> StreamingMiner:
+    """
+    evaluate a CoNLL-style file in bounded memory
+    :param source: path, file object (text or binary) or memory map
+    :param known_words: known words of each label or KnownWordIndex
+    :param columns: column indexes of morph, answer label and predict label
+    :param sep: column separator (whitespace if None)
+    :param encoding: encoding of the file
+    :param batch_size: number of sentences decoded at once
+    :param scorer: backend to count matched named entities
+    :return: evaluator fed with all sentences of the file
+    """
+
+    miner = StreamingMiner(known_words, scorer)
+    sentences = read_conll(source, columns, sep, encoding)
+    for answers, predicts, morphs in iter_batches(sentences, batch_size):
+        miner.update(answers, predicts, morphs)
+    return miner
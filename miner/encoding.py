@@ -0,0 +1,163 @@
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, List, Set, Union
+
+from .backend import PREFIXES
+
+# prefix code of labels whose prefix is not in PREFIXES
+OTHER = len(PREFIXES)
+
+
+class LabelVocab:
+    def __init__(self, labels: Iterable[str] = ()):
+        """
+        vocabulary of labels. each label id is mapped to
+        a prefix code (index of PREFIXES) and a type id.
+        label id 0 is always 'O'.
+        :param labels: labels to register
+        """
+
+        self.labels: List[str] = []
+        self.label_ids = {}
+        self.types: List[str] = []
+        self.type_ids = {}
+        self.prefix_of = array("B")
+        self.type_of = array("H")
+        self.add("O")
+        for label in labels:
+            self.add(label)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, label: str) -> int:
+        """
+        register a label
+        :param label: label (e.g. 'B-PSN')
+        :return: label id
+        """
+
+        label_id = self.label_ids.get(label)
+        if label_id is not None:
+            return label_id
+        label_id = len(self.labels)
+        if label_id > 0xFFFF:
+            raise ValueError("too many labels to encode: {}".format(label))
+        type_ = label.split("-")[-1]
+        if type_ not in self.type_ids:
+            self.type_ids[type_] = len(self.types)
+            self.types.append(type_)
+        self.labels.append(label)
+        self.label_ids[label] = label_id
+        self.prefix_of.append(
+            PREFIXES.index(label[0]) if label[0] in PREFIXES else OTHER
+        )
+        self.type_of.append(self.type_ids[type_])
+        return label_id
+
+    def encode(self, labels: Iterable[str]) -> array:
+        """
+        encode labels to label ids
+        :param labels: labels [label0, label1, ... ]
+        :return: label ids (array('H'))
+        """
+
+        ids = self.label_ids
+        return array("H", [ids[x] if x in ids else self.add(x) for x in labels])
+
+    def decode(self, label_ids: Iterable[int]) -> List[str]:
+        """
+        decode label ids to labels
+        :param label_ids: label ids
+        :return: labels [label0, label1, ... ]
+        """
+
+        labels = self.labels
+        return [labels[i] for i in label_ids]
+
+
+class EncodedCorpus(Sequence):
+    def __init__(self, tags, offsets, vocab: LabelVocab):
+        """
+        labels list stored as flat label ids and sentence offsets.
+        it behaves as a read-only labels list [[labels0], [labels1], ... ].
+        :param tags: label ids of all sentences concatenated
+                     (array('H') or NumPy uint16 array)
+        :param offsets: begin index of each sentence in tags, followed by
+                        len(tags) (array('l') or NumPy int64 array)
+        :param vocab: vocabulary of the label ids
+        """
+
+        if len(offsets) == 0 or offsets[-1] != len(tags):
+            raise ValueError("offsets must end with the number of tags")
+        self.tags = tags
+        self.offsets = offsets
+        self.vocab = vocab
+
+    @classmethod
+    def from_labels(
+        cls, seqs: Iterable[List[str]], vocab: LabelVocab = None
+    ) -> "EncodedCorpus":
+        """
+        encode labels list
+        :param seqs: labels list [[labels0], [labels1], ... ]
+        :param vocab: vocabulary (a new one if None)
+        :return: encoded labels list
+        """
+
+        vocab = LabelVocab() if vocab is None else vocab
+        tags = array("H")
+        offsets = array("l", [0])
+        for seq in seqs:
+            tags.extend(vocab.encode(seq))
+            offsets.append(len(tags))
+        return cls(tags, offsets, vocab)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[List[str], List[List[str]]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("sentence index out of range")
+        begin, end = self.offsets[idx], self.offsets[idx + 1]
+        return self.vocab.decode(self.tags[begin:end])
+
+    def subcorpus(self, start: int, stop: int) -> "EncodedCorpus":
+        """
+        return sentences [start, stop) as an encoded labels list
+        :param start: index of the first sentence
+        :param stop: index after the last sentence
+        :return: encoded labels list sharing the vocabulary
+        """
+
+        begin, end = self.offsets[start], self.offsets[stop]
+        offsets = array("l", [offset - begin for offset in self.offsets[start:stop]])
+        offsets.append(end - begin)
+        return EncodedCorpus(self.tags[begin:end], offsets, self.vocab)
+
+    def types(self) -> Set[str]:
+        """
+        return NER label types appearing in the labels list
+        :return: NER label types
+        """
+
+        used = set(self.tags)
+        return {
+            self.vocab.types[self.vocab.type_of[i]]
+            for i in used
+            if self.vocab.labels[i] != "O"
+        }
+
+    def nbytes(self) -> int:
+        """
+        return size of the label ids and the sentence offsets in bytes
+        :return: bytes
+        """
+
+        return sum(
+            len(column) * column.itemsize for column in (self.tags, self.offsets)
+        )
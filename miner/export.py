@@ -0,0 +1,246 @@
+import json
+import os
+from array import array
+from itertools import chain
+from typing import IO, Dict, Iterator, List, Union
+
+from .analysis import CATEGORIES, EXACT, MISSED, SOURCES, SPURIOUS, classify_spans
+from .scoring import match_spans, span_key_widths, span_keys
+from .spans import SpanTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# column name -> dtype
+COLUMNS = {
+    "sentence": "int32",
+    "begin": "int32",
+    "end": "int32",
+    "type": "int16",
+    "known": "int8",
+    "source": "int8",
+    "category": "int8",
+    "surface": "int32",
+}
+# array.array typecodes of the dtypes (columns without numpy)
+_TYPECODES = {"int32": "i", "int16": "h", "int8": "b"}
+# rows decoded per chunk by records()
+_CHUNK = 65536
+
+
+def _pack_strings(strings: List[str]) -> Dict[str, "np.ndarray"]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return {
+        "data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "offsets": offsets,
+    }
+
+
+def _unpack_strings(data: "np.ndarray", offsets: "np.ndarray") -> List[str]:
+    blob = data.tobytes()
+    bounds = offsets.tolist()
+    return [blob[begin:stop].decode("utf-8") for begin, stop in zip(bounds, bounds[1:])]
+
+
+class SpanExport:
+    def __init__(
+        self, columns: Dict[str, "np.ndarray"], types: List[str], surfaces: List[str]
+    ):
+        """
+        columnar table of answer and predicted named entities
+        :param columns: {'sentence': sentence indexes, 'begin': begin indexes,
+                         'end': end indexes, 'type': type ids,
+                         'known': known flags,
+                         'source': 0 (answer) or 1 (predict),
+                         'category': index of CATEGORIES,
+                         'surface': ids of surface strings}
+                        (NumPy arrays, or array.array without NumPy)
+        :param types: NER label types of the type ids
+        :param surfaces: interned surface strings of the surface ids
+        """
+
+        self.columns = columns
+        self.types = types
+        self.surfaces = surfaces
+
+    def __len__(self) -> int:
+        return len(self.columns["sentence"])
+
+    def save(self, path: Union[str, os.PathLike], compress: bool = False):
+        """
+        write the table to a NumPy .npz file (loadable without pickle)
+        :param path: file path
+        :param compress: if True, compress the columns
+        """
+
+        if np is None:
+            raise ImportError("npz export requires numpy")
+        arrays = {"column_" + name: column for name, column in self.columns.items()}
+        for name, strings in (("types", self.types), ("surfaces", self.surfaces)):
+            for key, values in _pack_strings(strings).items():
+                arrays[name + "_" + key] = values
+        (np.savez_compressed if compress else np.savez)(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "SpanExport":
+        """
+        read a table written by save()
+        :param path: file path
+        :return: table
+        """
+
+        if np is None:
+            raise ImportError("npz export requires numpy")
+        with np.load(path, allow_pickle=False) as f:
+            columns = {name: f["column_" + name] for name in COLUMNS}
+            types = _unpack_strings(f["types_data"], f["types_offsets"])
+            surfaces = _unpack_strings(f["surfaces_data"], f["surfaces_offsets"])
+        return cls(columns, types, surfaces)
+
+    def records(self) -> Iterator[Dict[str, Union[int, str, bool]]]:
+        """
+        iterate named entities as dictionaries
+        :return: {'sentence': index, 'begin': index, 'end': index, 'type': type,
+                  'known': flag, 'source': 'answer' or 'predict',
+                  'category': category, 'surface': string}, ...
+        """
+
+        types, surfaces = self.types, self.surfaces
+        for start in range(0, len(self), _CHUNK):
+            stop = start + _CHUNK
+            chunk = [self.columns[name][start:stop].tolist() for name in COLUMNS]
+            for sent, begin, end, type_, known, source, category, surface in zip(
+                *chunk
+            ):
+                yield {
+                    "sentence": sent,
+                    "begin": begin,
+                    "end": end,
+                    "type": types[type_],
+                    "known": bool(known),
+                    "source": SOURCES[source],
+                    "category": CATEGORIES[category],
+                    "surface": surfaces[surface],
+                }
+
+    def write_jsonl(self, file: Union[str, os.PathLike, IO[str]]) -> int:
+        """
+        stream named entities as JSON lines
+        :param file: path or text file object
+        :return: number of written lines
+        """
+
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "w", encoding="utf-8") as f:
+                return self.write_jsonl(f)
+        # strings are encoded once and rows are written with a template
+        # (same output as json.dumps of each record)
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        texts = [
+            [dumps(s) for s in strings]
+            for strings in (self.types, SOURCES, CATEGORIES, self.surfaces)
+        ]
+        texts.insert(1, ["false", "true"])
+        line = (
+            '{{"sentence": {}, "begin": {}, "end": {}, "type": {}, "known": {}, '
+            '"source": {}, "category": {}, "surface": {}}}\n'
+        ).format
+        n = 0
+        for start in range(0, len(self), _CHUNK):
+            stop = start + _CHUNK
+            chunk = [self.columns[name][start:stop].tolist() for name in COLUMNS]
+            sents, begins, ends = chunk[:3]
+            strings = [
+                map(text.__getitem__, ids) for text, ids in zip(texts, chunk[3:])
+            ]
+            file.write("".join(map(line, sents, begins, ends, *strings)))
+            n += len(sents)
+        return n
+
+
+def _match_codes(answers: SpanTable, predicts: SpanTable):
+    """
+    return categories of answer and predicted named entities
+    only by exact matching (exact, missed, or spurious)
+    """
+
+    widths = None if np is None else span_key_widths(answers, predicts)
+    if widths is None:
+        ans_matched, pred_matched = match_spans(answers, predicts)
+        return (
+            array("b", [EXACT if m else MISSED for m in ans_matched]),
+            array("b", [EXACT if m else SPURIOUS for m in pred_matched]),
+        )
+    ans_keys = span_keys(answers, widths)
+    pred_keys = span_keys(predicts, widths)
+    matched = [
+        np.isin(ans_keys, pred_keys, assume_unique=True),
+        np.isin(pred_keys, ans_keys, assume_unique=True),
+    ]
+    return (
+        np.where(matched[0], EXACT, MISSED),
+        np.where(matched[1], EXACT, SPURIOUS),
+    )
+
+
+def export_spans(
+    answers: SpanTable,
+    predicts: SpanTable,
+    sentences: List[List[str]],
+    sep: str = "",
+    classify: bool = False,
+) -> SpanExport:
+    """
+    build a columnar table of answer and predicted named entities
+    without nested dictionaries
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param sep: separator to join morphs of a surface string
+    :param classify: if True, unmatched named entities are classified into
+                     boundary and type errors (see ErrorIndex, slower).
+                     if False, categories are exact, missed, or spurious
+    :return: columnar table (answers first, then predicts)
+    """
+
+    if classify:
+        codes = classify_spans(answers, predicts)
+    else:
+        codes = _match_codes(answers, predicts)
+    interned: Dict[str, int] = {}
+
+    def surface_ids(table: SpanTable) -> Iterator[int]:
+        for sent, begin, end in zip(table.sents, table.begins, table.ends):
+            stop = end + 1
+            surface = sep.join(sentences[sent][begin:stop])
+            yield interned.setdefault(surface, len(interned))
+
+    columns = {name: [] for name in COLUMNS}
+    for source, (table, category) in enumerate(zip((answers, predicts), codes)):
+        for name, values in (
+            ("sentence", table.sents),
+            ("begin", table.begins),
+            ("end", table.ends),
+            ("type", table.type_col),
+            ("known", table.known),
+            ("source", array("b", [source]) * len(table)),
+            ("category", category),
+            ("surface", array("q", surface_ids(table))),
+        ):
+            columns[name].append(values)
+    if np is None:
+        columns = {
+            name: array(_TYPECODES[COLUMNS[name]], chain.from_iterable(parts))
+            for name, parts in columns.items()
+        }
+    else:
+        columns = {
+            name: np.concatenate([np.asarray(p, dtype=COLUMNS[name]) for p in parts])
+            for name, parts in columns.items()
+        }
+    return SpanExport(columns, answers.types, list(interned))
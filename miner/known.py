@@ -0,0 +1,107 @@
+from collections.abc import Mapping
+from typing import Dict, FrozenSet, Iterable, Iterator, Sequence, Tuple
+
+EMPTY: FrozenSet[str] = frozenset()
+
+
+class KnownWordIndex(Mapping):
+    def __init__(
+        self, known_words: Dict[str, Iterable[str]] = None, trie: bool = False
+    ):
+        """
+        hashed index of known words
+        (build it once and share it between Miner instances. it is pickleable.)
+        :param known_words: known words of each label
+                            {'label0': [word0, word1, ... ],
+                            'label1': [word0, word1, ... ],
+                            ... }
+                            words of 'overall' are known words of any type.
+        :param trie: if True, also build a trie to look up a named entity
+                     from its morphs without joining them
+        """
+
+        known_words = {} if known_words is None else known_words
+        self.words = {
+            type_: frozenset(words)
+            for type_, words in known_words.items()
+            if type_ != "overall"
+        }
+        self.overall = frozenset(
+            word for words in known_words.values() for word in words
+        )
+        self.trie = self._build_trie() if trie else None
+
+    def __getitem__(self, type_: str) -> FrozenSet[str]:
+        if type_ == "overall":
+            return self.overall
+        return self.words[type_]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.words
+        yield "overall"
+
+    def __len__(self) -> int:
+        return len(self.words) + 1
+
+    def __bool__(self) -> bool:
+        return bool(self.overall)
+
+    def is_known(self, word: str, type_: str) -> bool:
+        """
+        check if a named entity is a known word
+        :param word: a named entity
+        :param type_: NER label type or 'overall'
+        :return: known -> True, unknown -> False
+        """
+
+        if type_ == "overall":
+            return word in self.overall
+        return word in self.words.get(type_, EMPTY)
+
+    def flags(self, morphs: Sequence[str], type_: str) -> Tuple[bool, bool]:
+        """
+        check if a named entity is a known word of its type and of any type
+        :param morphs: morphs of a named entity
+        :param type_: NER label type
+        :return: known flag of the type, known flag of any type
+        """
+
+        if self.trie is not None:
+            types = self._trie_lookup(morphs)
+            return type_ in types, bool(types)
+        word = "".join(morphs)
+        return word in self.words.get(type_, EMPTY), word in self.overall
+
+    def _build_trie(self) -> dict:
+        """
+        build a character trie of known words.
+        a node maps characters to child nodes,
+        and '' to types of the word ending at the node.
+        :return: root node
+        """
+
+        root = {}
+        entries = list(self.words.items())
+        entries.append(("overall", self.overall))
+        for type_, words in entries:
+            for word in words:
+                node = root
+                for char in word:
+                    node = node.setdefault(char, {})
+                node[""] = node.get("", EMPTY) | {type_}
+        return root
+
+    def _trie_lookup(self, morphs: Sequence[str]) -> FrozenSet[str]:
+        """
+        return types of which the joined morphs are a known word
+        :param morphs: morphs of a named entity
+        :return: types (including 'overall')
+        """
+
+        node = self.trie
+        for morph in morphs:
+            for char in morph:
+                node = node.get(char)
+                if node is None:
+                    return EMPTY
+        return node.get("", EMPTY)
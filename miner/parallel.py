@@ -0,0 +1,126 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Union
+
+from .encoding import EncodedCorpus
+from .known import KnownWordIndex
+from .scoring import Counts, count_spans
+from .spans import SpanTable, decode
+
+# corpus given to a worker process by _init_worker
+_shared = None
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """
+    return number of processes
+    :param n_jobs: number of processes (-1 means all CPUs)
+    :return: number of processes
+    """
+
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def shard_bounds(n: int, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    split sentence indexes into contiguous shards
+    :param n: number of sentences
+    :param n_shards: number of shards
+    :return: [(start, stop), (start, stop), ... ]
+    """
+
+    n_shards = max(min(n_shards, n), 1)
+    size, rest = divmod(n, n_shards)
+    bounds = []
+    start = 0
+    for i in range(n_shards):
+        stop = start + size + (1 if i < rest else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _select(seqs: Union[List[List[str]], EncodedCorpus], start: int, stop: int):
+    if isinstance(seqs, EncodedCorpus):
+        return seqs.subcorpus(start, stop)
+    return seqs[start:stop]
+
+
+def count_shard(
+    answers: Union[List[List[str]], EncodedCorpus, SpanTable],
+    predicts: Union[List[List[str]], EncodedCorpus],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex,
+    scorer: str,
+    start: int,
+    stop: int,
+) -> Counts:
+    """
+    decode and count named entities of sentences [start, stop)
+    (answers may be decoded already, e.g. loaded from a cache)
+    :return: counters of the shard
+    """
+
+    morphs = sentences[start:stop]
+    if isinstance(answers, SpanTable):
+        ans_table = answers.subtable(start, stop)
+        type_ids = ans_table.type_ids
+    else:
+        type_ids = {}
+        ans_table = decode(_select(answers, start, stop), morphs, known_words, type_ids)
+    pred_table = decode(_select(predicts, start, stop), morphs, known_words, type_ids)
+    return count_spans(ans_table, pred_table, scorer)
+
+
+def _init_worker(*corpus):
+    global _shared
+    _shared = corpus
+
+
+def _count_worker(bounds: Tuple[int, int]) -> Counts:
+    return count_shard(*_shared, *bounds)
+
+
+def parallel_counts(
+    answers: Union[List[List[str]], EncodedCorpus, SpanTable],
+    predicts: Union[List[List[str]], EncodedCorpus],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex,
+    n_jobs: int = -1,
+    scorer: str = "python",
+    shards_per_job: int = 4,
+) -> Counts:
+    """
+    count named entities with sentences sharded across a process pool.
+    counters of the shards are summed, so the result is identical to
+    the serial count.
+    :param answers: answer labels list, EncodedCorpus,
+                    or table of decoded answer named entities
+    :param predicts: predict labels list or EncodedCorpus
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :param n_jobs: number of processes (-1 means all CPUs)
+    :param scorer: backend to count matched named entities
+    :param shards_per_job: number of shards per process
+    :return: counters
+    """
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    bounds = shard_bounds(len(sentences), n_jobs * shards_per_job)
+    corpus = (answers, predicts, sentences, known_words, scorer)
+    counts = Counts()
+    if n_jobs == 1:
+        for start, stop in bounds:
+            counts += count_shard(*corpus, start, stop)
+        return counts
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=_init_worker, initargs=corpus
+    ) as executor:
+        for shard_counts in executor.map(_count_worker, bounds):
+            counts += shard_counts
+    return counts
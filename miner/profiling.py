@@ -0,0 +1,157 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Union
+
+# callback of a finished stage: (stage name, seconds, tokens, spans)
+StageCallback = Callable[[str, float, int, int], None]
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("miner_profile", default=None)
+
+
+class Profile:
+    def __init__(self, callback: StageCallback = None):
+        """
+        per-stage wall time, call counts, processed tokens and decoded spans
+        recorded while the profile is active (see profile())
+        :param callback: function called when a stage finishes
+                         callback(stage name, seconds, tokens, spans)
+        """
+
+        self.callback = callback
+        self.stages: Dict[str, Dict[str, Union[float, int]]] = {}
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, tokens: int = 0, spans: int = 0):
+        """
+        add a call of a stage
+        :param name: stage name
+        :param seconds: wall time
+        :param tokens: number of processed tokens
+        :param spans: number of decoded named entities
+        """
+
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {
+                    "seconds": 0.0,
+                    "calls": 0,
+                    "tokens": 0,
+                    "spans": 0,
+                }
+            stage["seconds"] += seconds
+            stage["calls"] += 1
+            stage["tokens"] += tokens
+            stage["spans"] += spans
+        if self.callback is not None:
+            self.callback(name, seconds, tokens, spans)
+
+    def as_dict(self) -> Dict[str, object]:
+        """
+        return measurements as a structured dictionary
+        :return: {'seconds': wall time of the profile,
+                  'stages': {'stage': {'seconds': wall time, 'calls': num,
+                                       'tokens': num, 'spans': num}, ... }}
+        """
+
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+        return {"seconds": self.seconds, "stages": stages}
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "start", "tokens", "spans")
+
+    def __init__(self, profile: Profile, name: str):
+        self.profile = profile
+        self.name = name
+        self.tokens = 0
+        self.spans = 0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.profile.record(self.name, seconds, self.tokens, self.spans)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def add(self, tokens: int = 0, spans: int = 0):
+        """
+        add processed tokens and decoded spans to the stage
+        :param tokens: number of processed tokens
+        :param spans: number of decoded named entities
+        """
+
+        self.tokens += tokens
+        self.spans += spans
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __bool__(self) -> bool:
+        return False
+
+    def add(self, tokens: int = 0, spans: int = 0):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> Union[_Stage, _NullStage]:
+    """
+    measure a stage if a profile is active.
+    the returned object is falsy when profiling is disabled,
+    so that counting tokens can be skipped:
+
+        with stage("decode") as timer:
+            ...
+            if timer:
+                timer.add(tokens=n_tokens, spans=n_spans)
+
+    :param name: stage name
+    :return: context manager
+    """
+
+    current = _current.get()
+    if current is None:
+        return _NULL_STAGE
+    return _Stage(current, name)
+
+
+@contextmanager
+def profile(callback: StageCallback = None) -> Iterator[Profile]:
+    """
+    record stages of evaluation in this block
+
+        with profile() as prof:
+            miner.default_report()
+        prof.as_dict()
+
+    :param callback: function called when a stage finishes
+                     callback(stage name, seconds, tokens, spans)
+    :return: profile
+    """
+
+    prof = Profile(callback)
+    token = _current.set(prof)
+    start = time.perf_counter()
+    try:
+        yield prof
+    finally:
+        prof.seconds += time.perf_counter() - start
+        _current.reset(token)
@@ -0,0 +1,182 @@
+from typing import Dict, List, Tuple, Union
+
+from .scoring import MODES
+from .spans import SpanTable, overlap_pairs
+
+# SemEval style evaluation schemes
+SCHEMES = ("strict", "exact", "partial", "type")
+OUTCOMES = ("correct", "incorrect", "partial", "missed", "spurious")
+COR, INC, PAR, MIS, SPU = range(len(OUTCOMES))
+# a counter row has 4 fields (correct, incorrect, partial, missed or spurious)
+# for known answers, unknown answers, known predicts and unknown predicts
+ROW_SIZE = 16
+
+
+def pair_outcomes(same_span: bool, same_type: bool) -> Tuple[int, int, int, int]:
+    """
+    return outcome of an overlapping pair of named entities in each scheme
+    :param same_span: both have the same begin and end index
+    :param same_type: both have the same type
+    :return: outcomes of strict, exact, partial and type
+    """
+
+    return (
+        COR if same_span and same_type else INC,
+        COR if same_span else INC,
+        COR if same_span else PAR,
+        COR if same_type else INC,
+    )
+
+
+class RelaxedCounts:
+    def __init__(self):
+        """
+        additive counters of outcomes of answer and predicted named entities
+        in each scheme and NER label type (and 'overall'),
+        split into known and unknown named entities
+        """
+
+        self.table: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(self, scheme: str, type_: str, outcome: int, source: int, known: bool):
+        """
+        add to a counter
+        :param scheme: strict, exact, partial, or type
+        :param type_: NER label type or 'overall'
+        :param outcome: COR, INC, PAR, MIS (answers) or SPU (predicts)
+        :param source: 0 (answers) or 1 (predicts)
+        :param known: known named entity or not
+        """
+
+        row = self.table.get((scheme, type_))
+        if row is None:
+            row = self.table[scheme, type_] = [0] * ROW_SIZE
+        field = MIS if outcome == SPU else outcome
+        row[source * 8 + (0 if known else 4) + field] += 1
+
+    def get(
+        self, scheme: str, type_: str, mode: str = "default"
+    ) -> Tuple[List[int], List[int]]:
+        """
+        return counters of a scheme and NER label type
+        :param scheme: strict, exact, partial, or type
+        :param type_: NER label type or 'overall'
+        :param mode: default, known, or unknown
+        :return: [correct, incorrect, partial, missed] of answers,
+                 [correct, incorrect, partial, spurious] of predicts
+        """
+
+        row = self.table.get((scheme, type_), [0] * ROW_SIZE)
+        halves = [0, 4] if mode == "default" else [0 if mode == "known" else 4]
+        return tuple(
+            [sum(row[source + half + i] for half in halves) for i in range(4)]
+            for source in (0, 8)
+        )
+
+    def merge(self, other: "RelaxedCounts") -> "RelaxedCounts":
+        """
+        add counters of other
+        :param other: counters
+        :return: self
+        """
+
+        for key, row in other.table.items():
+            mine = self.table.setdefault(key, [0] * ROW_SIZE)
+            for i, n in enumerate(row):
+                mine[i] += n
+        return self
+
+    def __iadd__(self, other: "RelaxedCounts") -> "RelaxedCounts":
+        return self.merge(other)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RelaxedCounts):
+            return NotImplemented
+        keys = set(self.table) | set(other.table)
+        return all(
+            self.get(s, t, m) == other.get(s, t, m) for s, t in keys for m in MODES
+        )
+
+
+def relaxed_counts(answers: SpanTable, predicts: SpanTable) -> RelaxedCounts:
+    """
+    count outcomes of answer and predicted named entities in all schemes
+    from a single sweep over overlapping named entities.
+    a named entity takes the best outcome among the named entities
+    overlapping it (correct > partial > incorrect),
+    and is missed / spurious when nothing overlaps it.
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :return: counters
+    """
+
+    outcomes = (
+        [[MIS] * len(SCHEMES) for _ in range(len(answers))],
+        [[SPU] * len(SCHEMES) for _ in range(len(predicts))],
+    )
+    for ans_row, pred_row in overlap_pairs(answers, predicts):
+        same_span = (
+            answers.begins[ans_row] == predicts.begins[pred_row]
+            and answers.ends[ans_row] == predicts.ends[pred_row]
+        )
+        same_type = answers.type_col[ans_row] == predicts.type_col[pred_row]
+        pair = pair_outcomes(same_span, same_type)
+        for best in (outcomes[0][ans_row], outcomes[1][pred_row]):
+            for i, outcome in enumerate(pair):
+                # INC and PAR never occur in the same scheme
+                if outcome < best[i]:
+                    best[i] = outcome
+
+    counts = RelaxedCounts()
+    types = answers.types
+    for source, table in enumerate((answers, predicts)):
+        for row, (_, _, _, type_id, known, known_overall) in enumerate(table.rows()):
+            type_ = types[type_id]
+            for scheme, outcome in zip(SCHEMES, outcomes[source][row]):
+                counts.add(scheme, type_, outcome, source, known)
+                counts.add(scheme, "overall", outcome, source, known_overall)
+    return counts
+
+
+def build_relaxed_report(
+    counts: RelaxedCounts, types: List[str], mode: str = "default"
+) -> Dict[str, Dict[str, Dict[str, Union[float, int]]]]:
+    """
+    return reports of named entity recognition in all schemes
+    (partial matches count as half correct)
+    :param counts: counters
+    :param types: NER label types to report (including 'overall')
+    :param mode: default, known, or unknown
+    :return: {'strict': {'label0': {'precision': precision param,
+                                    'recall': recall param,
+                                    'f1_score': f-measure,
+                                    'num': number of answer named entities,
+                                    'correct': num, 'incorrect': num,
+                                    'partial': num, 'missed': num,
+                                    'spurious': num}, ... },
+              'exact': {...}, 'partial': {...}, 'type': {...}}
+    """
+
+    reports = {}
+    for scheme in SCHEMES:
+        report = reports[scheme] = {}
+        for type_ in types:
+            ans, pred = counts.get(scheme, type_, mode)
+            possible, actual = sum(ans), sum(pred)
+            p = (pred[COR] + 0.5 * pred[PAR]) / actual if actual > 0 else 0.0
+            r = (ans[COR] + 0.5 * ans[PAR]) / possible if possible > 0 else 0.0
+            f1 = 2 * p * r / (p + r) if p + r > 0 else 0
+            report[type_] = {
+                "precision": p,
+                "recall": r,
+                "f1_score": f1,
+                "num": possible,
+                "correct": ans[COR],
+                "incorrect": ans[INC],
+                "partial": ans[PAR],
+                "missed": ans[MIS],
+                # spurious predicts share the field of missed answers
+                "spurious": pred[MIS],
+            }
+    return reports
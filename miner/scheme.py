@@ -0,0 +1,198 @@
+from typing import Dict, List, Union
+
+from .backend import PREFIXES, encoded_entity_spans
+from .encoding import EncodedCorpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+P_O, P_B, P_I, P_E, P_S, P_L, P_U = range(len(PREFIXES))
+# prefixes of (single label, first label, inside label, last label)
+SCHEMES = {
+    "IOB2": (P_B, P_B, P_I, P_I),
+    "BIOES": (P_S, P_B, P_I, P_E),
+    "BIOUL": (P_U, P_B, P_I, P_L),
+}
+POLICIES = ("begin", "outside")
+
+
+def _tables(scheme: str):
+    """
+    return prefix sets of a scheme as lookup tables over prefix codes
+    (prefix codes of PREFIXES, and len(PREFIXES) for other prefixes)
+    :return: allowed prefixes, prefixes continuing an entity,
+             prefixes which can be continued, prefixes which must be continued
+    """
+
+    if scheme not in SCHEMES:
+        raise ValueError("unknown scheme: {}".format(scheme))
+    single, first, inside, last = SCHEMES[scheme]
+
+    def table(*codes):
+        mask = np.zeros(len(PREFIXES) + 1, dtype=bool)
+        mask[list(codes)] = True
+        return mask
+
+    allowed = table(P_O, single, first, inside, last)
+    continuing = table(inside, last)
+    continuable = table(first, inside)
+    # entities of IOB2 can end at any label
+    unfinished = table(first, inside) if last != inside else table()
+    return allowed, continuing, continuable, unfinished
+
+
+def _encode(seqs: Union[List[List[str]], EncodedCorpus]) -> EncodedCorpus:
+    if isinstance(seqs, EncodedCorpus):
+        return seqs
+    return EncodedCorpus.from_labels(seqs)
+
+
+def invalid_transitions(
+    seqs: Union[List[List[str]], EncodedCorpus], scheme: str = "IOB2"
+) -> "np.ndarray":
+    """
+    return invalid transitions of a tagging scheme
+    (e.g. 'I-X' after 'O', 'I-Y' after 'B-X', or 'B-X' of BIOES
+    not followed by 'I-X' or 'E-X').
+    a label is invalid when it is not a label of the scheme,
+    when it continues no named entity of the same type,
+    or when it leaves a named entity of the scheme unfinished.
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param scheme: IOB2, BIOES, or BIOUL
+    :return: flags of invalid labels of all sentences concatenated (bool array)
+    """
+
+    if np is None:
+        raise ImportError("scheme validation requires numpy")
+    allowed, continuing, continuable, unfinished = _tables(scheme)
+    corpus = _encode(seqs)
+    vocab = corpus.vocab
+    tags = np.asarray(corpus.tags, dtype=np.int64)
+    offsets = np.asarray(corpus.offsets, dtype=np.int64)
+    tops = np.asarray(vocab.prefix_of, dtype=np.int64)[tags]
+    types = np.asarray(vocab.type_of, dtype=np.int64)[tags]
+    n = len(tags)
+
+    # neighbours across sentence boundaries are regarded as 'O'
+    inner = np.ones(n, dtype=bool)
+    inner[offsets[:-1][np.diff(offsets) > 0]] = False
+    prev_top = np.full(n, P_O, dtype=np.int64)
+    prev_top[1:] = tops[:-1]
+    prev_top[~inner] = P_O
+    same_type = np.zeros(n, dtype=bool)
+    same_type[1:] = types[1:] == types[:-1]
+    same_type &= inner
+    next_top = np.full(n, P_O, dtype=np.int64)
+    next_top[:-1] = np.where(inner[1:], tops[1:], P_O)
+    next_same_type = np.zeros(n, dtype=bool)
+    next_same_type[:-1] = same_type[1:]
+
+    invalid = ~allowed[tops]
+    # continuing labels need a continuable label of the same type before them
+    invalid |= continuing[tops] & ~(continuable[prev_top] & same_type)
+    # unfinished labels need a continuing label of the same type after them
+    invalid |= unfinished[tops] & ~(continuing[next_top] & next_same_type)
+    return invalid
+
+
+def validate(
+    seqs: Union[List[List[str]], EncodedCorpus], scheme: str = "IOB2"
+) -> Dict[str, int]:
+    """
+    return numbers of invalid transitions of each NER label type
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param scheme: IOB2, BIOES, or BIOUL
+    :return: {'label0': num, 'label1': num, ..., 'overall': num}
+    """
+
+    corpus = _encode(seqs)
+    invalid = invalid_transitions(corpus, scheme)
+    types = np.asarray(corpus.vocab.type_of, dtype=np.int64)[
+        np.asarray(corpus.tags, dtype=np.int64)
+    ]
+    counts = np.bincount(types[invalid], minlength=len(corpus.vocab.types))
+    result = {
+        type_: int(n)
+        for type_, n in zip(corpus.vocab.types, counts.tolist())
+        if type_ != "O"
+    }
+    result = dict(sorted(result.items()))
+    result["overall"] = int(invalid.sum())
+    return result
+
+
+def repair(
+    seqs: Union[List[List[str]], EncodedCorpus],
+    scheme: str = "IOB2",
+    policy: str = "begin",
+) -> Union[List[List[str]], EncodedCorpus]:
+    """
+    rewrite labels into well-formed labels of a scheme
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param scheme: IOB2, BIOES, or BIOUL
+    :param policy: begin: keep every named entity the evaluation decodes
+                   (an entity may start with any label, as in conlleval).
+                   the evaluation of the repaired labels does not change,
+                   except that named entities overlapping an earlier one
+                   (decoded from labels mixing schemes) are dropped.
+                   outside: drop named entities which do not start
+                   with a beginning label of the scheme
+    :return: repaired labels list (EncodedCorpus sharing the vocabulary
+             if seqs is EncodedCorpus)
+    """
+
+    if np is None:
+        raise ImportError("scheme repair requires numpy")
+    if policy not in POLICIES:
+        raise ValueError("unknown policy: {}".format(policy))
+    if scheme not in SCHEMES:
+        raise ValueError("unknown scheme: {}".format(scheme))
+    single, first, inside, last = SCHEMES[scheme]
+    corpus = _encode(seqs)
+    vocab = corpus.vocab
+    tags = np.asarray(corpus.tags, dtype=np.int64)
+    offsets = np.asarray(corpus.offsets, dtype=np.int64)
+    sents, begins, ends, types = (
+        np.asarray(column, dtype=np.int64)
+        for column in encoded_entity_spans(
+            corpus.tags, vocab.prefix_of, vocab.type_of, corpus.offsets
+        )
+    )
+    begins += offsets[sents]
+    ends += offsets[sents]
+    # labels mixing schemes can be decoded into overlapping named entities
+    # (e.g. 'U-X', 'E-X'), which cannot be written as labels
+    if len(ends) > 1:
+        reach = np.maximum.accumulate(ends)
+        keep = np.ones(len(ends), dtype=bool)
+        keep[1:] = begins[1:] > reach[:-1]
+        begins, ends, types = begins[keep], ends[keep], types[keep]
+    if policy == "outside":
+        tops = np.asarray(vocab.prefix_of, dtype=np.int64)[tags[begins]]
+        keep = (tops == single) | (tops == first)
+        begins, ends, types = begins[keep], ends[keep], types[keep]
+
+    # label id of (prefix, type id) for the types of the entities
+    label_of = np.zeros((len(PREFIXES), len(vocab.types)), dtype=np.int64)
+    for t in np.unique(types).tolist():
+        for prefix in {single, first, inside, last}:
+            label_of[prefix, t] = vocab.add(PREFIXES[prefix] + "-" + vocab.types[t])
+
+    repaired = np.zeros(len(tags), dtype=np.uint16)
+    lengths = ends - begins + 1
+    inner = np.repeat(types, lengths)
+    # positions of all labels of the entities
+    shifts = np.repeat(begins - np.cumsum(lengths) + lengths, lengths)
+    positions = np.arange(len(shifts)) + shifts
+    repaired[positions] = label_of[inside, inner]
+    repaired[begins] = label_of[first, types]
+    repaired[ends] = label_of[last, types]
+    singles = begins == ends
+    repaired[begins[singles]] = label_of[single, types[singles]]
+
+    result = EncodedCorpus(repaired, corpus.offsets, vocab)
+    if isinstance(seqs, EncodedCorpus):
+        return result
+    return [result[i] for i in range(len(result))]
@@ -0,0 +1,287 @@
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from .spans import SpanTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# field offsets of a counter row
+TP, PRED, ANS = 0, 1, 2
+# a counter row has the fields for known entities, then for unknown entities
+UNKNOWN_OFFSET = 3
+MODES = ("default", "known", "unknown")
+BACKENDS = ("python", "numpy")
+
+
+class Counts:
+    def __init__(self):
+        """
+        additive counters of matched, predicted and answer named entities
+        of each NER label type (and 'overall'),
+        split into known and unknown named entities
+        """
+
+        self.table: Dict[str, List[int]] = {}
+
+    def add(self, type_: str, field: int, known: bool, n: int = 1):
+        """
+        add to a counter
+        :param type_: NER label type or 'overall'
+        :param field: TP, PRED or ANS
+        :param known: known named entity or not
+        :param n: amount
+        """
+
+        row = self.table.get(type_)
+        if row is None:
+            row = self.table[type_] = [0] * 6
+        row[field + (0 if known else UNKNOWN_OFFSET)] += n
+
+    def get(self, type_: str, mode: str = "default") -> Tuple[int, int, int]:
+        """
+        return counters of a NER label type
+        :param type_: NER label type or 'overall'
+        :param mode: default, known, or unknown
+        :return: matched num, predicted num, answer num
+        """
+
+        row = self.table.get(type_, [0] * 6)
+        u = UNKNOWN_OFFSET
+        if mode == "known":
+            return row[TP], row[PRED], row[ANS]
+        if mode == "unknown":
+            return row[u + TP], row[u + PRED], row[u + ANS]
+        return row[TP] + row[u + TP], row[PRED] + row[u + PRED], row[ANS] + row[u + ANS]
+
+    def merge(self, other: "Counts") -> "Counts":
+        """
+        add counters of other
+        :param other: counters
+        :return: self
+        """
+
+        for type_, row in other.table.items():
+            mine = self.table.setdefault(type_, [0] * 6)
+            for i, n in enumerate(row):
+                mine[i] += n
+        return self
+
+    def __iadd__(self, other: "Counts") -> "Counts":
+        return self.merge(other)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Counts):
+            return NotImplemented
+        keys = set(self.table) | set(other.table)
+        return all(self.get(k, m) == other.get(k, m) for k in keys for m in MODES)
+
+
+def match_spans(answers: SpanTable, predicts: SpanTable) -> Tuple[array, array]:
+    """
+    return matched flags of answer and predicted named entities
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :return: flags of answer named entities found in predicts,
+             flags of predicted named entities found in answers
+    """
+
+    ans_keys = set(answers.keys())
+    pred_keys = set(predicts.keys())
+    ans_matched = array("b", [key in pred_keys for key in answers.keys()])
+    pred_matched = array("b", [key in ans_keys for key in predicts.keys()])
+    return ans_matched, pred_matched
+
+
+def check_scorer(scorer: str):
+    """
+    validate a scorer option where it is passed
+    :param scorer: 'python' or 'numpy'
+    """
+
+    if scorer not in BACKENDS:
+        raise ValueError("unknown scorer: {}".format(scorer))
+    if scorer == "numpy" and np is None:
+        raise ImportError("numpy scorer requires numpy")
+
+
+def count_spans(
+    answers: SpanTable, predicts: SpanTable, backend: str = "python"
+) -> Counts:
+    """
+    count matched, predicted and answer named entities of all types at once
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :param backend: 'python' (reference) or 'numpy'
+    :return: counters
+    """
+
+    if backend == "numpy":
+        return _count_spans_numpy(answers, predicts)
+    elif backend != "python":
+        raise ValueError("unknown backend: {}".format(backend))
+
+    counts = Counts()
+    types = answers.types
+    predicted = set(predicts.keys())
+    for sent, begin, end, type_id, known, known_overall in answers.rows():
+        type_ = types[type_id]
+        counts.add(type_, ANS, known)
+        counts.add("overall", ANS, known_overall)
+        if (sent, begin, end, type_id) in predicted:
+            counts.add(type_, TP, known)
+            counts.add("overall", TP, known_overall)
+    for _, _, _, type_id, known, known_overall in predicts.rows():
+        counts.add(types[type_id], PRED, known)
+        counts.add("overall", PRED, known_overall)
+    return counts
+
+
+def span_key_widths(
+    answers: SpanTable, predicts: SpanTable
+) -> Optional[Tuple[int, int, int]]:
+    """
+    return bit widths of sentence index, begin index and end index
+    to pack identifiers of named entities of both tables by span_keys
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :return: bit widths, or None if keys do not fit in int64
+    """
+
+    def bits(*columns) -> int:
+        top = [int(np.max(np.asarray(c))) for c in columns if len(c) > 0]
+        return max(top, default=0).bit_length()
+
+    widths = (
+        bits(answers.sents, predicts.sents),
+        bits(answers.begins, predicts.begins),
+        bits(answers.ends, predicts.ends),
+    )
+    if sum(widths) + max(len(answers.types) - 1, 0).bit_length() > 63:
+        return None
+    return widths
+
+
+def span_keys(table: SpanTable, widths: Tuple[int, int, int]) -> "np.ndarray":
+    """
+    pack identifiers of named entities into int64 keys
+    (type id | sentence index | begin index | end index)
+    :param table: table of named entities
+    :param widths: bit widths of sentence index, begin index and end index
+    :return: keys
+    """
+
+    sent_bits, begin_bits, end_bits = widths
+    keys = np.asarray(table.type_col, dtype=np.int64) << sent_bits
+    keys |= np.asarray(table.sents, dtype=np.int64)
+    keys <<= begin_bits
+    keys |= np.asarray(table.begins, dtype=np.int64)
+    keys <<= end_bits
+    keys |= np.asarray(table.ends, dtype=np.int64)
+    return keys
+
+
+def _count_spans_numpy(answers: SpanTable, predicts: SpanTable) -> Counts:
+    """
+    count_spans with int64 span keys, sorted-array intersection and bincount
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+    :return: counters
+    """
+
+    if np is None:
+        raise ImportError("numpy backend requires numpy")
+
+    types = answers.types
+    widths = span_key_widths(answers, predicts)
+    if widths is None:
+        return count_spans(answers, predicts, "python")
+
+    ans_keys = span_keys(answers, widths)
+    pred_keys = span_keys(predicts, widths)
+    _, matched, _ = np.intersect1d(
+        ans_keys, pred_keys, assume_unique=True, return_indices=True
+    )
+
+    n_types = len(types)
+    counts = Counts()
+    for field, table, rows in [
+        (ANS, answers, slice(None)),
+        (PRED, predicts, slice(None)),
+        (TP, answers, matched),
+    ]:
+        type_col = np.asarray(table.type_col, dtype=np.int64)[rows]
+        # 0: known, 1: unknown
+        unknown = 1 - np.asarray(table.known, dtype=np.int64)[rows]
+        unknown_overall = 1 - np.asarray(table.known_overall, dtype=np.int64)[rows]
+        per_type = np.bincount(type_col * 2 + unknown, minlength=n_types * 2)
+        overall = np.bincount(unknown_overall, minlength=2)
+        for type_, (n_known, n_unknown) in zip(types, per_type.reshape(-1, 2).tolist()):
+            counts.add(type_, field, True, n_known)
+            counts.add(type_, field, False, n_unknown)
+        counts.add("overall", field, True, int(overall[0]))
+        counts.add("overall", field, False, int(overall[1]))
+    return counts
+
+
+def scores(correct_num: int, pred_num: int, ans_num: int) -> Tuple[float, float, float]:
+    """
+    return precision, recall and f-measure
+    :param correct_num: number of matched named entities
+    :param pred_num: number of predicted named entities
+    :param ans_num: number of answer named entities
+    :return: precision, recall, f-measure
+    """
+
+    p = correct_num / pred_num if pred_num > 0 else 0.0
+    r = correct_num / ans_num if ans_num > 0 else 0.0
+    f1 = 2 * p * r / (p + r) if p + r > 0 else 0
+    return p, r, f1
+
+
+def build_report(
+    counts: Counts, types: List[str], mode: str = "default"
+) -> Dict[str, Dict[str, Union[float, int]]]:
+    """
+    return report of named entity recognition from counters
+    :param counts: counters
+    :param types: NER label types to report (including 'overall')
+    :param mode: default, known, or unknown
+    :return: reports of NER result
+             {'label0': {'precision': precision param,
+                         'recall': recall param,
+                         'f1_score': f-measure,
+                         'num': number of answer named entities}, ... }
+    """
+
+    report = {}
+    for type_ in types:
+        correct_num, pred_num, ans_num = counts.get(type_, mode)
+        p, r, f1 = scores(correct_num, pred_num, ans_num)
+        report[type_] = {"precision": p, "recall": r, "f1_score": f1, "num": ans_num}
+    return report
+
+
+def print_report(result: Dict[str, Dict[str, float]], types: List[str]):
+    """
+    print report of NER result
+    :param result: reports of NER result
+                   {'label0': {'precision': precision param,
+                               'recall': recall param,
+                               'f1_score': f-measure,
+                               'num': number of answer named entities}, ... }
+    :param types: NER label types to print
+    """
+
+    print("\n\tprecision    recall    f1_score   num")
+    for type_ in types:
+        print(type_, end="\t")
+        print("{0: .3f}".format(result[type_]["precision"]), end="       ")
+        print("{0: .3f}".format(result[type_]["recall"]), end="    ")
+        print("{0: .3f}".format(result[type_]["f1_score"]), end="     ")
+        print("{0: d}".format(int(result[type_]["num"])), end="\n")
@@ -0,0 +1,507 @@
+"""
+evaluation server keeping answer sets and known words resident
+
+    python -m miner.server --gold dev=dev.conll --known known.json --port 8765
+    python -m miner.server --gold dev=dev.conll --unix /tmp/miner.sock --jobs 4
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .compare import MultiMiner, _score_system
+from .conll import read_conll
+from .parallel import resolve_n_jobs
+from .scoring import MODES, Counts, build_report
+
+# limit of a request line or body
+MAX_REQUEST_BYTES = 1 << 28
+
+# resident answer sets of a worker process given by _init_worker
+_shared = None
+
+Report = Dict[str, Dict[str, float]]
+
+
+def _score_batch(
+    golds: Dict[str, tuple], name: str, batch: List[List[List[str]]]
+) -> List[Union[Counts, str]]:
+    """
+    score prediction sets against one answer set
+    :return: counters, or an error message of each prediction set
+    """
+
+    results = []
+    for predicts in batch:
+        try:
+            results.append(_score_system(*golds[name], predicts))
+        except Exception as e:
+            results.append("{}: {}".format(type(e).__name__, e))
+    return results
+
+
+def _init_worker(golds: Dict[str, tuple]):
+    global _shared
+    _shared = golds
+
+
+def _score_worker(name: str, batch: List[List[List[str]]]) -> List[Union[Counts, str]]:
+    return _score_batch(_shared, name, batch)
+
+
+class EvaluationServer:
+    def __init__(
+        self,
+        golds: Dict[str, MultiMiner],
+        n_jobs: int = 1,
+        batch_size: int = 32,
+        batch_delay: float = 0.005,
+    ):
+        """
+        asyncio server scoring prediction sets against resident answer sets.
+        requests arriving within batch_delay are grouped by answer set
+        and scored together in a worker pool.
+        clients send JSON lines over TCP or a unix socket
+        (or HTTP POST /score and GET /golds):
+            {"id": 0, "gold": "dev", "predicts": [[labels], ...],
+             "modes": ["default", "unknown"]}
+            -> {"id": 0, "reports": {"default": report, "unknown": report}}
+        :param golds: {'name': MultiMiner of the answer set, ... }
+        :param n_jobs: number of worker processes (-1 means all CPUs).
+                       if 1, requests are scored in a worker thread
+        :param batch_size: maximum number of requests scored together
+        :param batch_delay: seconds to wait for requests to batch
+        """
+
+        self.golds = golds
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.address: Union[Tuple[str, int], str, None] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._executor: Optional[Executor] = None
+        self._score = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = set()
+        self._writers = set()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: str = None
+    ) -> "EvaluationServer":
+        """
+        start listening
+        :param host: host of TCP socket
+        :param port: port of TCP socket (0 means any free port)
+        :param path: path of unix socket (used instead of TCP if given)
+        :return: self (address has the bound (host, port) or path)
+        """
+
+        resident = {
+            name: (gold.answers, gold.sentences, gold.known_index, gold.scorer)
+            for name, gold in self.golds.items()
+        }
+        n_jobs = resolve_n_jobs(self.n_jobs)
+        if n_jobs <= 1:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._score = partial(_score_batch, resident)
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_init_worker, initargs=(resident,)
+            )
+            self._score = _score_worker
+        self._queue = asyncio.Queue()
+        self._spawn(self._batch_loop())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._handle, path, limit=MAX_REQUEST_BYTES
+            )
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, host, port, limit=MAX_REQUEST_BYTES
+            )
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self
+
+    async def serve_forever(self):
+        """
+        serve until cancelled
+        """
+
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        stop listening and shut down the worker pool
+        """
+
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._server = self._executor = None
+
+    async def score(
+        self, gold: str, predicts: List[List[str]], modes: Sequence[str] = ("default",)
+    ) -> Dict[str, Report]:
+        """
+        score a prediction set (batched with concurrent requests)
+        :param gold: name of the answer set
+        :param predicts: predict labels list [[labels], [labels], ...]
+        :param modes: default, known, and/or unknown
+        :return: {'mode': report (same format as Miner.default_report), ... }
+        """
+
+        if gold not in self.golds:
+            raise ValueError("unknown gold: {}".format(gold))
+        for mode in modes:
+            if mode not in MODES:
+                raise ValueError("unknown mode: {}".format(mode))
+        sentences = self.golds[gold].sentences
+        if len(predicts) != len(sentences) or any(
+            len(labels) != len(morphs) for labels, morphs in zip(predicts, sentences)
+        ):
+            raise ValueError("predicts do not match sentences of {}".format(gold))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((gold, predicts, future))
+        counts = await future
+        types = self.golds[gold].types
+        return {mode: build_report(counts, types, mode) for mode in modes}
+
+    def describe(self) -> Dict[str, Dict[str, Union[int, List[str]]]]:
+        """
+        return resident answer sets
+        :return: {'name': {'sentences': num, 'types': [types]}, ... }
+        """
+
+        return {
+            name: {"sentences": len(gold.sentences), "types": gold.types}
+            for name, gold in self.golds.items()
+        }
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+            groups: Dict[str, list] = {}
+            for request in batch:
+                groups.setdefault(request[0], []).append(request)
+            for name, requests in groups.items():
+                self._spawn(self._run_batch(name, requests))
+
+    async def _run_batch(self, name: str, requests: list):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor,
+                self._score,
+                name,
+                [predicts for _, predicts, _ in requests],
+            )
+        except Exception as e:
+            results = ["{}: {}".format(type(e).__name__, e)] * len(requests)
+        for (_, _, future), result in zip(requests, results):
+            if future.done():
+                continue
+            if isinstance(result, str):
+                future.set_exception(ValueError(result))
+            else:
+                future.set_result(result)
+
+    async def _respond(self, request: dict) -> dict:
+        response = {"id": request.get("id")} if isinstance(request, dict) else {}
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            op = request.get("op", "score")
+            if op == "golds":
+                response["golds"] = self.describe()
+            elif op == "score":
+                modes = request.get("modes", ["default"])
+                if not isinstance(modes, list) or not all(
+                    isinstance(mode, str) for mode in modes
+                ):
+                    raise ValueError("modes must be a list of strings")
+                response["reports"] = await self.score(
+                    request["gold"], request["predicts"], modes
+                )
+            else:
+                raise ValueError("unknown op: {}".format(op))
+        except KeyError as e:
+            response["error"] = "missing field: {}".format(e)
+        except (ValueError, TypeError) as e:
+            response["error"] = str(e)
+        return response
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            line = await reader.readline()
+            if line.startswith((b"GET ", b"POST ")):
+                await self._handle_http(line, reader, writer)
+                return
+            lock = asyncio.Lock()
+            pending = set()
+            while line:
+                if line.strip():
+                    # pipelined requests are answered as they are scored
+                    task = asyncio.ensure_future(self._reply(line, writer, lock))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                line = await reader.readline()
+            await asyncio.gather(*pending)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _reply(self, line: bytes, writer: asyncio.StreamWriter, lock):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"id": None, "error": "invalid JSON"}
+        else:
+            response = await self._respond(request)
+        async with lock:
+            writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+            await writer.drain()
+
+    async def _handle_http(
+        self, line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        method, target = line.decode("latin-1").split()[:2]
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if not header.strip():
+                break
+            key, _, value = header.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        status = "200 OK"
+        if method == "GET" and target == "/golds":
+            response = {"golds": self.describe()}
+        elif method == "POST" and target == "/score":
+            status, response = await self._score_http(headers, reader)
+        else:
+            status, response = "404 Not Found", {"error": "not found"}
+        if "error" in response and status == "200 OK":
+            status = "400 Bad Request"
+
+        body = json.dumps(response, ensure_ascii=False).encode()
+        writer.write(
+            "HTTP/1.1 {}\r\nContent-Type: application/json\r\n"
+            "Content-Length: {}\r\nConnection: close\r\n\r\n".format(
+                status, len(body)
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    async def _score_http(
+        self, headers: Dict[str, str], reader: asyncio.StreamReader
+    ) -> Tuple[str, dict]:
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return "400 Bad Request", {"error": "invalid Content-Length"}
+        if length > MAX_REQUEST_BYTES:
+            # rejected before reading, so that a header cannot hold the server
+            return "413 Payload Too Large", {"error": "request body too large"}
+        try:
+            body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return "400 Bad Request", {"error": "incomplete request body"}
+        try:
+            request = json.loads(body)
+        except ValueError:
+            request = None
+        response = await self._respond(request)
+        response.pop("id", None)
+        return "200 OK", response
+
+
+class EvaluationClient:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = None,
+        path: str = None,
+        timeout: float = None,
+    ):
+        """
+        blocking client of EvaluationServer (JSON lines over a socket)
+        :param host: host of TCP socket
+        :param port: port of TCP socket
+        :param path: path of unix socket (used instead of TCP if given)
+        :param timeout: socket timeout in seconds
+        """
+
+        if path is not None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(path)
+        else:
+            sock = socket.create_connection((host, port), timeout)
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+        self._next_id = 0
+
+    def __enter__(self) -> "EvaluationClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        close the connection
+        """
+
+        self._file.close()
+        self._sock.close()
+
+    def _request(self, request: dict) -> dict:
+        request["id"] = self._next_id
+        self._next_id += 1
+        self._file.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("connection closed by the server")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+
+    def golds(self) -> Dict[str, Dict[str, Union[int, List[str]]]]:
+        """
+        return answer sets of the server
+        :return: {'name': {'sentences': num, 'types': [types]}, ... }
+        """
+
+        return self._request({"op": "golds"})["golds"]
+
+    def reports(
+        self, gold: str, predicts: List[List[str]], modes: Sequence[str] = MODES
+    ) -> Dict[str, Report]:
+        """
+        score a prediction set
+        :param gold: name of the answer set
+        :param predicts: predict labels list [[labels], [labels], ...]
+        :param modes: default, known, and/or unknown
+        :return: {'mode': report, ... }
+        """
+
+        request = {"gold": gold, "predicts": predicts, "modes": list(modes)}
+        return self._request(request)["reports"]
+
+    def report(
+        self, gold: str, predicts: List[List[str]], mode: str = "default"
+    ) -> Report:
+        """
+        score a prediction set
+        :param gold: name of the answer set
+        :param predicts: predict labels list [[labels], [labels], ...]
+        :param mode: default, known, or unknown
+        :return: report (same format as Miner.default_report)
+        """
+
+        return self.reports(gold, predicts, [mode])[mode]
+
+
+def load_gold(
+    path: str,
+    known_words: Dict[str, List[str]] = None,
+    scorer: str = "python",
+    cache_dir: str = None,
+) -> MultiMiner:
+    """
+    load an answer set from a CoNLL-style file (morph and answer label per line)
+    :param path: path of the file
+    :param known_words: known words of each label
+    :param scorer: backend to count matched named entities
+    :param cache_dir: directory to keep decoded answer named entities
+    :return: answer set
+    """
+
+    sentences, answers = [], []
+    for morphs, labels, _ in read_conll(path, columns=(0, 1, 1)):
+        sentences.append(morphs)
+        answers.append(labels)
+    return MultiMiner(answers, sentences, known_words, scorer, cache_dir=cache_dir)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--gold", action="append", required=True, help="name=path of an answer set"
+    )
+    parser.add_argument("--known", help="known words of each label (json)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="path of a unix socket instead of TCP")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--scorer", default="python")
+    parser.add_argument("--cache-dir")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-delay", type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    known_words = None
+    if args.known:
+        with open(args.known, encoding="utf-8") as f:
+            known_words = json.load(f)
+    golds = {}
+    for gold in args.gold:
+        name, _, path = gold.partition("=")
+        golds[name] = load_gold(path, known_words, args.scorer, args.cache_dir)
+
+    async def run():
+        server = EvaluationServer(golds, args.jobs, args.batch_size, args.batch_delay)
+        await server.start(args.host, args.port, args.unix)
+        print("serving {} on {}".format(", ".join(golds), server.address), flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
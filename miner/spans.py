@@ -0,0 +1,290 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .encoding import EncodedCorpus
+from .known import KnownWordIndex
+from .profiling import stage
+from .backend import encoded_entity_spans, entity_spans
+
+
+class SpanTable:
+    def __init__(self, type_ids: Dict[str, int] = None):
+        """
+        columnar table of named entities decoded from a labels list
+        (one row per named entity)
+        :param type_ids: NER label type vocabulary {'type0': 0, 'type1': 1, ... }.
+                         share it between answer and predict tables
+                         so that type ids can be compared.
+        """
+
+        self.type_ids = {} if type_ids is None else type_ids
+        self.sents = array("l")
+        self.begins = array("l")
+        self.ends = array("l")
+        self.type_col = array("l")
+        # known flag for the dictionary of the type / of all types
+        self.known = array("b")
+        self.known_overall = array("b")
+
+    def __len__(self) -> int:
+        return len(self.sents)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # columns mapped from a cache file (memoryview) are pickled as arrays
+        return {
+            name: (
+                array(value.format, value.tobytes())
+                if isinstance(value, memoryview)
+                else value
+            )
+            for name, value in self.__dict__.items()
+        }
+
+    @property
+    def types(self) -> List[str]:
+        return list(self.type_ids)
+
+    def type_id(self, type_: str) -> int:
+        """
+        return id of NER label type (register it if it is a new type)
+        :param type_: NER label type
+        :return: type id
+        """
+
+        if type_ not in self.type_ids:
+            self.type_ids[type_] = len(self.type_ids)
+        return self.type_ids[type_]
+
+    def append(
+        self,
+        sent: int,
+        begin: int,
+        end: int,
+        type_: str,
+        known: bool = False,
+        known_overall: bool = False,
+    ):
+        """
+        add a named entity
+        :param sent: sentence index
+        :param begin: index of begin of named entity in the sentence
+        :param end: index of end of named entity in the sentence
+        :param type_: NER label type
+        :param known: the entity is in known words of the type
+        :param known_overall: the entity is in known words of any type
+        """
+
+        self.sents.append(sent)
+        self.begins.append(begin)
+        self.ends.append(end)
+        self.type_col.append(self.type_id(type_))
+        self.known.append(known)
+        self.known_overall.append(known_overall)
+
+    def extend(self, sents, begins, ends, type_ids, known, known_overall):
+        """
+        add named entities column by column
+        :param sents: sentence indexes
+        :param begins: begin indexes
+        :param ends: end indexes
+        :param type_ids: type ids of this table
+        :param known: known flags of the types
+        :param known_overall: known flags of any type
+        """
+
+        self.sents.extend(sents)
+        self.begins.extend(begins)
+        self.ends.extend(ends)
+        self.type_col.extend(type_ids)
+        self.known.extend(known)
+        self.known_overall.extend(known_overall)
+
+    def subtable(self, start: int, stop: int) -> "SpanTable":
+        """
+        return named entities of sentences [start, stop)
+        (rows are ordered by sentence, as decoded)
+        :param start: index of the first sentence
+        :param stop: index after the last sentence
+        :return: table with sentence indexes from start,
+                 and a copy of the type vocabulary
+        """
+
+        sents = self.sents
+        lo, hi = bisect_left(sents, start), bisect_left(sents, stop)
+        table = SpanTable(dict(self.type_ids))
+        table.extend(
+            [sent - start for sent in sents[lo:hi]],
+            self.begins[lo:hi],
+            self.ends[lo:hi],
+            self.type_col[lo:hi],
+            self.known[lo:hi],
+            self.known_overall[lo:hi],
+        )
+        return table
+
+    def keys(self) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        return identifiers of named entities
+        :return: (sentence index, begin index, end index, type id), ...
+        """
+
+        return zip(self.sents, self.begins, self.ends, self.type_col)
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int, int, int]]:
+        """
+        return named entities
+        :return: (sentence index, begin index, end index, type id,
+                  known flag, overall known flag), ...
+        """
+
+        return zip(
+            self.sents,
+            self.begins,
+            self.ends,
+            self.type_col,
+            self.known,
+            self.known_overall,
+        )
+
+
+def tag_known(
+    table: SpanTable, sentences: List[List[str]], known_words: KnownWordIndex
+):
+    """
+    set known flags of decoded named entities
+    (a span is joined and looked up once)
+    :param table: table of named entities
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    """
+
+    with stage("known_lookup") as timer:
+        types = table.types
+        flags = known_words.flags
+        known, known_overall = array("b"), array("b")
+        for sent, begin, end, t in zip(
+            table.sents, table.begins, table.ends, table.type_col
+        ):
+            stop = end + 1
+            k, k_overall = flags(sentences[sent][begin:stop], types[t])
+            known.append(k)
+            known_overall.append(k_overall)
+        table.known, table.known_overall = known, known_overall
+        if timer:
+            timer.add(spans=len(table))
+
+
+def decode_spans(
+    seqs: List[List[str]],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex = None,
+    type_ids: Dict[str, int] = None,
+) -> SpanTable:
+    """
+    decode named entities of all NER label types in a single pass
+    :param seqs: labels list [[labels0], [labels1], ... ]
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :param type_ids: NER label type vocabulary shared between tables
+    :return: table of named entities
+    """
+
+    table = SpanTable(type_ids)
+    with stage("decode") as timer:
+        for sent, labels in enumerate(seqs):
+            for type_, begin, end in entity_spans(labels):
+                table.append(sent, begin, end, type_)
+        if timer:
+            timer.add(tokens=sum(len(labels) for labels in seqs), spans=len(table))
+    if known_words:
+        tag_known(table, sentences, known_words)
+    return table
+
+
+def decode_encoded(
+    corpus: EncodedCorpus,
+    sentences: List[List[str]],
+    known_words: KnownWordIndex = None,
+    type_ids: Dict[str, int] = None,
+) -> SpanTable:
+    """
+    decode named entities of an integer-encoded labels list
+    (label ids are compared as integers, without building label strings)
+    :param corpus: encoded labels list
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :param type_ids: NER label type vocabulary shared between tables
+    :return: table of named entities
+    """
+
+    table = SpanTable(type_ids)
+    vocab = corpus.vocab
+    with stage("decode") as timer:
+        sents, begins, ends, vocab_types = encoded_entity_spans(
+            corpus.tags, vocab.prefix_of, vocab.type_of, corpus.offsets
+        )
+        names = vocab.types
+        types = array("l", [table.type_id(names[t]) for t in vocab_types])
+        flags = array("b", bytes(len(sents)))
+        table.extend(sents, begins, ends, types, flags, flags)
+        if timer:
+            timer.add(tokens=len(corpus.tags), spans=len(table))
+    if known_words:
+        tag_known(table, sentences, known_words)
+    return table
+
+
+def decode(
+    seqs: Union[List[List[str]], EncodedCorpus],
+    sentences: List[List[str]],
+    known_words: KnownWordIndex = None,
+    type_ids: Dict[str, int] = None,
+) -> SpanTable:
+    """
+    decode named entities of a labels list or an encoded labels list
+    :param seqs: labels list [[labels0], [labels1], ... ] or EncodedCorpus
+    :param sentences: morphs list [[morphs], [morphs], ...]
+    :param known_words: index of known words
+    :param type_ids: NER label type vocabulary shared between tables
+    :return: table of named entities
+    """
+
+    if isinstance(seqs, EncodedCorpus):
+        return decode_encoded(seqs, sentences, known_words, type_ids)
+    return decode_spans(seqs, sentences, known_words, type_ids)
+
+
+def overlap_pairs(answers: SpanTable, predicts: SpanTable) -> Iterator[Tuple[int, int]]:
+    """
+    return pairs of overlapping answer and predicted named entities
+    with a sweep line over the spans sorted by (sentence, begin)
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+    :return: (row of answers, row of predicts), ...
+    """
+
+    spans = [
+        (sent, begin, end, 0, row)
+        for row, (sent, begin, end) in enumerate(
+            zip(answers.sents, answers.begins, answers.ends)
+        )
+    ]
+    spans.extend(
+        (sent, begin, end, 1, row)
+        for row, (sent, begin, end) in enumerate(
+            zip(predicts.sents, predicts.begins, predicts.ends)
+        )
+    )
+    spans.sort()
+
+    # spans which may still overlap the sweep line, of answers and of predicts
+    active = ([], [])
+    for sent, begin, end, source, row in spans:
+        for i in (0, 1):
+            active[i][:] = [
+                span for span in active[i] if span[0] == sent and span[1] >= begin
+            ]
+        for _, _, other in active[1 - source]:
+            yield (row, other) if source == 0 else (other, row)
+        active[source].append((sent, end, row))
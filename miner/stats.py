@@ -0,0 +1,351 @@
+import heapq
+import zlib
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .scoring import match_spans
+from .spans import SpanTable
+
+# outcomes of named entities counted by SurfaceStats
+OUTCOMES = ("found", "missed", "spurious")
+FOUND, MISSED, SPURIOUS = range(len(OUTCOMES))
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 1 << 16, depth: int = 4):
+        """
+        count-min sketch of string frequencies.
+        estimates never fall below true counts
+        and exceed them by at most 2 * total / width with high probability.
+        :param width: number of counters of each row
+        :param depth: number of rows (hash functions)
+        """
+
+        self.width = width
+        self.depth = depth
+        self.rows = [array("q", bytes(8 * width)) for _ in range(depth)]
+
+    def _indexes(self, item: str) -> Iterable[int]:
+        data = item.encode("utf-8")
+        # crc32 seeded by the row number, stable across processes
+        return (zlib.crc32(data, seed) % self.width for seed in range(self.depth))
+
+    def add(self, item: str, n: int = 1):
+        for row, i in zip(self.rows, self._indexes(item)):
+            row[i] += n
+
+    def estimate(self, item: str) -> int:
+        return min(row[i] for row, i in zip(self.rows, self._indexes(item)))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("sketches of different sizes cannot be merged")
+        for mine, theirs in zip(self.rows, other.rows):
+            for i, n in enumerate(theirs):
+                if n:
+                    mine[i] += n
+        return self
+
+
+class SpaceSaving:
+    def __init__(self, k: int = 100):
+        """
+        space-saving summary of the k most frequent strings.
+        counts of monitored strings exceed true counts by at most their error,
+        and every string more frequent than total / k is monitored.
+        :param k: number of monitored strings
+        """
+
+        self.k = k
+        # string -> [count, overestimation]
+        self.counters: Dict[str, List[int]] = {}
+        # (count, string) with stale entries skipped lazily
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, item: str, n: int = 1):
+        counter = self.counters.get(item)
+        if counter is None:
+            if len(self.counters) < self.k:
+                counter = self.counters[item] = [0, 0]
+            else:
+                # replace the least frequent string
+                minimum, victim = self._pop_min()
+                del self.counters[victim]
+                counter = self.counters[item] = [minimum, minimum]
+        counter[0] += n
+        heapq.heappush(self._heap, (counter[0], item))
+        if len(self._heap) > 4 * self.k + 64:
+            self._heap = [(c[0], s) for s, c in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        heap, counters = self._heap, self.counters
+        while True:
+            count, item = heapq.heappop(heap)
+            counter = counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count, item
+
+    def most_common(self, n: int = None) -> List[Tuple[str, int]]:
+        items = sorted(self.counters.items(), key=lambda x: (-x[1][0], x[0]))
+        return [(item, counter[0]) for item, counter in items[:n]]
+
+
+class SurfaceCounter:
+    def __init__(
+        self, budget: int = 100000, k: int = 100, width: int = 1 << 16, depth: int = 4
+    ):
+        """
+        frequency table of strings in bounded memory.
+        strings are counted exactly up to budget distinct strings,
+        and by a space-saving summary (top k) and a count-min sketch beyond it.
+        :param budget: maximum number of exactly counted strings
+        :param k: number of strings kept by the space-saving summary
+        :param width: width of the count-min sketch
+        :param depth: depth of the count-min sketch
+        """
+
+        self.budget = budget
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.counts: Optional[Dict[str, int]] = {}
+        self.top: Optional[SpaceSaving] = None
+        self.sketch: Optional[CountMinSketch] = None
+        self.total = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.counts is not None
+
+    def add(self, item: str, n: int = 1):
+        """
+        count a string
+        :param item: string
+        :param n: amount
+        """
+
+        self.total += n
+        counts = self.counts
+        if counts is not None:
+            counts[item] = counts.get(item, 0) + n
+            if len(counts) > self.budget:
+                self._to_sketch()
+        else:
+            self.top.add(item, n)
+            self.sketch.add(item, n)
+
+    def _to_sketch(self):
+        self.top = SpaceSaving(self.k)
+        self.sketch = CountMinSketch(self.width, self.depth)
+        # the most frequent strings first, so that they are monitored exactly
+        for item, n in sorted(self.counts.items(), key=lambda x: -x[1]):
+            self.top.add(item, n)
+            self.sketch.add(item, n)
+        self.counts = None
+
+    def count(self, item: str) -> int:
+        """
+        return count of a string (an upper bound once beyond the budget)
+        :param item: string
+        :return: count
+        """
+
+        if self.counts is not None:
+            return self.counts.get(item, 0)
+        estimate = self.sketch.estimate(item)
+        counter = self.top.counters.get(item)
+        return estimate if counter is None else min(estimate, counter[0])
+
+    def most_common(self, n: int = None) -> List[Tuple[str, int]]:
+        """
+        return the most frequent strings
+        :param n: number of strings (all if None)
+        :return: [(string, count), ... ] (approximate once beyond the budget)
+        """
+
+        if self.counts is not None:
+            items = sorted(self.counts.items(), key=lambda x: (-x[1], x[0]))
+            return items[:n]
+        return [(item, self.count(item)) for item, _ in self.top.most_common(n)]
+
+    def merge(self, other: "SurfaceCounter") -> "SurfaceCounter":
+        """
+        add counts of other
+        :param other: counter
+        :return: self
+        """
+
+        if other.counts is not None:
+            for item, n in other.counts.items():
+                self.add(item, n)
+            return self
+        if self.counts is not None:
+            self._to_sketch()
+        self.total += other.total
+        self.sketch.merge(other.sketch)
+        for item, (n, _) in other.top.counters.items():
+            self.top.add(item, n)
+        return self
+
+
+class SurfaceStats:
+    def __init__(
+        self,
+        budget: int = 100000,
+        k: int = 100,
+        width: int = 1 << 16,
+        depth: int = 4,
+        sep: str = "",
+    ):
+        """
+        frequencies of surface strings of named entities found, missed,
+        and predicted spuriously, for each type and known / unknown,
+        in bounded memory (see SurfaceCounter)
+        :param budget: maximum number of exactly counted strings of a table
+        :param k: number of strings kept by a table beyond the budget
+        :param width: width of count-min sketches
+        :param depth: depth of count-min sketches
+        :param sep: separator to join morphs of a surface string
+        """
+
+        self.config = (budget, k, width, depth)
+        self.sep = sep
+        self.reset()
+
+    def reset(self):
+        """
+        clear all tables
+        """
+
+        # (type, outcome, known) -> frequency table
+        self.tables: Dict[Tuple[str, int, bool], SurfaceCounter] = {}
+        # (type, outcome, known) -> exact number of named entities
+        self.errors: Dict[Tuple[str, int, bool], int] = {}
+
+    def _table(self, key: Tuple[str, int, bool]) -> SurfaceCounter:
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = SurfaceCounter(*self.config)
+        return table
+
+    def update(
+        self, answers: SpanTable, predicts: SpanTable, sentences: List[List[str]]
+    ) -> "SurfaceStats":
+        """
+        count decoded named entities
+        :param answers: table of answer named entities
+        :param predicts: table of predicted named entities
+                         (sharing type vocabulary with answers)
+        :param sentences: morphs list [[morphs], [morphs], ...]
+        :return: self
+        """
+
+        types = answers.types
+        sep = self.sep
+        errors = self.errors
+        ans_matched, pred_matched = match_spans(answers, predicts)
+        for table, matched, hit, miss in (
+            (answers, ans_matched, FOUND, MISSED),
+            (predicts, pred_matched, None, SPURIOUS),
+        ):
+            for (sent, begin, end, type_id, known, known_overall), m in zip(
+                table.rows(), matched
+            ):
+                outcome = hit if m else miss
+                if outcome is None:
+                    # found named entities are counted on the answer side
+                    continue
+                type_ = types[type_id]
+                known = bool(known)
+                overall_key = ("overall", outcome, bool(known_overall))
+                errors[overall_key] = errors.get(overall_key, 0) + 1
+                key = (type_, outcome, known)
+                errors[key] = errors.get(key, 0) + 1
+                stop = end + 1
+                self._table(key).add(sep.join(sentences[sent][begin:stop]))
+        return self
+
+    def merge(self, other: "SurfaceStats") -> "SurfaceStats":
+        """
+        add tables of other
+        :param other: statistics
+        :return: self
+        """
+
+        for key, table in other.tables.items():
+            self._table(key).merge(table)
+        for key, n in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + n
+        return self
+
+    def _counters(self, type_: str, outcome: str, known: Optional[bool]):
+        if outcome not in OUTCOMES:
+            raise ValueError("unknown outcome: {}".format(outcome))
+        code = OUTCOMES.index(outcome)
+        flags = (True, False) if known is None else (known,)
+        return [
+            self.tables[type_, code, flag]
+            for flag in flags
+            if (type_, code, flag) in self.tables
+        ]
+
+    def top(
+        self,
+        type_: str,
+        outcome: str = "missed",
+        known: Optional[bool] = None,
+        n: int = 10,
+    ) -> List[Tuple[str, int]]:
+        """
+        return the most frequent surface strings
+        :param type_: NER label type
+        :param outcome: found, missed, or spurious
+        :param known: True: known only, False: unknown only, None: both
+        :param n: number of surface strings
+        :return: [(surface, count), ... ]
+                 (approximate if the table went beyond the budget)
+        """
+
+        counters = self._counters(type_, outcome, known)
+        candidates = {item for c in counters for item, _ in c.most_common()}
+        counts = [(item, sum(c.count(item) for c in counters)) for item in candidates]
+        counts.sort(key=lambda x: (-x[1], x[0]))
+        return counts[:n]
+
+    def count(
+        self, surface: str, type_: str, outcome: str = "missed", known: bool = None
+    ) -> int:
+        """
+        return frequency of a surface string
+        :param surface: surface string
+        :param type_: NER label type
+        :param outcome: found, missed, or spurious
+        :param known: True: known only, False: unknown only, None: both
+        :return: count (an upper bound if the table went beyond the budget)
+        """
+
+        return sum(c.count(surface) for c in self._counters(type_, outcome, known))
+
+    def error_counts(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        return exact numbers of named entities of each outcome
+        :return: {'type': {'known': {'found': num, 'missed': num, 'spurious': num},
+                           'unknown': {...}}, ..., 'overall': {...}}
+        """
+
+        result: Dict[Hashable, Dict[str, Dict[str, int]]] = {}
+        for (type_, outcome, known), n in self.errors.items():
+            row = result.setdefault(
+                type_,
+                {
+                    "known": dict.fromkeys(OUTCOMES, 0),
+                    "unknown": dict.fromkeys(OUTCOMES, 0),
+                },
+            )
+            row["known" if known else "unknown"][OUTCOMES[outcome]] = n
+        overall = result.pop("overall", None)
+        result = dict(sorted(result.items()))
+        if overall is not None:
+            result["overall"] = overall
+        return result
@@ -0,0 +1,139 @@
+from typing import Dict, List, Set, Union
+
+from .known import KnownWordIndex
+from .profiling import stage
+from .scoring import Counts, build_report, check_scorer, count_spans, print_report
+from .spans import decode
+from .stats import SurfaceStats
+
+
+class StreamingMiner:
+    def __init__(
+        self,
+        known_words: Union[Dict[str, List[str]], KnownWordIndex] = None,
+        scorer: str = "python",
+        stats: SurfaceStats = None,
+    ):
+        """
+        incremental evaluator. feed batches of sentences with update(),
+        then get the same reports as Miner over all fed sentences.
+        memory does not grow with the number of sentences.
+        :param known_words: known words of each label
+                            {'label0': [word0, word1, ... ],
+                            'label1': [word0, word1, ... ],
+                            ... }
+                            or KnownWordIndex built from them
+        :param scorer: backend to count matched named entities,
+                       'python' (reference) or 'numpy'
+        :param stats: collector of surface strings of named entities
+                      fed with every batch (see miner.stats.SurfaceStats)
+        """
+
+        check_scorer(scorer)
+        self.scorer = scorer
+        self.stats = stats
+        self.known_index = (
+            known_words
+            if isinstance(known_words, KnownWordIndex)
+            else KnownWordIndex(known_words)
+        )
+        self.reset()
+
+    def reset(self):
+        """
+        clear counters
+        """
+
+        self.counts = Counts()
+        self.type_set: Set[str] = set()
+        self.num_sentences = 0
+        if self.stats is not None:
+            self.stats.reset()
+
+    @property
+    def types(self) -> List[str]:
+        return sorted(self.type_set) + ["overall"]
+
+    def update(
+        self,
+        answers: List[List[str]],
+        predicts: List[List[str]],
+        sentences: List[List[str]],
+    ) -> "StreamingMiner":
+        """
+        accumulate counters of a batch
+        :param answers: answer labels list [[labels], [labels], ...]
+        :param predicts: predict labels list [[labels], [labels], ...]
+        :param sentences: morphs list [[morphs], [morphs], ...]
+        :return: self
+        """
+
+        for seq in answers:
+            self.type_set.update(t.split("-")[-1] for t in seq if t != "O")
+        type_ids = {}
+        ans_table = decode(answers, sentences, self.known_index, type_ids)
+        pred_table = decode(predicts, sentences, self.known_index, type_ids)
+        with stage("count") as timer:
+            self.counts += count_spans(ans_table, pred_table, self.scorer)
+            if timer:
+                timer.add(spans=len(ans_table) + len(pred_table))
+        if self.stats is not None:
+            with stage("surface_stats"):
+                self.stats.update(ans_table, pred_table, sentences)
+        self.num_sentences += len(sentences)
+        return self
+
+    def merge(self, other: "StreamingMiner") -> "StreamingMiner":
+        """
+        add counters of other evaluator
+        :param other: evaluator
+        :return: self
+        """
+
+        self.counts += other.counts
+        self.type_set |= other.type_set
+        if self.stats is not None and other.stats is not None:
+            self.stats.merge(other.stats)
+        self.num_sentences += other.num_sentences
+        return self
+
+    def compute(
+        self, mode: str = "default", print_: bool = False
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        return report of named entity recognition over all fed sentences
+        :param mode: default, known, or unknown
+        :param print_: print flag.
+                       if this flag equal 'True', print report of NER result.
+        :return: reports of NER result (same format as Miner.default_report)
+        """
+
+        report = build_report(self.counts, self.types, mode)
+        if print_:
+            print_report(report, self.types)
+        return report
+
+    def default_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("default", print_)
+
+    def known_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("known", print_)
+
+    def unknown_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("unknown", print_)
+
+    def segmentation_score(
+        self, mode: str = "default", print_: bool = True
+    ) -> Dict[str, Union[float, int]]:
+        """
+        return segmentation score over all fed sentences
+        :param mode: default, unknown, or known
+        :param print_: print flag.
+                       if this flag equal 'True', print report of NER result.
+        :return segmentation score
+        """
+
+        report = build_report(self.counts, ["overall"], mode)["overall"]
+        if print_:
+            print_report({"SEG": report}, ["SEG"])
+        return report
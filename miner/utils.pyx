@@ -1,6 +1,21 @@
 #cython: language_level=3
+from cpython cimport array
 from typing import List, Dict
 
+import array
+
+# prefix codes of integer-encoded labels
+# (any other prefix is encoded as OTHER)
+DEF P_O = 0
+DEF P_B = 1
+DEF P_I = 2
+DEF P_E = 3
+DEF P_S = 4
+DEF P_L = 5
+DEF P_U = 6
+DEF P_OTHER = 7
+PREFIXES = ('O', 'B', 'I', 'E', 'S', 'L', 'U')
+
 
 cpdef entity_indexes(sentences, seq_label_pairs, type_select: str,
                      check_known: bool, check_unknown: bool,
@@ -19,18 +34,24 @@ cpdef entity_indexes(sentences, seq_label_pairs, type_select: str,
         str top, type_, word
         str prev_top = 'O', prev_type = ''
         int focus_idx = 0
+        bint filtering = not (check_known and check_unknown)
         entities = []
 
     for i, (label, _) in enumerate(seq_label_pairs):
         top = label[0]
         type_ = label.split('-')[-1]
-        word = ''.join(sentences[focus_idx: i])
 
         if is_end_of_label(prev_top, top, prev_type, type_) \
-                and type_select in [prev_type, '', 'overall'] \
-                and check_add_entity(word, type_select, check_known,
-                                     check_unknown, known_words):
-            entities.append((prev_type, focus_idx, i - 1))
+                and type_select in [prev_type, '', 'overall']:
+            # build a surface string only when a span is closed
+            # and known / unknown filtering needs it
+            if not filtering:
+                entities.append((prev_type, focus_idx, i - 1))
+            else:
+                word = ''.join(sentences[focus_idx: i])
+                if check_add_entity(word, type_select, check_known,
+                                    check_unknown, known_words):
+                    entities.append((prev_type, focus_idx, i - 1))
 
         if is_begin_of_label(top, prev_type, type_):
             focus_idx = i
@@ -92,3 +113,114 @@ def check_add_entity(word: str, type_: str,
     elif check_unknown and word not in known_words[type_]:
         return True
     return False
+
+cpdef list entity_spans(labels):
+    """
+    return named entities of all NER label types in a sentence
+    (same decoding rules as entity_indexes, in a single pass)
+    :param labels: labels of a sentence [label0, label1, ... ]
+    :return: chunks of NER label type, index of begin of named entity
+             and index of end of named entity
+             [(type, begin index, end index),
+              (type, begin index, end index), ... ]
+    """
+
+    cdef:
+        str label, top, type_
+        str prev_top = 'O', prev_type = ''
+        Py_ssize_t i, n = len(labels), focus_idx = 0
+        list entities = []
+
+    for i in range(n + 1):
+        label = labels[i] if i < n else 'O'
+        top = label[0]
+        type_ = label.split('-')[-1]
+
+        if is_end_of_label(prev_top, top, prev_type, type_):
+            entities.append((prev_type, focus_idx, i - 1))
+
+        if is_begin_of_label(top, prev_type, type_):
+            focus_idx = i
+        prev_top = top
+        prev_type = type_
+
+    return entities
+
+cdef inline bint _is_end(int prev_top, int now_top, long prev_type,
+                         long now_type):
+    if prev_top == P_E or prev_top == P_S or prev_top == P_L \
+            or prev_top == P_U:
+        return True
+    elif prev_top == P_B and (now_top == P_B or now_top == P_O):
+        return True
+    elif prev_top == P_I and (now_top == P_B or now_top == P_O
+                              or now_top == P_S or now_top == P_U):
+        return True
+    elif prev_top != P_O and prev_type != now_type:
+        return True
+    return False
+
+cdef inline bint _is_begin(int now_top, long prev_type, long now_type):
+    if now_top == P_B or now_top == P_S or now_top == P_U:
+        return True
+    elif now_top != P_O and prev_type >= 0 and prev_type != now_type:
+        return True
+    return False
+
+def encoded_entity_spans(const unsigned short[:] tags,
+                         const unsigned char[:] prefix_of,
+                         const unsigned short[:] type_of,
+                         const long[:] offsets):
+    """
+    return named entities of integer-encoded labels in a single pass
+    (same decoding rules as entity_spans)
+    :param tags: label ids of all sentences concatenated
+    :param prefix_of: prefix code of each label id (index of PREFIXES,
+                      len(PREFIXES) for other prefixes)
+    :param type_of: type id of each label id
+    :param offsets: begin index of each sentence in tags,
+                    followed by len(tags)
+    :return: sentence indexes, begin indexes, end indexes and type ids
+             of named entities (array('l') each)
+    """
+
+    cdef:
+        Py_ssize_t sent, i, begin, stop, focus_idx, n = 0
+        int top, prev_top
+        long type_, prev_type
+        array.array template = array.array('l', [])
+        array.array sents = array.clone(template, len(tags), zero=False)
+        array.array begins = array.clone(template, len(tags), zero=False)
+        array.array ends = array.clone(template, len(tags), zero=False)
+        array.array types = array.clone(template, len(tags), zero=False)
+
+    for sent in range(offsets.shape[0] - 1):
+        begin = offsets[sent]
+        stop = offsets[sent + 1]
+        prev_top = P_O
+        prev_type = -1
+        focus_idx = 0
+        for i in range(begin, stop):
+            top = prefix_of[tags[i]]
+            type_ = type_of[tags[i]]
+            if _is_end(prev_top, top, prev_type, type_):
+                sents.data.as_longs[n] = sent
+                begins.data.as_longs[n] = focus_idx
+                ends.data.as_longs[n] = i - begin - 1
+                types.data.as_longs[n] = prev_type
+                n += 1
+            if _is_begin(top, prev_type, type_):
+                focus_idx = i - begin
+            prev_top = top
+            prev_type = type_
+        # the end of a sentence closes an open named entity
+        if prev_top != P_O:
+            sents.data.as_longs[n] = sent
+            begins.data.as_longs[n] = focus_idx
+            ends.data.as_longs[n] = stop - begin - 1
+            types.data.as_longs[n] = prev_type
+            n += 1
+
+    for column in (sents, begins, ends, types):
+        array.resize(column, n)
+    return sents, begins, ends, types
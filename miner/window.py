@@ -0,0 +1,207 @@
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Tuple, Union
+
+from .known import KnownWordIndex
+from .profiling import stage
+from .scoring import (
+    ANS,
+    PRED,
+    TP,
+    UNKNOWN_OFFSET,
+    Counts,
+    build_report,
+    match_spans,
+    print_report,
+)
+from .spans import SpanTable, decode
+
+# counter cells a sentence adds: ((type, column of the counter row), ... )
+Contribution = Tuple[Tuple[str, int], ...]
+
+
+def sentence_contributions(
+    answers: SpanTable, predicts: SpanTable, n_sentences: int
+) -> List[Contribution]:
+    """
+    return counter cells each sentence adds
+    (one cell of the type and one of 'overall' per named entity and match)
+    :param answers: table of answer named entities
+    :param predicts: table of predicted named entities
+                     (sharing type vocabulary with answers)
+    :param n_sentences: number of sentences
+    :return: cells of each sentence
+    """
+
+    types = answers.types
+    cells: List[list] = [[] for _ in range(n_sentences)]
+    ans_matched, _ = match_spans(answers, predicts)
+    for (sent, _, _, type_id, known, known_overall), matched in zip(
+        answers.rows(), ans_matched
+    ):
+        column = 0 if known else UNKNOWN_OFFSET
+        column_overall = 0 if known_overall else UNKNOWN_OFFSET
+        row = cells[sent]
+        row.append((types[type_id], column + ANS))
+        row.append(("overall", column_overall + ANS))
+        if matched:
+            row.append((types[type_id], column + TP))
+            row.append(("overall", column_overall + TP))
+    for sent, _, _, type_id, known, known_overall in predicts.rows():
+        row = cells[sent]
+        row.append((types[type_id], (0 if known else UNKNOWN_OFFSET) + PRED))
+        row.append(("overall", (0 if known_overall else UNKNOWN_OFFSET) + PRED))
+    return [tuple(row) for row in cells]
+
+
+class WindowedMiner:
+    def __init__(
+        self,
+        known_words: Union[Dict[str, List[str]], KnownWordIndex] = None,
+        size: int = None,
+        seconds: float = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        evaluator over a sliding window of the last sentences.
+        counters of each sentence are kept in a ring buffer,
+        so that adding and evicting a sentence costs
+        the number of its named entities.
+        :param known_words: known words of each label or KnownWordIndex
+        :param size: maximum number of sentences in the window (no limit if None)
+        :param seconds: maximum age of sentences in the window (no limit if None)
+        :param clock: function returning the current time in seconds
+        """
+
+        if size is not None and size < 1:
+            raise ValueError("size must be positive: {}".format(size))
+        self.size = size
+        self.seconds = seconds
+        self.clock = clock
+        self.known_index = (
+            known_words
+            if isinstance(known_words, KnownWordIndex)
+            else KnownWordIndex(known_words)
+        )
+        self.reset()
+
+    def reset(self):
+        """
+        clear the window
+        """
+
+        self.counts = Counts()
+        # (timestamp, types of answer labels, counter cells) of each sentence
+        self.buffer: deque = deque()
+        self.type_refs: Counter = Counter()
+
+    @property
+    def num_sentences(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def types(self) -> List[str]:
+        return sorted(self.type_refs) + ["overall"]
+
+    def update(
+        self,
+        answers: List[List[str]],
+        predicts: List[List[str]],
+        sentences: List[List[str]],
+        timestamps: List[float] = None,
+    ) -> "WindowedMiner":
+        """
+        add sentences to the window and evict the oldest ones
+        :param answers: answer labels list [[labels], [labels], ...]
+        :param predicts: predict labels list [[labels], [labels], ...]
+        :param sentences: morphs list [[morphs], [morphs], ...]
+        :param timestamps: time of each sentence in seconds on the clock
+                           (the current time if None).
+                           sentences are expected in order of time
+        :return: self
+        """
+
+        if not len(answers) == len(predicts) == len(sentences):
+            raise ValueError("answers and predicts do not match sentences")
+        if timestamps is None:
+            timestamps = [self.clock()] * len(sentences)
+        elif len(timestamps) != len(sentences):
+            raise ValueError("timestamps do not match sentences")
+        type_ids = {}
+        ans_table = decode(answers, sentences, self.known_index, type_ids)
+        pred_table = decode(predicts, sentences, self.known_index, type_ids)
+        with stage("count") as timer:
+            contributions = sentence_contributions(
+                ans_table, pred_table, len(sentences)
+            )
+            table = self.counts.table
+            for timestamp, seq, cells in zip(timestamps, answers, contributions):
+                types = tuple({t.split("-")[-1] for t in seq if t != "O"})
+                self.type_refs.update(types)
+                for type_, column in cells:
+                    row = table.get(type_)
+                    if row is None:
+                        row = table[type_] = [0] * 6
+                    row[column] += 1
+                self.buffer.append((timestamp, types, cells))
+            if timer:
+                timer.add(spans=len(ans_table) + len(pred_table))
+        self.evict()
+        return self
+
+    def evict(self, now: float = None) -> int:
+        """
+        remove sentences out of the window
+        :param now: current time in seconds (clock() if None)
+        :return: number of removed sentences
+        """
+
+        buffer = self.buffer
+        n = 0
+        if self.size is not None:
+            while len(buffer) > self.size:
+                self._remove(buffer.popleft())
+                n += 1
+        if self.seconds is not None and buffer:
+            oldest = (self.clock() if now is None else now) - self.seconds
+            while buffer and buffer[0][0] < oldest:
+                self._remove(buffer.popleft())
+                n += 1
+        return n
+
+    def _remove(self, entry: Tuple[float, Tuple[str, ...], Contribution]):
+        _, types, cells = entry
+        table = self.counts.table
+        for type_, column in cells:
+            table[type_][column] -= 1
+        self.type_refs.subtract(types)
+        for type_ in types:
+            if self.type_refs[type_] <= 0:
+                del self.type_refs[type_]
+
+    def compute(
+        self, mode: str = "default", print_: bool = False
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        return report of named entity recognition over the window
+        (sentences older than the window are evicted first)
+        :param mode: default, known, or unknown
+        :param print_: print flag.
+                       if this flag equal 'True', print report of NER result.
+        :return: reports of NER result (same format as Miner.default_report)
+        """
+
+        self.evict()
+        report = build_report(self.counts, self.types, mode)
+        if print_:
+            print_report(report, self.types)
+        return report
+
+    def default_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("default", print_)
+
+    def known_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("known", print_)
+
+    def unknown_only_report(self, print_: bool = False) -> Dict[str, Dict[str, float]]:
+        return self.compute("unknown", print_)
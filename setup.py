@@ -1,12 +1,21 @@
-from Cython.Distutils import build_ext
 from setuptools import setup, Extension
 
+# the extension is optional. without Cython, it is built from the generated
+# C++ source, and miner falls back to a pure-Python / NumPy decoder
+# when it cannot be built.
+try:
+    from Cython.Distutils import build_ext
+    sources = ['miner/utils.pyx']
+except ImportError:
+    from setuptools.command.build_ext import build_ext
+    sources = ['miner/utils.cpp']
+
 
 with open('README.md', 'r', encoding='utf-8') as f:
     readme = f.read()
 
 ext_modules = [
-    Extension('miner.utils', sources=['miner/utils.pyx'], language='c++')
+    Extension('miner.utils', sources=sources, language='c++', optional=True)
 ]
 
 setup(
@@ -27,7 +36,7 @@ setup(
         'Programming Language :: Python :: 3.7',
         'Topic :: Text Processing',
     ],
-    install_requires=['cython'],
+    extras_require={'numpy': ['numpy'], 'cython': ['cython']},
     packages=['miner'],
     test_suite='tests',
     ext_modules=ext_modules,
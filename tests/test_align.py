@@ -0,0 +1,85 @@
+import unittest
+
+from miner import Miner
+from miner.align import align, align_tags
+from miner.encoding import EncodedCorpus
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+SUBWORDS = [
+    ["O", "B-PSN", "I-PSN", "O", "I-LOC", "B-LOC", "B-ORG", "I-LOC", "I-LOC", "O"],
+    ["O", "O"],
+    [],
+]
+WORD_IDS = [[None, 0, 0, 1, 2, 2, 3, 3, 3, None], [None, None], []]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestAlign(unittest.TestCase):
+    def test_policies(self):
+
+        expects = {
+            "first": ["B-PSN", "O", "I-LOC", "B-ORG"],
+            "majority": ["B-PSN", "O", "I-LOC", "I-LOC"],
+            "any_b": ["B-PSN", "O", "B-LOC", "B-ORG"],
+        }
+        for policy, expect in expects.items():
+            self.assertEqual(align(SUBWORDS, WORD_IDS, policy=policy), [expect, [], []])
+        self.assertEqual(
+            align(SUBWORDS, WORD_IDS, [5, 1, 0]),
+            [expects["first"] + ["O"], ["O"], []],
+        )
+        with self.assertRaises(ValueError):
+            align(SUBWORDS, WORD_IDS, policy="last")
+        with self.assertRaises(ValueError):
+            align(SUBWORDS, WORD_IDS, [3, 0, 0])
+        with self.assertRaises(ValueError):
+            align(SUBWORDS, WORD_IDS[:1])
+
+    def test_flat_buffers(self):
+
+        corpus = EncodedCorpus.from_labels(SUBWORDS)
+        flat = np.array([-1 if i is None else i for ids in WORD_IDS for i in ids])
+        result = align(corpus, flat, policy="majority")
+        self.assertIs(result.vocab, corpus.vocab)
+        self.assertEqual(list(result), align(SUBWORDS, WORD_IDS, policy="majority"))
+        tags = align_tags(
+            corpus.tags, [-1, 0, 0, 1, 1, 1, 1, 1, 2, -1, -1, -1], 4, corpus.vocab
+        )
+        self.assertEqual(
+            corpus.vocab.decode(tags.tolist()), ["B-PSN", "O", "I-LOC", "O"]
+        )
+        with self.assertRaises(ValueError):
+            align_tags(corpus.tags, [1, 0] + [-1] * 10, 2, corpus.vocab)
+
+    def test_feeds_miner(self):
+
+        answers, predicts, sentences, knowns = random_corpus(0)
+        subwords, word_ids = [], []
+        for labels in predicts:
+            # each word is split into two subwords continuing its type
+            subwords.append(["O"])
+            word_ids.append([None])
+            for i, label in enumerate(labels):
+                inside = "O" if label == "O" else "I-" + label.split("-")[-1]
+                subwords[-1] += [label, inside]
+                word_ids[-1] += [i, i]
+        expect = Miner(answers, predicts, sentences, dict(knowns))
+        for policy in ("first", "majority"):
+            aligned = align(
+                EncodedCorpus.from_labels(subwords),
+                word_ids,
+                map(len, sentences),
+                policy,
+            )
+            miner = Miner(answers, aligned, sentences, dict(knowns))
+            self.assertEqual(miner.default_report(), expect.default_report())
+
+
+if __name__ == "__main__":
+    unittest.main()
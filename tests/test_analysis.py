@@ -0,0 +1,155 @@
+import types
+import unittest
+
+from miner import Miner
+from miner.analysis import CATEGORIES, ErrorIndex, ErrorRecord
+from miner.known import KnownWordIndex
+from miner.scoring import TP
+from miner.spans import decode_spans, overlap_pairs
+
+from .test_spans import random_corpus
+
+
+class TestErrorIndex(unittest.TestCase):
+    def setUp(self):
+        self.answers = [
+            ["B-PSN", "I-PSN", "O", "B-LOC", "O"],
+            ["B-ORG", "I-ORG", "I-ORG", "O", "O"],
+            ["S-PSN", "O", "O", "O", "O"],
+        ]
+        self.predicts = [
+            ["B-PSN", "I-PSN", "O", "B-PSN", "O"],
+            ["B-ORG", "I-ORG", "O", "O", "B-LOC"],
+            ["O", "O", "O", "O", "O"],
+        ]
+        self.sentences = [
+            ["花子", "さん", "は", "東京", "へ"],
+            ["株式", "会社", "テスト", "の", "大阪"],
+            ["太郎", "が", "来", "た", "。"],
+        ]
+        self.knowns = {"PSN": ["花子さん"], "LOC": ["東京"], "ORG": []}
+        self.miner = Miner(
+            self.answers, self.predicts, self.sentences, dict(self.knowns)
+        )
+        self.index = self.miner.error_index()
+
+    def categories(self, source):
+        return [
+            (self.index.surface(r), r.type, r.category)
+            for r in self.index.query(source=source)
+        ]
+
+    def test_classify(self):
+
+        self.assertEqual(
+            self.categories("answer"),
+            [
+                ("花子さん", "PSN", "exact"),
+                ("東京", "LOC", "type"),
+                ("株式会社テスト", "ORG", "boundary"),
+                ("太郎", "PSN", "missed"),
+            ],
+        )
+        self.assertEqual(
+            self.categories("predict"),
+            [
+                ("花子さん", "PSN", "exact"),
+                ("東京", "PSN", "type"),
+                ("株式会社", "ORG", "boundary"),
+                ("大阪", "LOC", "spurious"),
+            ],
+        )
+
+    def test_query(self):
+
+        self.assertIsInstance(self.index.query(), types.GeneratorType)
+        self.assertEqual(
+            list(self.index.query(type_="PSN", category="missed")),
+            [ErrorRecord(2, 0, 0, "PSN", "answer", "missed", False)],
+        )
+        self.assertEqual(
+            [self.index.surface(r) for r in self.index.query(known=True)],
+            ["花子さん", "東京", "花子さん"],
+        )
+        self.assertEqual(
+            self.index.surface(next(self.index.query(category="boundary")), False),
+            ["株式", "会社", "テスト"],
+        )
+        self.assertEqual(list(self.index.query(type_="DATE")), [])
+        with self.assertRaises(ValueError):
+            next(self.index.query(category="wrong"))
+        with self.assertRaises(ValueError):
+            next(self.index.query(source="gold"))
+
+    def test_summary(self):
+
+        summary = self.index.summary()
+        self.assertEqual(
+            summary["PSN"],
+            {"exact": 2, "boundary": 0, "type": 1, "spurious": 0, "missed": 1},
+        )
+        self.assertEqual(sum(summary["ORG"].values()), 2)
+        self.assertEqual(summary["LOC"]["spurious"], 1)
+
+    def test_random(self):
+
+        for seed in range(5):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            miner = Miner(answers, predicts, sentences, dict(knowns))
+            index = miner.error_index()
+            ans_table, pred_table = miner._span_tables()
+            counts = miner._counts()
+            # exact matches are true positives
+            for type_ in miner.types[:-1]:
+                for source in ("answer", "predict"):
+                    exact = list(index.query(type_, "exact", source=source))
+                    self.assertEqual(len(exact), counts.get(type_, "default")[TP])
+            records = list(index.query())
+            self.assertEqual(len(records), len(ans_table) + len(pred_table))
+            self.assertLessEqual({r.category for r in records}, set(CATEGORIES))
+
+
+class TestOverlapPairs(unittest.TestCase):
+    def test_brute_force(self):
+
+        for seed in range(5):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            index = KnownWordIndex(knowns)
+            type_ids = {}
+            ans = decode_spans(answers, sentences, index, type_ids)
+            pred = decode_spans(predicts, sentences, index, type_ids)
+            expected = {
+                (i, j)
+                for i, (s, b, e, _) in enumerate(ans.keys())
+                for j, (s2, b2, e2, _) in enumerate(pred.keys())
+                if s == s2 and b <= e2 and b2 <= e
+            }
+            pairs = list(overlap_pairs(ans, pred))
+            self.assertEqual(len(pairs), len(expected))
+            self.assertEqual(set(pairs), expected)
+
+
+class TestNamedEntities(unittest.TestCase):
+    def test_random(self):
+
+        for seed in range(3):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            miner = Miner(answers, predicts, sentences, dict(knowns))
+            index = ErrorIndex(*miner._span_tables(), sentences)
+            entities = miner.return_answer_named_entities_no_set()
+            for known, key in ((True, "known"), (False, "unknown")):
+                for type_ in miner.types[:-1]:
+                    self.assertEqual(
+                        entities[key][type_],
+                        [
+                            index.surface(r)
+                            for r in index.query(type_, known=known, source="answer")
+                        ],
+                    )
+            self.assertEqual(
+                list(miner.iter_miss_labelings()), miner.return_miss_labelings()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
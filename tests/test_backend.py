@@ -0,0 +1,156 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+
+from miner import backend
+from miner.encoding import EncodedCorpus
+
+from .test_spans import random_corpus
+
+
+def random_labels(seed, n_sentences=200):
+    """
+    random label sequences including unknown prefixes and empty sentences
+    """
+
+    rng = random.Random(seed)
+    tops = ["B", "I", "E", "S", "L", "U", "M", "O", "O"]
+    return [
+        [
+            "O" if top == "O" else top + "-" + rng.choice(["PSN", "LOC"])
+            for top in (rng.choice(tops) for _ in range(rng.randint(0, 10)))
+        ]
+        for _ in range(n_sentences)
+    ]
+
+
+class TestBackend(unittest.TestCase):
+    def setUp(self):
+        self.reference = backend.load("python")
+        self.backends = {name: backend.load(name) for name in backend.available()}
+
+    def test_selected(self):
+
+        self.assertIn(backend.NAME, backend.BACKENDS)
+        self.assertIn("python", backend.available())
+        selected = os.environ.get("MINER_BACKEND") or backend.available()[0]
+        self.assertEqual(backend.NAME, selected)
+        with self.assertRaises(ValueError):
+            backend.load("fortran")
+
+    def test_entity_spans(self):
+
+        for seed in range(5):
+            for seq in random_labels(seed):
+                expect = self.reference.entity_spans(seq)
+                for name, module in self.backends.items():
+                    self.assertEqual(module.entity_spans(seq), expect, name)
+
+    def test_label_checks(self):
+
+        tops = ["B", "I", "E", "S", "L", "U", "O", "M", ""]
+        types = ["a", "b", "", "O"]
+        for module in self.backends.values():
+            for prev_top in tops:
+                for now_top in tops:
+                    for prev_type in types:
+                        for now_type in types:
+                            self.assertEqual(
+                                module.is_end_of_label(
+                                    prev_top, now_top, prev_type, now_type
+                                ),
+                                self.reference.is_end_of_label(
+                                    prev_top, now_top, prev_type, now_type
+                                ),
+                            )
+                for prev_type in types:
+                    for now_type in types:
+                        self.assertEqual(
+                            module.is_begin_of_label(prev_top, prev_type, now_type),
+                            self.reference.is_begin_of_label(
+                                prev_top, prev_type, now_type
+                            ),
+                        )
+
+    def test_encoded_entity_spans(self):
+
+        for seed in range(5):
+            corpus = EncodedCorpus.from_labels(random_labels(seed))
+            args = (
+                corpus.tags,
+                corpus.vocab.prefix_of,
+                corpus.vocab.type_of,
+                corpus.offsets,
+            )
+            expect = self.reference.encoded_entity_spans(*args)
+            self.assertEqual(
+                list(zip(*expect)),
+                [
+                    (sent, begin, end, corpus.vocab.type_ids[type_])
+                    for sent, seq in enumerate(random_labels(seed))
+                    for type_, begin, end in self.reference.entity_spans(seq)
+                ],
+            )
+            for name, module in self.backends.items():
+                columns = module.encoded_entity_spans(*args)
+                self.assertEqual(columns, expect, name)
+                self.assertEqual([c.typecode for c in columns], ["l"] * 4)
+
+    def test_encoded_empty(self):
+
+        corpus = EncodedCorpus.from_labels([[], ["O"], []])
+        for module in self.backends.values():
+            columns = module.encoded_entity_spans(
+                corpus.tags,
+                corpus.vocab.prefix_of,
+                corpus.vocab.type_of,
+                corpus.offsets,
+            )
+            self.assertEqual([len(c) for c in columns], [0] * 4)
+
+    def test_entity_indexes(self):
+
+        answers, _, sentences, knowns = random_corpus(0)
+        knowns["overall"] = [w for words in knowns.values() for w in words]
+        labels = [label for seq in answers for label in seq + ["O"]]
+        words = [word for sentence in sentences for word in sentence + [""]]
+        for type_ in ["PSN", "overall"]:
+            for check_known, check_unknown in [(True, True), (True, False)]:
+                args = (type_, check_known, check_unknown, knowns)
+                pairs = list(zip(labels + ["O"], words + [""]))
+                expect = self.reference.entity_indexes(words, pairs, *args)
+                for module in self.backends.values():
+                    self.assertEqual(module.entity_indexes(words, pairs, *args), expect)
+
+    def test_import_without_extension(self):
+
+        code = (
+            "import sys; sys.modules['miner.utils'] = None; "
+            "import miner; from miner import backend; print(backend.NAME)"
+        )
+        env = dict(os.environ)
+        env.pop("MINER_BACKEND", None)
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout
+        self.assertIn(out.strip(), ["numpy", "python"])
+
+        env["MINER_BACKEND"] = "python"
+        out = subprocess.run(
+            [sys.executable, "-c", "from miner import backend; print(backend.NAME)"],
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout
+        self.assertEqual(out.strip(), "python")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from benchmarks.bench import BENCHMARKS, compare, run_benchmarks
+from benchmarks.corpus import SCHEMES, encode, make_corpus
+from miner import Miner
+
+
+class TestCorpus(unittest.TestCase):
+    def test_encode(self):
+
+        spans = [(0, 0, "PSN"), (2, 4, "LOC")]
+        self.assertEqual(
+            encode(spans, 5, "IOB2"), ["B-PSN", "O", "B-LOC", "I-LOC", "I-LOC"]
+        )
+        self.assertEqual(
+            encode(spans, 5, "BIOES"), ["S-PSN", "O", "B-LOC", "I-LOC", "E-LOC"]
+        )
+        self.assertEqual(
+            encode(spans, 5, "BIOUL"), ["U-PSN", "O", "B-LOC", "I-LOC", "L-LOC"]
+        )
+
+    def test_schemes(self):
+
+        reports = []
+        for scheme in SCHEMES:
+            answers, predicts, sentences, knowns = make_corpus(200, scheme=scheme)
+            miner = Miner(answers, predicts, sentences, knowns)
+            reports.append((miner.default_report(), miner.unknown_only_report()))
+        self.assertEqual(reports[0], reports[1])
+        self.assertEqual(reports[0], reports[2])
+        self.assertLess(reports[0][0]["overall"]["f1_score"], 1.0)
+
+    def test_parameters(self):
+
+        answers, _, sentences, knowns = make_corpus(
+            500, density=0.3, n_types=3, dict_size=300
+        )
+        n_tokens = sum(len(sentence) for sentence in sentences)
+        inside = sum(label != "O" for seq in answers for label in seq)
+        self.assertAlmostEqual(inside / n_tokens, 0.3, delta=0.03)
+        self.assertEqual(sorted(knowns), ["T0", "T1", "T2"])
+        self.assertEqual(sum(len(words) for words in knowns.values()), 300)
+        with self.assertRaises(ValueError):
+            make_corpus(10, scheme="IOB1")
+        with self.assertRaises(ValueError):
+            make_corpus(10, density=1.0)
+
+
+class TestBench(unittest.TestCase):
+    def test_run_and_compare(self):
+
+        config = {"n_sentences": 50, "scheme": "BIOES"}
+        current = run_benchmarks(config, repeat=1)
+        self.assertEqual(list(current["results"]), list(BENCHMARKS))
+        for result in current["results"].values():
+            self.assertGreater(result["tokens_per_sec"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+        self.assertEqual(compare(current, current), [])
+
+        slower = {
+            "config": config,
+            "results": {
+                name: dict(result, seconds=result["seconds"] * 2)
+                for name, result in current["results"].items()
+            },
+        }
+        self.assertEqual(len(compare(slower, current)), len(BENCHMARKS))
+        self.assertEqual(
+            compare(current, dict(current, config={}))[0],
+            "config differs from the baseline",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from miner import Miner
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+
+    from miner.bootstrap import (
+        confidence_intervals,
+        f1_scores,
+        paired_test,
+        resample,
+        sentence_counts,
+    )
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        answers, predicts, sentences, knowns = random_corpus(0, n_sentences=100)
+        self.miner = Miner(answers, predicts, sentences, knowns)
+        self.other = Miner(answers, answers, sentences, knowns)
+
+    def test_sentence_counts(self):
+
+        for mode, report in [
+            ("default", self.miner.default_report()),
+            ("known", self.miner.known_only_report()),
+            ("unknown", self.miner.unknown_only_report()),
+        ]:
+            matrix = sentence_counts(
+                *self.miner._span_tables(),
+                len(self.miner.sentences),
+                self.miner.types,
+                mode
+            )
+            self.assertEqual(matrix.shape, (100, len(self.miner.types), 3))
+            p, r, f1 = f1_scores(matrix.sum(axis=0))
+            for i, type_ in enumerate(self.miner.types):
+                self.assertAlmostEqual(p[i], report[type_]["precision"])
+                self.assertAlmostEqual(r[i], report[type_]["recall"])
+                self.assertAlmostEqual(f1[i], report[type_]["f1_score"])
+                self.assertEqual(matrix[:, i, 2].sum(), report[type_]["num"])
+
+    def test_resample(self):
+
+        matrix = sentence_counts(
+            *self.miner._span_tables(), len(self.miner.sentences), self.miner.types
+        )
+        (first,) = resample([matrix], 30, seed=1, chunk_size=7)
+        (second,) = resample([matrix], 30, seed=1, n_jobs=2, chunk_size=7)
+        self.assertEqual(first.shape, (30, len(self.miner.types), 3))
+        np.testing.assert_array_equal(first, second)
+        (third,) = resample([matrix], 30, seed=2, chunk_size=7)
+        self.assertFalse(np.array_equal(first, third))
+
+    def test_confidence_intervals(self):
+
+        report = self.miner.default_report()
+        intervals = confidence_intervals(self.miner, n_resamples=200)
+        self.assertEqual(list(intervals), self.miner.types)
+        for type_, interval in intervals.items():
+            lower, upper = interval["f1_score"]
+            self.assertLessEqual(lower, upper)
+            self.assertLessEqual(lower, report[type_]["f1_score"] + 0.1)
+            self.assertGreaterEqual(upper, report[type_]["f1_score"] - 0.1)
+
+    def test_paired_test(self):
+
+        result = paired_test(self.other, self.miner, n_resamples=200)
+        overall = result["overall"]
+        self.assertAlmostEqual(
+            overall["delta"],
+            1.0 - self.miner.default_report()["overall"]["f1_score"],
+        )
+        self.assertLess(overall["p_value"], 0.05)
+        same = paired_test(self.miner, self.miner, n_resamples=50)
+        self.assertEqual(same["overall"], {"delta": 0.0, "p_value": 1.0})
+
+    def test_no_sentences(self):
+
+        empty = Miner([], [], [])
+        zero = (0.0, 0.0)
+        self.assertEqual(
+            confidence_intervals(empty, n_resamples=20),
+            {"overall": dict.fromkeys(("precision", "recall", "f1_score"), zero)},
+        )
+        self.assertEqual(
+            paired_test(empty, empty, n_resamples=20),
+            {"overall": {"delta": 0.0, "p_value": 1.0}},
+        )
@@ -0,0 +1,98 @@
+import unittest
+
+from miner import Miner
+from miner.buckets import (
+    Buckets,
+    bucket_counts,
+    by_frequency,
+    by_length,
+    by_sentence_length,
+)
+from miner.scoring import Counts
+
+from .test_spans import random_corpus
+
+
+class TestBuckets(unittest.TestCase):
+    def test_labels(self):
+
+        buckets = Buckets([4, 1, 2], lambda entity: entity)
+        self.assertEqual(buckets.labels, ["<1", "1", "2-3", "4+"])
+        self.assertEqual(
+            [buckets(v) for v in [0, 1, 2, 3, 4, 10]],
+            buckets.labels[:3] + ["2-3", "4+", "4+"],
+        )
+        with self.assertRaises(ValueError):
+            Buckets([], len)
+
+
+class TestBucketedReport(unittest.TestCase):
+    def setUp(self):
+        self.answers = [
+            ["B-PSN", "I-PSN", "O", "B-LOC", "O"],
+            ["B-ORG", "I-ORG", "I-ORG", "O", "O"],
+            ["S-PSN", "O"],
+        ]
+        self.predicts = [
+            ["B-PSN", "I-PSN", "O", "B-LOC", "O"],
+            ["B-ORG", "I-ORG", "O", "O", "B-LOC"],
+            ["S-PSN", "O"],
+        ]
+        self.sentences = [
+            ["花子", "さん", "は", "東京", "へ"],
+            ["株式", "会社", "テスト", "の", "大阪"],
+            ["太郎", "だ"],
+        ]
+        self.knowns = {"PSN": ["花子さん"], "LOC": ["東京"], "ORG": []}
+        self.miner = Miner(
+            self.answers, self.predicts, self.sentences, dict(self.knowns)
+        )
+
+    def test_report(self):
+
+        reports = self.miner.bucketed_report(
+            {
+                "length": by_length(),
+                "frequency": by_frequency({"東京": 3, "花子さん": 1}),
+                "sentence": by_sentence_length([1, 5]),
+            }
+        )
+        length = reports["length"]
+        self.assertEqual(list(length), ["1", "2", "3"])
+        self.assertEqual(length["1"]["overall"]["num"], 2)
+        self.assertEqual(length["1"]["overall"]["precision"], 2 / 3)
+        self.assertEqual(length["2"]["PSN"]["f1_score"], 1.0)
+        self.assertEqual(length["3"]["ORG"]["recall"], 0.0)
+        self.assertEqual(list(reports["frequency"]), ["0", "1", "2-9"])
+        self.assertEqual(reports["frequency"]["2-9"]["LOC"]["f1_score"], 1.0)
+        self.assertEqual(list(reports["sentence"]), ["1-4", "5+"])
+        self.assertEqual(reports["sentence"]["1-4"]["overall"]["num"], 1)
+
+    def test_mode(self):
+
+        known = self.miner.bucketed_report({"length": by_length()}, "known")
+        self.assertEqual(known["length"]["1"]["overall"]["num"], 1)
+        self.assertEqual(known["length"]["3"]["ORG"]["num"], 0)
+
+    def test_custom_function(self):
+
+        reports = self.miner.bucketed_report({"type": lambda entity: entity.type})
+        self.assertEqual(list(reports["type"]), ["LOC", "ORG", "PSN"])
+        self.assertEqual(reports["type"]["PSN"]["overall"]["f1_score"], 1.0)
+
+    def test_sum_of_buckets(self):
+
+        for seed in range(5):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            miner = Miner(answers, predicts, sentences, dict(knowns))
+            fns = {"length": by_length([1, 3]), "sentence": by_sentence_length()}
+            counts = bucket_counts(*miner._span_tables(), sentences, fns)
+            for name in fns:
+                total = Counts()
+                for bucket in counts[name].values():
+                    total += bucket
+                self.assertEqual(total, miner._counts())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from miner import Miner
+from miner.cache import cached_decode, fingerprint, load_table, save_table
+from miner.compare import MultiMiner
+from miner.encoding import EncodedCorpus
+from miner.known import KnownWordIndex
+from miner.spans import decode
+
+from .test_spans import random_corpus
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.knowns = dict(knowns)
+        self.index = KnownWordIndex(self.knowns)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def files(self):
+        return sorted(os.listdir(self.dir))
+
+    def assert_same_table(self, table, expect):
+        self.assertEqual(table.types, expect.types)
+        self.assertEqual(list(table.rows()), list(expect.rows()))
+
+    def test_fingerprint(self):
+
+        key = fingerprint(self.answers, self.sentences, self.index)
+        self.assertEqual(key, fingerprint(self.answers, self.sentences, self.index))
+        self.assertEqual(
+            key,
+            fingerprint(
+                EncodedCorpus.from_labels(self.answers), self.sentences, self.index
+            ),
+        )
+        self.assertNotEqual(key, fingerprint(self.predicts, self.sentences, self.index))
+        self.assertNotEqual(key, fingerprint(self.answers, self.sentences))
+        self.assertNotEqual(
+            key,
+            fingerprint(
+                self.answers, self.sentences, KnownWordIndex({"PSN": ["花子"]})
+            ),
+        )
+
+    def test_save_and_load(self):
+
+        table = decode(self.answers, self.sentences, self.index, {})
+        path = os.path.join(self.dir, "gold.spans")
+        save_table(path, table, "key")
+        loaded = load_table(path, "key")
+        self.assert_same_table(loaded, table)
+        # mapped without copying
+        self.assertIsInstance(loaded.sents, memoryview)
+        self.assertIsNone(load_table(path, "other"))
+        self.assertIsNone(load_table(os.path.join(self.dir, "missing.spans")))
+        self.assert_same_table(pickle.loads(pickle.dumps(loaded)), table)
+
+        # broken files
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        self.assertIsNone(load_table(path))
+        for content in [b"", b"MINERSPN", b"x" * 100]:
+            with open(path, "wb") as f:
+                f.write(content)
+            self.assertIsNone(load_table(path))
+
+    def test_empty_table(self):
+
+        table = decode([["O"]], [["a"]], self.index, {})
+        path = os.path.join(self.dir, "empty.spans")
+        save_table(path, table, "key")
+        self.assertEqual(len(load_table(path)), 0)
+
+    def test_cached_decode(self):
+
+        expect = decode(self.answers, self.sentences, self.index, {})
+        table = cached_decode(self.dir, self.answers, self.sentences, self.index)
+        self.assert_same_table(table, expect)
+        self.assertEqual(len(self.files()), 1)
+        table = cached_decode(self.dir, self.answers, self.sentences, self.index)
+        self.assertIsInstance(table.sents, memoryview)
+        self.assert_same_table(table, expect)
+
+        # stale cache is rebuilt
+        path = os.path.join(self.dir, self.files()[0])
+        with open(path, "wb") as f:
+            f.write(b"broken")
+        table = cached_decode(self.dir, self.answers, self.sentences, self.index)
+        self.assert_same_table(table, expect)
+        self.assertIsNotNone(load_table(path))
+
+        # other inputs are cached separately
+        cached_decode(self.dir, self.predicts, self.sentences, self.index)
+        self.assertEqual(len(self.files()), 2)
+
+    def test_miner(self):
+
+        expect = Miner(self.answers, self.predicts, self.sentences, dict(self.knowns))
+        for _ in range(2):
+            miner = Miner(
+                self.answers,
+                self.predicts,
+                self.sentences,
+                dict(self.knowns),
+                cache_dir=self.dir,
+            )
+            self.assertEqual(miner.default_report(), expect.default_report())
+            self.assertEqual(miner.unknown_only_report(), expect.unknown_only_report())
+            self.assertEqual(
+                miner.return_answer_named_entities(),
+                expect.return_answer_named_entities(),
+            )
+        self.assertIsInstance(miner._span_tables()[0].sents, memoryview)
+        self.assertEqual(len(self.files()), 1)
+
+        # known words changed
+        miner.known_words = {"PSN": ["花子"]}
+        self.assertEqual(
+            miner.known_only_report(),
+            Miner(
+                self.answers, self.predicts, self.sentences, {"PSN": ["花子"]}
+            ).known_only_report(),
+        )
+        self.assertEqual(len(self.files()), 2)
+
+    def test_miner_n_jobs(self):
+
+        expect = Miner(self.answers, self.predicts, self.sentences, dict(self.knowns))
+        for compact in (False, True, False):
+            miner = Miner(
+                self.answers,
+                self.predicts,
+                self.sentences,
+                dict(self.knowns),
+                compact=compact,
+                n_jobs=2,
+                cache_dir=self.dir,
+            )
+            self.assertEqual(miner.default_report(), expect.default_report())
+            self.assertEqual(miner.known_only_report(), expect.known_only_report())
+            # decoded answers are kept for later Miners
+            self.assertEqual(len(self.files()), 1)
+
+    def test_multi_miner(self):
+
+        systems = {"a": self.predicts, "b": self.answers}
+        expect = MultiMiner(self.answers, self.sentences, dict(self.knowns))
+        expect.add_many(systems)
+        for n_jobs in (1, 2):
+            multi = MultiMiner(
+                self.answers,
+                self.sentences,
+                dict(self.knowns),
+                n_jobs=n_jobs,
+                cache_dir=self.dir,
+            )
+            multi.add_many(systems)
+            self.assertEqual(multi.reports(), expect.reports())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from miner import Miner
+from miner.compare import MultiMiner
+
+from .test_spans import random_corpus
+
+
+class TestMultiMiner(unittest.TestCase):
+    def setUp(self):
+        self.answers, _, self.sentences, self.knowns = random_corpus(0)
+        self.systems = {
+            "seed{}".format(seed): random_corpus(seed)[1] for seed in range(1, 4)
+        }
+        self.systems["oracle"] = self.answers
+
+    def assert_same_as_miner(self, multi):
+        for name, predicts in self.systems.items():
+            m = Miner(self.answers, predicts, self.sentences, dict(self.knowns))
+            self.assertEqual(multi.report(name), m.default_report())
+            self.assertEqual(multi.report(name, "known"), m.known_only_report())
+            self.assertEqual(multi.report(name, "unknown"), m.unknown_only_report())
+
+    def test_reports(self):
+
+        multi = MultiMiner(self.answers, self.sentences, dict(self.knowns))
+        for name, predicts in self.systems.items():
+            multi.add(name, predicts)
+        self.assertEqual(list(multi.reports()), list(self.systems))
+        self.assert_same_as_miner(multi)
+
+    def test_parallel(self):
+
+        multi = MultiMiner(self.answers, self.sentences, dict(self.knowns), n_jobs=2)
+        multi.add_many(self.systems)
+        self.assert_same_as_miner(multi)
+
+    def test_compare(self):
+
+        multi = MultiMiner(self.answers, self.sentences).add_many(self.systems)
+        table = multi.compare("f1_score")
+        self.assertEqual(table["oracle"]["overall"], 1.0)
+        self.assertEqual(set(table["seed1"]), set(multi.types))
+        out = io.StringIO()
+        with redirect_stdout(out):
+            multi.compare("num", print_=True)
+        self.assertIn("oracle", out.getvalue())
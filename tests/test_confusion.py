@@ -0,0 +1,84 @@
+import unittest
+
+from miner import Miner
+from miner.confusion import confusion_matrix, entity_mask
+from miner.encoding import EncodedCorpus
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+ANSWERS = [["B-PSN", "I-PSN", "O", "B-LOC"], ["O", "B-LOC", "I-LOC"]]
+PREDICTS = [["B-PSN", "B-PSN", "O", "B-PSN"], ["O", "B-LOC", "O"]]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestConfusion(unittest.TestCase):
+    def test_confusion_matrix(self):
+
+        cm = confusion_matrix(ANSWERS, PREDICTS)
+        self.assertEqual(cm.labels, ["O", "B-LOC", "I-LOC", "B-PSN", "I-PSN"])
+        self.assertEqual(
+            cm.as_dict(),
+            {
+                "O": {"O": 2},
+                "B-LOC": {"B-LOC": 1, "B-PSN": 1},
+                "I-LOC": {"O": 1},
+                "B-PSN": {"B-PSN": 1},
+                "I-PSN": {"B-PSN": 1},
+            },
+        )
+        self.assertEqual(cm["B-LOC", "B-PSN"], 1)
+        self.assertAlmostEqual(cm.accuracy(), 4 / 7)
+        report = cm.report()
+        self.assertEqual(
+            report["B-PSN"],
+            {"precision": 1 / 3, "recall": 1.0, "f1_score": 0.5, "num": 1},
+        )
+        self.assertEqual(report["I-LOC"]["precision"], 0.0)
+        self.assertEqual(report["O"]["precision"], 2 / 3)
+
+    def test_encoded_and_mask(self):
+
+        expect = confusion_matrix(ANSWERS, PREDICTS)
+        cm = confusion_matrix(
+            EncodedCorpus.from_labels(ANSWERS), EncodedCorpus.from_labels(PREDICTS)
+        )
+        self.assertEqual(cm.as_dict(), expect.as_dict())
+        cm = confusion_matrix(ANSWERS, PREDICTS, mask=[1, 1, 0, 0, 0, 0, 0])
+        self.assertEqual(cm.as_dict(), {"B-PSN": {"B-PSN": 1}, "I-PSN": {"B-PSN": 1}})
+        with self.assertRaises(ValueError):
+            confusion_matrix(ANSWERS, [["O"], ["O"]])
+
+    def test_miner(self):
+
+        answers, predicts, sentences, knowns = random_corpus(0)
+        miner = Miner(answers, predicts, sentences, dict(knowns))
+        cm = miner.confusion_matrix()
+        for gold, pred in [("B-PSN", "I-PSN"), ("O", "B-LOC"), ("I-ORG", "O")]:
+            expect = sum(
+                a == gold and p == pred
+                for ans, prd in zip(answers, predicts)
+                for a, p in zip(ans, prd)
+            )
+            self.assertEqual(cm[gold, pred], expect)
+        self.assertEqual(cm.matrix.sum(), sum(map(len, answers)))
+
+        # known and unknown tokens are inside named entities
+        lengths = list(map(len, answers))
+        inside = entity_mask(miner._span_tables(), lengths).sum()
+        known = miner.confusion_matrix("known").matrix.sum()
+        unknown = miner.confusion_matrix("unknown").matrix.sum()
+        self.assertGreater(known, 0)
+        self.assertGreater(unknown, 0)
+        self.assertGreaterEqual(known + unknown, inside)
+        self.assertLessEqual(max(known, unknown), inside)
+        with self.assertRaises(ValueError):
+            miner.confusion_matrix("all")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+from miner import Miner
+from miner.conll import evaluate_conll, iter_batches, read_conll
+
+from .test_spans import random_corpus
+
+
+def to_conll(answers, predicts, sentences):
+    lines = ["-DOCSTART- O O", ""]
+    for answer, predict, sentence in zip(answers, predicts, sentences):
+        if not sentence:
+            continue
+        lines.extend(" ".join(row) for row in zip(sentence, answer, predict))
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+class TestConll(unittest.TestCase):
+    def setUp(self):
+        answers, predicts, sentences, self.knowns = random_corpus(0)
+        # blank lines cannot express empty sentences
+        keep = [i for i, s in enumerate(sentences) if s]
+        self.answers = [answers[i] for i in keep]
+        self.predicts = [predicts[i] for i in keep]
+        self.sentences = [sentences[i] for i in keep]
+        self.text = to_conll(self.answers, self.predicts, self.sentences)
+
+    def test_read_conll(self):
+
+        result = list(read_conll(io.StringIO(self.text)))
+        self.assertEqual(result, list(zip(self.sentences, self.answers, self.predicts)))
+        # columns and separator
+        text = "1\tO\t東京\tB-LOC\n2\tO\t駅\tI-LOC\n\n"
+        result = list(read_conll(io.StringIO(text), columns=(2, 3, 1), sep="\t"))
+        self.assertEqual(result, [(["東京", "駅"], ["B-LOC", "I-LOC"], ["O", "O"])])
+        with self.assertRaises(ValueError):
+            list(read_conll(io.StringIO("東京 B-LOC\n")))
+
+    def test_sources(self):
+
+        expect = list(read_conll(io.StringIO(self.text)))
+        data = self.text.replace("\n", "\r\n").encode("utf-8")
+        self.assertEqual(list(read_conll(io.BytesIO(data))), expect)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "predict.conll")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(list(read_conll(path)), expect)
+            self.assertEqual(list(read_conll(path, use_mmap=False)), expect)
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self.assertEqual(list(read_conll(mm)), expect)
+            empty = os.path.join(tmp, "empty.conll")
+            open(empty, "w").close()
+            self.assertEqual(list(read_conll(empty)), [])
+
+    def test_iter_batches(self):
+
+        batches = list(iter_batches(read_conll(io.StringIO(self.text)), 10))
+        self.assertTrue(all(len(batch[0]) <= 10 for batch in batches))
+        self.assertEqual([s for b in batches for s in b[2]], self.sentences)
+
+    def test_evaluate_conll(self):
+
+        m = Miner(self.answers, self.predicts, self.sentences, dict(self.knowns))
+        result = evaluate_conll(io.StringIO(self.text), dict(self.knowns), batch_size=8)
+        self.assertEqual(result.default_report(), m.default_report())
+        self.assertEqual(result.unknown_only_report(), m.unknown_only_report())
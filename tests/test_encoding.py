@@ -0,0 +1,90 @@
+import unittest
+from array import array
+
+from miner import Miner
+from miner.encoding import EncodedCorpus, LabelVocab
+from miner.spans import decode_encoded, decode_spans
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestEncoding(unittest.TestCase):
+    def setUp(self):
+        self.answers = [
+            "B-PSN O O B-LOC O O O O".split(" "),
+            "B-PSN I-PSN O O B-LOC I-LOC O O O O".split(" "),
+            "S-PSN O O S-PSN O O B-LOC I-LOC E-LOC O O O O".split(" "),
+        ]
+
+    def test_label_vocab(self):
+
+        vocab = LabelVocab(["B-PSN", "I-PSN", "X-LOC"])
+        self.assertEqual(vocab.labels, ["O", "B-PSN", "I-PSN", "X-LOC"])
+        self.assertEqual(vocab.types, ["O", "PSN", "LOC"])
+        self.assertEqual(list(vocab.prefix_of), [0, 1, 2, 7])
+        self.assertEqual(list(vocab.type_of), [0, 1, 1, 2])
+        self.assertEqual(vocab.encode(["O", "B-PSN", "B-LOC"]), array("H", [0, 1, 4]))
+        self.assertEqual(vocab.decode([4, 0]), ["B-LOC", "O"])
+
+    def test_encoded_corpus(self):
+
+        corpus = EncodedCorpus.from_labels(self.answers)
+        self.assertEqual(len(corpus), 3)
+        self.assertEqual(list(corpus), self.answers)
+        self.assertEqual(corpus[-1], self.answers[-1])
+        self.assertEqual(corpus[1:], self.answers[1:])
+        self.assertEqual(corpus.types(), {"PSN", "LOC"})
+        self.assertEqual(corpus.tags.typecode, "H")
+        self.assertEqual(corpus.nbytes(), 31 * 2 + 4 * corpus.offsets.itemsize)
+        self.assertEqual(list(corpus.subcorpus(1, 3)), self.answers[1:3])
+        self.assertEqual(list(corpus.subcorpus(1, 1)), [])
+        with self.assertRaises(IndexError):
+            corpus[3]
+        with self.assertRaises(ValueError):
+            EncodedCorpus(array("H", [0]), array("l", [0]), LabelVocab())
+
+    def test_decode_encoded(self):
+
+        for seed in range(10):
+            answers, _, sentences, knowns = random_corpus(seed)
+            m = Miner(answers, answers, sentences, knowns)
+            corpus = EncodedCorpus.from_labels(answers)
+            expect = decode_spans(answers, sentences, m.known_index)
+            result = decode_encoded(corpus, sentences, m.known_index)
+            self.assertEqual(result.types, expect.types)
+            self.assertEqual(list(result.rows()), list(expect.rows()))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_buffers(self):
+
+        corpus = EncodedCorpus.from_labels(self.answers)
+        np_corpus = EncodedCorpus(
+            np.asarray(corpus.tags, dtype=np.uint16),
+            np.asarray(corpus.offsets, dtype=np.int64),
+            corpus.vocab,
+        )
+        sentences = [["x"] * len(seq) for seq in self.answers]
+        self.assertEqual(
+            list(decode_encoded(np_corpus, sentences).rows()),
+            list(decode_encoded(corpus, sentences).rows()),
+        )
+        self.assertEqual(np_corpus.nbytes(), corpus.nbytes())
+
+    def test_compact_miner(self):
+
+        for seed in range(10):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            expect = Miner(answers, predicts, sentences, dict(knowns))
+            m = Miner(answers, predicts, sentences, dict(knowns), compact=True)
+            self.assertIsInstance(m.answers, EncodedCorpus)
+            self.assertIs(m.answers.vocab, m.predicts.vocab)
+            self.assertEqual(m.types, expect.types)
+            self.assertEqual(m.default_report(), expect.default_report())
+            self.assertEqual(m.known_only_report(), expect.known_only_report())
+            self.assertEqual(m.unknown_only_report(), expect.unknown_only_report())
+            self.assertEqual(m.return_miss_labelings(), expect.return_miss_labelings())
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from miner import Miner
+from miner.export import COLUMNS, SpanExport
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.miner = Miner(self.answers, self.predicts, self.sentences, dict(knowns))
+
+    def nested(self, export: SpanExport, source: str):
+        # rebuild return_*_named_entities_no_set from the columns
+        result = {
+            known: {type_: [] for type_ in self.miner.types}
+            for known in ("known", "unknown")
+        }
+        for record in export.records():
+            if record["source"] == source:
+                known = "known" if record["known"] else "unknown"
+                result[known][record["type"]].append(record["surface"])
+        return result
+
+    def test_columns(self):
+
+        export = self.miner.export_spans()
+        ans_table, pred_table = self.miner._span_tables()
+        self.assertEqual(len(export), len(ans_table) + len(pred_table))
+        self.assertEqual(list(export.columns), list(COLUMNS))
+        self.assertEqual(
+            self.nested(export, "answer"),
+            self.miner.return_answer_named_entities_no_set(),
+        )
+        self.assertEqual(
+            self.nested(export, "predict"),
+            self.miner.return_predict_named_entities_no_set(),
+        )
+        # surface strings are interned
+        self.assertEqual(len(set(export.surfaces)), len(export.surfaces))
+        self.assertLess(len(export.surfaces), len(export))
+
+    def test_categories(self):
+
+        export = self.miner.export_spans()
+        detailed = self.miner.export_spans(classify=True)
+        categories = [r["category"] for r in export.records()]
+        self.assertEqual(set(categories), {"exact", "missed", "spurious"})
+        for coarse, record in zip(categories, detailed.records()):
+            self.assertEqual(coarse == "exact", record["category"] == "exact")
+        n_exact = categories.count("exact")
+        tp = self.miner.default_report()["overall"]
+        self.assertEqual(n_exact, 2 * round(tp["recall"] * tp["num"]))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_save(self):
+
+        export = self.miner.export_spans(sep=" ")
+        with tempfile.TemporaryDirectory() as tmp:
+            for compress in (False, True):
+                path = os.path.join(tmp, "spans.npz")
+                export.save(path, compress)
+                loaded = SpanExport.load(path)
+                self.assertEqual(loaded.types, export.types)
+                self.assertEqual(loaded.surfaces, export.surfaces)
+                self.assertEqual(list(loaded.records()), list(export.records()))
+
+    def test_jsonl(self):
+
+        export = self.miner.export_spans(sep=" ")
+        f = io.StringIO()
+        self.assertEqual(export.write_jsonl(f), len(export))
+        lines = f.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], list(export.records()))
+        self.assertEqual(
+            lines[0], json.dumps(next(export.records()), ensure_ascii=False)
+        )
+
+        empty = Miner([["O"]], [["O"]], [["a"]]).export_spans()
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.write_jsonl(io.StringIO()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
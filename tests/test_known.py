@@ -0,0 +1,62 @@
+import pickle
+import unittest
+
+from miner import Miner
+from miner.known import KnownWordIndex
+
+from .test_spans import random_corpus
+
+
+class TestKnownWordIndex(unittest.TestCase):
+    def setUp(self):
+        self.knowns = {"PSN": ["花子", "山田太郎"], "LOC": ["東京", "東京駅"]}
+        self.index = KnownWordIndex(self.knowns)
+
+    def test_mapping(self):
+
+        self.assertEqual(list(self.index), ["PSN", "LOC", "overall"])
+        self.assertEqual(self.index["PSN"], frozenset(["花子", "山田太郎"]))
+        self.assertEqual(
+            self.index["overall"], frozenset(["花子", "山田太郎", "東京", "東京駅"])
+        )
+        self.assertTrue(self.index)
+        self.assertFalse(KnownWordIndex())
+
+    def test_is_known(self):
+
+        self.assertTrue(self.index.is_known("花子", "PSN"))
+        self.assertFalse(self.index.is_known("花子", "LOC"))
+        self.assertTrue(self.index.is_known("花子", "overall"))
+        self.assertFalse(self.index.is_known("花子", "ORG"))
+
+    def test_flags(self):
+
+        trie = KnownWordIndex(self.knowns, trie=True)
+        for morphs, type_ in [
+            (["山田", "太郎"], "PSN"),
+            (["山田"], "PSN"),
+            (["東京", "駅"], "PSN"),
+            (["東", "京駅"], "LOC"),
+            (["東京", "タワー"], "LOC"),
+            ([], "LOC"),
+        ]:
+            self.assertEqual(trie.flags(morphs, type_), self.index.flags(morphs, type_))
+        self.assertEqual(trie.flags(["東京", "駅"], "PSN"), (False, True))
+
+    def test_pickle(self):
+
+        for index in [self.index, KnownWordIndex(self.knowns, trie=True)]:
+            loaded = pickle.loads(pickle.dumps(index))
+            self.assertEqual(loaded, index)
+            self.assertEqual(loaded.trie, index.trie)
+
+    def test_share_between_miners(self):
+
+        for seed in range(5):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            index = KnownWordIndex(knowns, trie=seed % 2 == 0)
+            expect = Miner(answers, predicts, sentences, knowns)
+            m = Miner(answers, predicts, sentences, index)
+            self.assertIs(m.known_index, index)
+            self.assertEqual(m.known_only_report(), expect.known_only_report())
+            self.assertEqual(m.unknown_only_report(), expect.unknown_only_report())
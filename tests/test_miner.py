@@ -221,3 +221,50 @@ class TestMiner(unittest.TestCase):
         self.assertTrue(self.miner._check_add_entity("ボブ", "PSN"))
         self.assertTrue(self.miner._check_add_entity("東京スカイツリー", "LOC"))
         self.assertFalse(self.miner._check_add_entity("東京", "LOC"))
+
+    def test_cached_reports(self):
+
+        counts = self.miner._counts()
+        self.miner.unknown_only_report(False)
+        self.assertIs(self.miner._counts(), counts)
+        # reports do not change the instance state
+        self.assertTrue(self.miner.check_known and self.miner.check_unknown)
+        self.assertEqual(self.miner.evaluations("LOC", "known"), (1.0, 1.0, 1.0))
+        self.assertEqual(self.miner.num_of_ne("PSN", "unknown"), 2)
+
+        # assigning inputs drops the cache
+        self.miner.predicts = self.answers
+        self.assertIsNot(self.miner._counts(), counts)
+        self.assertEqual(self.miner.default_report()["overall"]["f1_score"], 1.0)
+        self.miner.known_words = {"PSN": ["花子", "ボブ"]}
+        self.assertEqual(self.miner.known_only_report()["PSN"]["num"], 3)
+        # modifying inputs in place needs invalidate()
+        self.miner.predicts = [list(seq) for seq in self.answers]
+        self.miner.default_report()
+        self.miner.predicts[0][0] = "O"
+        self.miner.invalidate()
+        self.assertEqual(self.miner.default_report()["PSN"]["precision"], 1.0)
+        self.assertEqual(self.miner.default_report()["PSN"]["recall"], 0.75)
+
+    def test_concurrent_reports(self):
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        expect = {
+            "default": self.miner.default_report(),
+            "known": self.miner.known_only_report(),
+            "unknown": self.miner.unknown_only_report(),
+        }
+        methods = {
+            "default": "default_report",
+            "known": "known_only_report",
+            "unknown": "unknown_only_report",
+        }
+        m = Miner(self.answers, self.predicts, self.sentences, self.knowns)
+        modes = ["default", "known", "unknown"] * 30
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(lambda mode: getattr(m, methods[mode])(), modes)
+            )
+        for mode, result in zip(modes, results):
+            self.assertEqual(result, expect[mode])
@@ -0,0 +1,62 @@
+import unittest
+
+from miner import Miner
+from miner.parallel import parallel_counts, resolve_n_jobs, shard_bounds
+
+from .test_spans import random_corpus
+
+
+class TestParallel(unittest.TestCase):
+    def test_shard_bounds(self):
+
+        self.assertEqual(shard_bounds(10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(shard_bounds(2, 8), [(0, 1), (1, 2)])
+        self.assertEqual(shard_bounds(0, 4), [(0, 0)])
+
+    def test_resolve_n_jobs(self):
+
+        self.assertEqual(resolve_n_jobs(1), 1)
+        self.assertEqual(resolve_n_jobs(None), 1)
+        self.assertGreaterEqual(resolve_n_jobs(-1), 1)
+
+    def test_parallel_counts(self):
+
+        answers, predicts, sentences, knowns = random_corpus(0, n_sentences=200)
+        m = Miner(answers, predicts, sentences, knowns)
+        for n_jobs in [1, 2]:
+            counts = parallel_counts(
+                answers, predicts, sentences, m.known_index, n_jobs=n_jobs
+            )
+            self.assertEqual(counts, m._counts())
+
+        # answers decoded in advance are sent to the workers in shards
+        ans_table = m._span_tables()[0]
+        shard = ans_table.subtable(50, 120)
+        self.assertEqual(
+            list(shard.rows()),
+            [
+                (sent - 50, *rest)
+                for sent, *rest in ans_table.rows()
+                if 50 <= sent < 120
+            ],
+        )
+        for n_jobs in [1, 2]:
+            counts = parallel_counts(
+                ans_table, predicts, sentences, m.known_index, n_jobs=n_jobs
+            )
+            self.assertEqual(counts, m._counts())
+
+    def test_miner_n_jobs(self):
+
+        for compact in [False, True]:
+            answers, predicts, sentences, knowns = random_corpus(1, n_sentences=200)
+            expect = Miner(answers, predicts, sentences, dict(knowns))
+            m = Miner(
+                answers, predicts, sentences, dict(knowns), compact=compact, n_jobs=2
+            )
+            self.assertEqual(m.default_report(), expect.default_report())
+            self.assertEqual(m.known_only_report(), expect.known_only_report())
+            self.assertEqual(
+                m.segmentation_score("unknown", False),
+                expect.segmentation_score("unknown", False),
+            )
@@ -0,0 +1,87 @@
+import json
+import unittest
+
+from miner import Miner
+from miner.profiling import profile, stage
+from miner.stream import StreamingMiner
+
+from .test_spans import random_corpus
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.knowns = dict(knowns)
+        self.n_tokens = sum(len(sentence) for sentence in self.sentences)
+
+    def test_disabled(self):
+
+        with stage("decode") as timer:
+            timer.add(tokens=10)
+        self.assertFalse(timer)
+
+    def test_report_stages(self):
+
+        miner = Miner(self.answers, self.predicts, self.sentences, self.knowns)
+        with profile() as prof:
+            miner.default_report()
+            miner.unknown_only_report()
+        result = prof.as_dict()
+        stages = result["stages"]
+        self.assertEqual(list(stages), ["decode", "known_lookup", "count", "report"])
+        ans_table, pred_table = miner._span_tables()
+        n_spans = len(ans_table) + len(pred_table)
+        self.assertEqual(stages["decode"]["calls"], 2)
+        self.assertEqual(stages["decode"]["tokens"], 2 * self.n_tokens)
+        self.assertEqual(stages["decode"]["spans"], n_spans)
+        self.assertEqual(stages["known_lookup"]["spans"], n_spans)
+        self.assertEqual(stages["count"]["calls"], 1)
+        self.assertEqual(stages["report"]["calls"], 2)
+        self.assertGreaterEqual(
+            result["seconds"], sum(s["seconds"] for s in stages.values())
+        )
+        # shippable as it is
+        json.dumps(result)
+
+    def test_legacy_stages(self):
+
+        miner = Miner(self.answers, self.predicts, self.sentences, self.knowns)
+        with profile() as prof:
+            entities = miner._entity_indexes(self.answers, "overall")
+        stages = prof.as_dict()["stages"]
+        self.assertEqual(list(stages), ["flatten", "entity_indexes"])
+        self.assertEqual(stages["entity_indexes"]["spans"], len(entities))
+        self.assertEqual(
+            stages["flatten"]["tokens"], self.n_tokens + len(self.sentences)
+        )
+
+    def test_callback(self):
+
+        events = []
+        stream = StreamingMiner(self.knowns)
+        with profile(lambda *event: events.append(event)):
+            stream.update(self.answers, self.predicts, self.sentences)
+        self.assertEqual(
+            [name for name, *_ in events],
+            ["decode", "known_lookup", "decode", "known_lookup", "count"],
+        )
+        self.assertTrue(all(seconds >= 0 for _, seconds, _, _ in events))
+
+    def test_nested_and_errors(self):
+
+        with profile() as outer:
+            with profile() as inner:
+                with stage("a"):
+                    pass
+            with self.assertRaises(KeyError):
+                with stage("b"):
+                    raise KeyError
+        self.assertEqual(list(inner.as_dict()["stages"]), ["a"])
+        self.assertEqual(list(outer.as_dict()["stages"]), ["b"])
+        with stage("c") as timer:
+            pass
+        self.assertFalse(timer)
+
+
+if __name__ == "__main__":
+    unittest.main()
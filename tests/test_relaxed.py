@@ -0,0 +1,117 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from miner import Miner
+from miner.relaxed import SCHEMES, RelaxedCounts, relaxed_counts
+
+from .test_spans import random_corpus
+
+
+class TestRelaxedReport(unittest.TestCase):
+    def setUp(self):
+        self.answers = [
+            ["B-PSN", "I-PSN", "O", "B-LOC", "O"],
+            ["B-ORG", "I-ORG", "I-ORG", "O", "O"],
+            ["S-PSN", "O", "O", "O", "O"],
+        ]
+        self.predicts = [
+            ["B-PSN", "I-PSN", "O", "B-PSN", "O"],
+            ["B-ORG", "I-ORG", "O", "O", "B-LOC"],
+            ["O", "O", "O", "O", "O"],
+        ]
+        self.sentences = [
+            ["花子", "さん", "は", "東京", "へ"],
+            ["株式", "会社", "テスト", "の", "大阪"],
+            ["太郎", "が", "来", "た", "。"],
+        ]
+        self.knowns = {"PSN": ["花子さん"], "LOC": ["東京"], "ORG": []}
+        self.miner = Miner(
+            self.answers, self.predicts, self.sentences, dict(self.knowns)
+        )
+
+    def outcomes(self, report):
+        keys = ("correct", "incorrect", "partial", "missed", "spurious")
+        return tuple(report[key] for key in keys)
+
+    def test_schemes(self):
+
+        reports = self.miner.relaxed_report()
+        self.assertEqual(list(reports), list(SCHEMES))
+        overall = {scheme: reports[scheme]["overall"] for scheme in SCHEMES}
+        self.assertEqual(self.outcomes(overall["strict"]), (1, 2, 0, 1, 1))
+        self.assertEqual(self.outcomes(overall["exact"]), (2, 1, 0, 1, 1))
+        self.assertEqual(self.outcomes(overall["partial"]), (2, 0, 1, 1, 1))
+        self.assertEqual(self.outcomes(overall["type"]), (2, 1, 0, 1, 1))
+        self.assertEqual(overall["partial"]["precision"], 2.5 / 4)
+        self.assertEqual(overall["partial"]["recall"], 2.5 / 4)
+        self.assertEqual(reports["type"]["LOC"]["incorrect"], 1)
+        self.assertEqual(reports["type"]["ORG"]["correct"], 1)
+
+    def test_known_split(self):
+
+        reports = self.miner.relaxed_report()
+        known = self.miner.relaxed_report("known")
+        unknown = self.miner.relaxed_report("unknown")
+        self.assertEqual(self.outcomes(known["exact"]["overall"]), (2, 0, 0, 0, 0))
+        for scheme in SCHEMES:
+            for type_ in self.miner.types:
+                for i, n in enumerate(self.outcomes(reports[scheme][type_])):
+                    self.assertEqual(
+                        n,
+                        self.outcomes(known[scheme][type_])[i]
+                        + self.outcomes(unknown[scheme][type_])[i],
+                    )
+
+    def test_strict_is_default(self):
+
+        for seed in range(5):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            miner = Miner(answers, predicts, sentences, dict(knowns))
+            for mode, default in [
+                ("default", miner.default_report()),
+                ("known", miner.known_only_report()),
+                ("unknown", miner.unknown_only_report()),
+            ]:
+                strict = miner.relaxed_report(mode)["strict"]
+                for type_ in miner.types:
+                    for key in ("precision", "recall", "f1_score", "num"):
+                        self.assertAlmostEqual(strict[type_][key], default[type_][key])
+
+    def test_relaxed_scores_are_not_lower(self):
+
+        answers, predicts, sentences, knowns = random_corpus(0, n_sentences=200)
+        miner = Miner(answers, predicts, sentences, dict(knowns))
+        reports = miner.relaxed_report()
+        for scheme in ("exact", "partial", "type"):
+            for key in ("precision", "recall"):
+                self.assertGreaterEqual(
+                    reports[scheme]["overall"][key], reports["strict"]["overall"][key]
+                )
+
+    def test_merge(self):
+
+        answers, predicts, sentences, knowns = random_corpus(1)
+        whole = Miner(answers, predicts, sentences, dict(knowns))._relaxed_counts()
+        merged = RelaxedCounts()
+        for start, stop in [(0, 20), (20, 50)]:
+            miner = Miner(
+                answers[start:stop],
+                predicts[start:stop],
+                sentences[start:stop],
+                dict(knowns),
+            )
+            merged += relaxed_counts(*miner._span_tables())
+        self.assertEqual(merged, whole)
+
+    def test_print(self):
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.miner.relaxed_report(print_=True)
+        for scheme in SCHEMES:
+            self.assertIn(scheme, out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from benchmarks.corpus import make_corpus
+from miner import Miner
+from miner.encoding import EncodedCorpus
+from miner.scheme import SCHEMES, invalid_transitions, repair, validate
+
+from .test_spans import random_corpus
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+SEQS = [
+    ["B-PSN", "I-PSN", "O", "I-LOC", "B-ORG", "I-PSN"],
+    ["E-PSN", "S-LOC", "B-ORG", "I-ORG"],
+    [],
+    ["B-PSN"],
+    ["I-PSN"],
+]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestScheme(unittest.TestCase):
+    def test_invalid_transitions(self):
+
+        expects = {
+            "IOB2": [0, 0, 0, 1, 0, 1, 1, 1, 0, 0, 0, 1],
+            "BIOES": [0, 1, 0, 1, 1, 1, 1, 0, 0, 1, 1, 1],
+            "BIOUL": [0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1],
+        }
+        for scheme, expect in expects.items():
+            self.assertEqual(
+                invalid_transitions(SEQS, scheme).astype(int).tolist(), expect
+            )
+        with self.assertRaises(ValueError):
+            invalid_transitions(SEQS, "IOB1")
+
+    def test_validate(self):
+
+        self.assertEqual(
+            validate(SEQS, "IOB2"), {"LOC": 2, "ORG": 0, "PSN": 3, "overall": 5}
+        )
+        self.assertEqual(
+            validate(EncodedCorpus.from_labels(SEQS), "BIOES"),
+            {"LOC": 1, "ORG": 2, "PSN": 5, "overall": 8},
+        )
+        self.assertEqual(
+            validate([["B-PSN", "E-PSN", "O", "S-LOC"]], "BIOES"),
+            {"LOC": 0, "PSN": 0, "overall": 0},
+        )
+
+    def test_trailing_empty_sentences(self):
+
+        for n in (1, 3):
+            seqs = [["B-PSN"], ["I-PSN", "O"]] + [[]] * n
+            self.assertEqual(
+                invalid_transitions(seqs, "BIOES").astype(int).tolist(), [1, 1, 0]
+            )
+            self.assertEqual(validate(seqs, "IOB2"), {"PSN": 1, "overall": 1})
+            self.assertEqual(
+                repair(seqs, "IOB2"), [["B-PSN"], ["B-PSN", "O"]] + [[]] * n
+            )
+
+    def test_repair(self):
+
+        self.assertEqual(
+            repair(SEQS, "BIOES"),
+            [
+                ["B-PSN", "E-PSN", "O", "S-LOC", "S-ORG", "S-PSN"],
+                ["S-PSN", "S-LOC", "B-ORG", "E-ORG"],
+                [],
+                ["S-PSN"],
+                ["S-PSN"],
+            ],
+        )
+        self.assertEqual(
+            repair(SEQS, "IOB2", policy="outside"),
+            [
+                ["B-PSN", "I-PSN", "O", "O", "B-ORG", "O"],
+                ["O", "O", "B-ORG", "I-ORG"],
+                [],
+                ["B-PSN"],
+                ["O"],
+            ],
+        )
+        with self.assertRaises(ValueError):
+            repair(SEQS, policy="drop")
+
+    def test_repair_random(self):
+
+        _, predicts, _, _ = random_corpus(0)
+        for scheme in SCHEMES:
+            corpus = EncodedCorpus.from_labels(predicts)
+            repaired = repair(corpus, scheme)
+            self.assertIs(repaired.vocab, corpus.vocab)
+            self.assertEqual(validate(repaired, scheme)["overall"], 0)
+            outside = repair(predicts, scheme, policy="outside")
+            self.assertEqual(validate(outside, scheme)["overall"], 0)
+
+    def test_repair_keeps_evaluation(self):
+
+        answers, predicts, sentences, knowns = make_corpus(
+            200, scheme="IOB2", error_rate=0.5, seed=0
+        )
+        # break every third named entity
+        broken = [list(labels) for labels in predicts]
+        n = 0
+        for labels in broken:
+            for i, label in enumerate(labels):
+                if label.startswith("B-"):
+                    n += 1
+                    if n % 3 == 0:
+                        labels[i] = "I-" + label[2:]
+        self.assertGreater(validate(broken)["overall"], 0)
+        expect = Miner(answers, broken, sentences, dict(knowns))
+        repaired = repair(broken)
+        self.assertEqual(validate(repaired)["overall"], 0)
+        miner = Miner(answers, repaired, sentences, dict(knowns))
+        self.assertEqual(miner.default_report(), expect.default_report())
+        self.assertEqual(miner.unknown_only_report(), expect.unknown_only_report())
+
+        # well-formed labels are not changed
+        for scheme in SCHEMES:
+            _, predicts, _, _ = make_corpus(200, scheme=scheme, seed=0)
+            self.assertEqual(repair(predicts, scheme), predicts)
+
+
+if __name__ == "__main__":
+    unittest.main()
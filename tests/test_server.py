@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+from miner import Miner
+from miner.compare import MultiMiner
+from miner.server import (
+    MAX_REQUEST_BYTES,
+    EvaluationClient,
+    EvaluationServer,
+    load_gold,
+    main,
+)
+
+from .test_spans import random_corpus
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.knowns = dict(knowns)
+        self.golds = {"dev": MultiMiner(self.answers, self.sentences, self.knowns)}
+        self.expect = Miner(self.answers, self.predicts, self.sentences, self.knowns)
+
+    async def start(self, **kwargs):
+        server = EvaluationServer(self.golds, **kwargs)
+        self.addAsyncCleanup(server.close)
+        return await server.start()
+
+    async def call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def client_reports(self, address, predicts):
+        with EvaluationClient(*address, timeout=10) as client:
+            return client.reports("dev", predicts)
+
+    async def test_client(self):
+
+        server = await self.start()
+        with EvaluationClient(*server.address, timeout=10) as client:
+            report = await self.call(client.report, "dev", self.predicts)
+            self.assertEqual(report, self.expect.default_report())
+            reports = await self.call(client.reports, "dev", self.predicts)
+            self.assertEqual(reports["known"], self.expect.known_only_report())
+            self.assertEqual(reports["unknown"], self.expect.unknown_only_report())
+            golds = await self.call(client.golds)
+            self.assertEqual(golds["dev"]["sentences"], len(self.sentences))
+
+            # errors are returned and the connection is kept
+            for args in [("test", self.predicts), ("dev", self.predicts[1:])]:
+                with self.assertRaises(ValueError):
+                    await self.call(client.report, *args)
+            with self.assertRaises(ValueError):
+                await self.call(client.report, "dev", self.predicts, "all")
+            report = await self.call(client.report, "dev", self.predicts)
+            self.assertEqual(report, self.expect.default_report())
+
+    async def test_batching(self):
+
+        systems = [self.predicts, self.answers] * 4
+        server = await self.start(batch_size=8, batch_delay=0.05)
+        results = await asyncio.gather(
+            *[self.call(self.client_reports, server.address, s) for s in systems]
+        )
+        perfect = Miner(self.answers, self.answers, self.sentences, self.knowns)
+        for predicts, reports in zip(systems, results):
+            expect = self.expect if predicts is self.predicts else perfect
+            self.assertEqual(reports["default"], expect.default_report())
+        results = await asyncio.gather(
+            *[server.score("dev", s, ["unknown"]) for s in systems]
+        )
+        self.assertEqual(results[0]["unknown"], self.expect.unknown_only_report())
+
+    async def test_processes_and_unix_socket(self):
+
+        with tempfile.TemporaryDirectory() as tmp:
+            server = EvaluationServer(self.golds, n_jobs=2)
+            await server.start(path=os.path.join(tmp, "miner.sock"))
+            try:
+                with EvaluationClient(path=server.address, timeout=30) as client:
+                    report = await self.call(client.report, "dev", self.predicts)
+            finally:
+                await server.close()
+        self.assertEqual(report, self.expect.default_report())
+
+    async def test_http(self):
+
+        server = await self.start()
+        url = "http://{}:{}".format(*server.address)
+        request = urllib.request.Request(
+            url + "/score",
+            json.dumps({"gold": "dev", "predicts": self.predicts}).encode(),
+            {"Content-Type": "application/json"},
+        )
+        response = await self.call(urllib.request.urlopen, request)
+        reports = json.loads(response.read())["reports"]
+        self.assertEqual(reports["default"], self.expect.default_report())
+        response = await self.call(urllib.request.urlopen, url + "/golds")
+        self.assertIn("dev", json.loads(response.read())["golds"])
+
+        request = urllib.request.Request(url + "/score", b"{}")
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            await self.call(urllib.request.urlopen, request)
+        self.assertEqual(cm.exception.code, 400)
+
+    async def test_bad_requests(self):
+
+        server = await self.start()
+        reader, writer = await asyncio.open_connection(*server.address)
+        for modes in ["known", [0]]:
+            request = {"id": 1, "gold": "dev", "predicts": self.predicts}
+            request["modes"] = modes
+            writer.write(json.dumps(request).encode() + b"\n")
+            response = json.loads(await reader.readline())
+            self.assertEqual(response["error"], "modes must be a list of strings")
+        writer.close()
+
+        for length, status, error in [
+            ("abc", "400 Bad Request", "invalid Content-Length"),
+            ("-1", "400 Bad Request", "invalid Content-Length"),
+            # the client stops sending before the end of the body
+            ("100", "400 Bad Request", "incomplete request body"),
+            (str(MAX_REQUEST_BYTES + 1), "413 Payload Too Large", "too large"),
+        ]:
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(
+                "POST /score HTTP/1.1\r\nContent-Length: {}\r\n\r\n{{}}".format(
+                    length
+                ).encode()
+            )
+            writer.write_eof()
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b"\r\n\r\n")
+            self.assertTrue(head.startswith(b"HTTP/1.1 " + status.encode()))
+            self.assertIn(error, json.loads(body)["error"])
+
+    async def test_load_gold(self):
+
+        # empty sentences are not written in CoNLL-style files
+        rows = [
+            row for row in zip(self.answers, self.predicts, self.sentences) if row[2]
+        ]
+        answers, predicts, sentences = map(list, zip(*rows))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dev.conll")
+            with open(path, "w", encoding="utf-8") as f:
+                for morphs, labels in zip(sentences, answers):
+                    for morph, label in zip(morphs, labels):
+                        f.write("{} {}\n".format(morph, label))
+                    f.write("\n")
+            gold = load_gold(path, self.knowns)
+        self.assertEqual(gold.sentences, sentences)
+        gold.add("a", predicts)
+        expect = Miner(answers, predicts, sentences, self.knowns)
+        self.assertEqual(gold.report("a"), expect.default_report())
+        with self.assertRaises(SystemExit):
+            main([])
+
+
+if __name__ == "__main__":
+    unittest.main()
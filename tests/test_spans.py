@@ -0,0 +1,194 @@
+import random
+import unittest
+from unittest import mock
+
+from miner import Miner
+from miner.compare import MultiMiner
+from miner.known import KnownWordIndex
+from miner.scoring import Counts, build_report, count_spans
+from miner.spans import SpanTable, decode_spans
+from miner.stream import StreamingMiner
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def random_corpus(seed, n_sentences=50, types=("PSN", "LOC", "ORG")):
+    """
+    random corpus including ill-formed label sequences
+    """
+
+    rng = random.Random(seed)
+    tops = ["B", "I", "E", "S", "L", "U", "O", "O", "O"]
+    words = ["花子", "東京", "駅", "山田", "太郎", "ボブ", "は", "に"]
+
+    def labels(n):
+        seq = []
+        for _ in range(n):
+            top = rng.choice(tops)
+            seq.append("O" if top == "O" else top + "-" + rng.choice(types))
+        return seq
+
+    lengths = [rng.randint(0, 12) for _ in range(n_sentences)]
+    answers = [labels(n) for n in lengths]
+    predicts = [labels(n) for n in lengths]
+    sentences = [[rng.choice(words) for _ in range(n)] for n in lengths]
+    knowns = {
+        t: ["花子", "東京", "山田太郎", "東京駅"][i:] for i, t in enumerate(types)
+    }
+    return answers, predicts, sentences, knowns
+
+
+def legacy_report(miner, check_known, check_unknown):
+    """
+    report computed with a scan of the corpus for every type
+    """
+
+    miner.check_known = check_known
+    miner.check_unknown = check_unknown
+    report = {}
+    for type_ in miner.types:
+        ans_entities = set(miner._entity_indexes(miner.answers, type_))
+        pred_entities = set(miner._entity_indexes(miner.predicts, type_))
+        correct_num = len(ans_entities & pred_entities)
+        p = correct_num / len(pred_entities) if pred_entities else 0.0
+        r = correct_num / len(ans_entities) if ans_entities else 0.0
+        f1 = 2 * p * r / (p + r) if p + r > 0 else 0
+        report[type_] = {"precision": p, "recall": r, "f1_score": f1}
+        report[type_]["num"] = len(ans_entities)
+    miner.check_known = miner.check_unknown = True
+    return report
+
+
+class TestSpans(unittest.TestCase):
+    def setUp(self):
+        self.answers = [
+            "B-PSN O O B-LOC O O O O".split(" "),
+            "B-PSN I-PSN O O B-LOC I-LOC O O O O".split(" "),
+            "S-PSN O O S-PSN O O B-LOC I-LOC E-LOC O O O O".split(" "),
+        ]
+        self.sentences = [
+            "花子 さん は 東京 に 行き まし た".split(" "),
+            "山田 太郎 君 は 東京 駅 に 向かい まし た".split(" "),
+            "花子 さん と ボブ くん は 東京 スカイ ツリー に 行き まし た".split(" "),
+        ]
+        self.knowns = KnownWordIndex({"PSN": ["花子"], "LOC": ["東京"]})
+
+    def test_decode_spans(self):
+
+        table = decode_spans(self.answers, self.sentences, self.knowns)
+        self.assertEqual(table.types, ["PSN", "LOC"])
+        self.assertEqual(len(table), 7)
+        self.assertEqual(
+            list(table.rows()),
+            [
+                (0, 0, 0, 0, 1, 1),
+                (0, 3, 3, 1, 1, 1),
+                (1, 0, 1, 0, 0, 0),
+                (1, 4, 5, 1, 0, 0),
+                (2, 0, 0, 0, 1, 1),
+                (2, 3, 3, 0, 0, 0),
+                (2, 6, 8, 1, 0, 0),
+            ],
+        )
+        # without known words, every named entity is unknown
+        table = decode_spans(self.answers, self.sentences)
+        self.assertFalse(any(table.known) or any(table.known_overall))
+
+    def test_count_spans(self):
+
+        type_ids = {}
+        ans_table = decode_spans(self.answers, self.sentences, self.knowns, type_ids)
+        pred_table = decode_spans(self.answers, self.sentences, self.knowns, type_ids)
+        counts = count_spans(ans_table, pred_table)
+        self.assertEqual(counts.get("PSN"), (4, 4, 4))
+        self.assertEqual(counts.get("PSN", "known"), (2, 2, 2))
+        self.assertEqual(counts.get("overall", "unknown"), (4, 4, 4))
+        self.assertEqual(counts.get("ORG"), (0, 0, 0))
+
+        merged = Counts().merge(counts).merge(counts)
+        self.assertEqual(merged.get("LOC"), (6, 6, 6))
+        self.assertNotEqual(merged, counts)
+
+    def test_build_report(self):
+
+        counts = Counts()
+        counts.add("PSN", 0, True)
+        counts.add("PSN", 1, True, 2)
+        counts.add("PSN", 2, False)
+        report = build_report(counts, ["PSN", "LOC"])
+        self.assertEqual(
+            report["PSN"],
+            {"precision": 0.5, "recall": 1.0, "f1_score": 2 / 3, "num": 1},
+        )
+        self.assertEqual(
+            report["LOC"], {"precision": 0.0, "recall": 0.0, "f1_score": 0, "num": 0}
+        )
+
+    def test_equivalent_to_scan_per_type(self):
+
+        for seed in range(20):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            m = Miner(answers, predicts, sentences, knowns)
+            self.assertEqual(m.default_report(), legacy_report(m, True, True))
+            self.assertEqual(m.known_only_report(), legacy_report(m, True, False))
+            self.assertEqual(m.unknown_only_report(), legacy_report(m, False, True))
+            for mode, flags in [
+                ("default", (True, True)),
+                ("known", (True, False)),
+                ("unknown", (False, True)),
+            ]:
+                self.assertEqual(
+                    m.segmentation_score(mode, False),
+                    legacy_report(m, *flags)["overall"],
+                )
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_backend(self):
+
+        for seed in range(20):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            m = Miner(answers, predicts, sentences, dict(knowns))
+            counts = count_spans(*m._span_tables(), backend="numpy")
+            self.assertEqual(counts, m._counts())
+            n = Miner(answers, predicts, sentences, dict(knowns), scorer="numpy")
+            self.assertEqual(n.default_report(), m.default_report())
+            self.assertEqual(n.unknown_only_report(), m.unknown_only_report())
+            self.assertEqual(
+                n.segmentation_score("known", False),
+                m.segmentation_score("known", False),
+            )
+
+        # keys which do not fit in int64 fall back to the python backend
+        type_ids = {}
+        ans_table, pred_table = SpanTable(type_ids), SpanTable(type_ids)
+        ans_table.append(2**40, 2**20, 2**20, "PSN")
+        pred_table.append(2**40, 2**20, 2**20, "PSN")
+        self.assertEqual(
+            count_spans(ans_table, pred_table, "numpy").get("PSN"), (1, 1, 1)
+        )
+        # empty tables
+        self.assertEqual(
+            count_spans(SpanTable(), SpanTable(), "numpy").get("overall"), (0, 0, 0)
+        )
+
+    def test_unknown_backend(self):
+
+        with self.assertRaises(ValueError):
+            count_spans(SpanTable(), SpanTable(), "cuda")
+        with self.assertRaises(ValueError):
+            Miner(self.answers, self.answers, self.sentences, scorer="cuda")
+
+    def test_numpy_scorer_without_numpy(self):
+
+        # the missing dependency is reported where the option is passed
+        with mock.patch("miner.scoring.np", None):
+            with self.assertRaises(ImportError):
+                Miner(self.answers, self.answers, self.sentences, scorer="numpy")
+            with self.assertRaises(ImportError):
+                StreamingMiner(scorer="numpy")
+            with self.assertRaises(ImportError):
+                MultiMiner(self.answers, self.sentences, scorer="numpy")
+            Miner(self.answers, self.answers, self.sentences).default_report()
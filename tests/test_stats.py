@@ -0,0 +1,121 @@
+import random
+import unittest
+from collections import Counter
+
+from miner import Miner
+from miner.stats import CountMinSketch, SurfaceCounter, SurfaceStats
+from miner.stream import StreamingMiner
+
+from .test_spans import random_corpus
+
+
+class TestSurfaceCounter(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        # zipf-like stream of 2000 distinct strings
+        self.items = ["w{}".format(int(rng.paretovariate(1.0))) for _ in range(20000)]
+        self.truth = Counter(self.items)
+
+    def test_exact(self):
+
+        counter = SurfaceCounter(budget=len(self.truth))
+        for item in self.items:
+            counter.add(item)
+        self.assertTrue(counter.exact)
+        self.assertEqual(counter.most_common(5), self.truth.most_common(5))
+        self.assertEqual(counter.count("w1"), self.truth["w1"])
+        self.assertEqual(counter.count("none"), 0)
+
+    def test_sketch(self):
+
+        counter = SurfaceCounter(budget=50, k=20, width=512)
+        for item in self.items:
+            counter.add(item)
+        self.assertFalse(counter.exact)
+        self.assertEqual(counter.total, len(self.items))
+        # heavy hitters are kept, and counts never fall below true counts
+        top = [item for item, _ in counter.most_common(5)]
+        self.assertEqual(top, [item for item, _ in self.truth.most_common(5)])
+        for item, n in self.truth.items():
+            self.assertGreaterEqual(counter.count(item), n)
+        self.assertEqual(counter.count("w1"), self.truth["w1"])
+
+        sketch = CountMinSketch(width=64, depth=3)
+        for item in self.items:
+            sketch.add(item)
+        self.assertTrue(all(sketch.estimate(i) >= n for i, n in self.truth.items()))
+
+    def test_merge(self):
+
+        half = len(self.items) // 2
+        for budget in (10000, 50):
+            first = SurfaceCounter(budget=budget, k=20)
+            second = SurfaceCounter(budget=budget, k=20)
+            for item in self.items[:half]:
+                first.add(item)
+            for item in self.items[half:]:
+                second.add(item)
+            first.merge(second)
+            self.assertEqual(first.total, len(self.items))
+            self.assertEqual(first.most_common(3)[0][0], "w1")
+            self.assertGreaterEqual(first.count("w2"), self.truth["w2"])
+
+
+class TestSurfaceStats(unittest.TestCase):
+    def setUp(self):
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.knowns = dict(knowns)
+        self.miner = Miner(self.answers, self.predicts, self.sentences, self.knowns)
+
+    def test_error_counts(self):
+
+        errors = self.miner.surface_stats().error_counts()
+        counts = self.miner._counts()
+        self.assertEqual(list(errors)[-1], "overall")
+        for type_, row in errors.items():
+            for known in ("known", "unknown"):
+                tp, pred, ans = counts.get(type_, known)
+                self.assertEqual(
+                    row[known], {"found": tp, "missed": ans - tp, "spurious": pred - tp}
+                )
+
+    def test_top(self):
+
+        stats = self.miner.surface_stats()
+        index = self.miner.error_index()
+        for type_ in ("PSN", "LOC"):
+            for known in (True, False, None):
+                expect = Counter(
+                    index.surface(record)
+                    for record in index.query(type_, "missed", known, "answer")
+                )
+                expect.update(
+                    index.surface(record)
+                    for category in ("boundary", "type")
+                    for record in index.query(type_, category, known, "answer")
+                )
+                top = stats.top(type_, "missed", known, n=100)
+                self.assertEqual(dict(top), dict(expect))
+                if top:
+                    surface, n = top[0]
+                    self.assertEqual(stats.count(surface, type_, "missed", known), n)
+        with self.assertRaises(ValueError):
+            stats.top("PSN", "wrong")
+
+    def test_streaming(self):
+
+        expect = self.miner.surface_stats()
+        stream = StreamingMiner(self.knowns, stats=SurfaceStats())
+        for i in range(0, len(self.answers), 7):
+            stop = i + 7
+            stream.update(
+                self.answers[i:stop], self.predicts[i:stop], self.sentences[i:stop]
+            )
+        self.assertEqual(stream.stats.error_counts(), expect.error_counts())
+        self.assertEqual(stream.stats.top("PSN", "found"), expect.top("PSN", "found"))
+        stream.reset()
+        self.assertEqual(stream.stats.error_counts(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from miner import Miner
+from miner.stream import StreamingMiner
+
+from .test_spans import random_corpus
+
+
+class TestStreamingMiner(unittest.TestCase):
+    def test_matches_miner(self):
+
+        for seed in range(10):
+            answers, predicts, sentences, knowns = random_corpus(seed)
+            m = Miner(answers, predicts, sentences, dict(knowns))
+            stream = StreamingMiner(dict(knowns))
+            for i in range(0, len(answers), 7):
+                stream.update(
+                    answers[i : i + 7], predicts[i : i + 7], sentences[i : i + 7]
+                )
+            self.assertEqual(stream.num_sentences, len(sentences))
+            self.assertEqual(stream.types, m.types)
+            self.assertEqual(stream.default_report(), m.default_report())
+            self.assertEqual(stream.known_only_report(), m.known_only_report())
+            self.assertEqual(stream.unknown_only_report(), m.unknown_only_report())
+            for mode in ["default", "known", "unknown"]:
+                self.assertEqual(
+                    stream.segmentation_score(mode, False),
+                    m.segmentation_score(mode, False),
+                )
+
+    def test_merge_and_reset(self):
+
+        answers, predicts, sentences, knowns = random_corpus(0)
+        whole = StreamingMiner(knowns).update(answers, predicts, sentences)
+        first = StreamingMiner(knowns).update(
+            answers[:20], predicts[:20], sentences[:20]
+        )
+        second = StreamingMiner(knowns).update(
+            answers[20:], predicts[20:], sentences[20:]
+        )
+        self.assertEqual(first.merge(second).compute(), whole.compute())
+
+        whole.reset()
+        self.assertEqual(whole.types, ["overall"])
+        self.assertEqual(whole.compute()["overall"]["num"], 0)
@@ -1,6 +1,16 @@
+import array
 import unittest
 
-from miner.utils import is_begin_of_label, is_end_of_label
+from miner.backend import (
+    PREFIXES,
+    encoded_entity_spans,
+    entity_indexes,
+    entity_spans,
+    is_begin_of_label,
+    is_end_of_label,
+)
+
+from .test_spans import random_corpus
 
 
 class TestUtils(unittest.TestCase):
@@ -36,3 +46,59 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(is_begin_of_label(labels[10], "a", "a"))
         self.assertTrue(is_begin_of_label(labels[11], "a", "a"))
         self.assertTrue(is_begin_of_label("I", "a", "b"))
+
+    def test_entity_spans(self):
+
+        labels = "B-PSN I-PSN O S-LOC B-LOC E-LOC I-ORG".split(" ")
+        self.assertEqual(
+            entity_spans(labels),
+            [("PSN", 0, 1), ("LOC", 3, 3), ("LOC", 4, 5), ("ORG", 6, 6)],
+        )
+        self.assertEqual(entity_spans([]), [])
+        self.assertEqual(entity_spans(["O", "O"]), [])
+
+    def test_entity_indexes_without_filtering(self):
+
+        labels = "B-PSN I-PSN O S-LOC O".split(" ") + ["O"]
+        words = "山田 太郎 は 東京 に".split(" ") + [""]
+        known = {"PSN": [], "LOC": ["東京"], "overall": ["東京"]}
+        pairs = list(zip(labels + ["O"], words + [""]))
+        self.assertEqual(
+            entity_indexes(words, pairs, "overall", True, True, known),
+            [("PSN", 0, 1), ("LOC", 3, 3)],
+        )
+        self.assertEqual(
+            entity_indexes(words, pairs, "overall", False, True, known),
+            [("PSN", 0, 1)],
+        )
+
+    def test_encoded_entity_spans(self):
+
+        for seed in range(20):
+            answers, _, _, _ = random_corpus(seed)
+            vocab = sorted({label for seq in answers for label in seq} | {"O"})
+            prefix_of = array.array(
+                "B",
+                [
+                    PREFIXES.index(label[0]) if label[0] in PREFIXES else 7
+                    for label in vocab
+                ],
+            )
+            type_names = sorted({label.split("-")[-1] for label in vocab})
+            type_of = array.array(
+                "H", [type_names.index(label.split("-")[-1]) for label in vocab]
+            )
+            tags = array.array(
+                "H", [vocab.index(label) for seq in answers for label in seq]
+            )
+            offsets = array.array("l", [0])
+            for seq in answers:
+                offsets.append(offsets[-1] + len(seq))
+
+            columns = encoded_entity_spans(tags, prefix_of, type_of, offsets)
+            expect = [
+                (sent, begin, end, type_names.index(type_))
+                for sent, seq in enumerate(answers)
+                for type_, begin, end in entity_spans(seq)
+            ]
+            self.assertEqual(list(zip(*columns)), expect)
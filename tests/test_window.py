@@ -0,0 +1,78 @@
+import unittest
+
+from miner import Miner
+from miner.window import WindowedMiner
+
+from .test_spans import random_corpus
+
+
+class TestWindowedMiner(unittest.TestCase):
+    def setUp(self):
+        self.answers, self.predicts, self.sentences, knowns = random_corpus(0)
+        self.knowns = dict(knowns)
+
+    def assert_window(self, window: WindowedMiner, start: int, stop: int):
+        m = Miner(
+            self.answers[start:stop],
+            self.predicts[start:stop],
+            self.sentences[start:stop],
+            dict(self.knowns),
+        )
+        self.assertEqual(window.num_sentences, stop - start)
+        self.assertEqual(window.types, m.types)
+        self.assertEqual(window.default_report(), m.default_report())
+        self.assertEqual(window.known_only_report(), m.known_only_report())
+        self.assertEqual(window.unknown_only_report(), m.unknown_only_report())
+
+    def test_size(self):
+
+        window = WindowedMiner(self.knowns, size=10)
+        for i in range(0, len(self.answers), 3):
+            stop = min(i + 3, len(self.answers))
+            window.update(
+                self.answers[i:stop], self.predicts[i:stop], self.sentences[i:stop]
+            )
+            self.assert_window(window, max(stop - 10, 0), stop)
+
+    def test_seconds(self):
+
+        now = [0.0]
+        window = WindowedMiner(self.knowns, seconds=5, clock=lambda: now[0])
+        for i in range(len(self.answers)):
+            now[0] = float(i)
+            window.update(
+                self.answers[i : i + 1],
+                self.predicts[i : i + 1],
+                self.sentences[i : i + 1],
+            )
+            self.assert_window(window, max(i - 5, 0), i + 1)
+        now[0] += 100
+        self.assertEqual(window.default_report()["overall"]["num"], 0)
+        self.assertEqual(window.types, ["overall"])
+        self.assertTrue(
+            all(n == 0 for row in window.counts.table.values() for n in row)
+        )
+
+    def test_timestamps(self):
+
+        window = WindowedMiner(self.knowns, seconds=10, clock=lambda: 30.0)
+        n = len(self.answers)
+        window.update(
+            self.answers, self.predicts, self.sentences, [i * 0.6 for i in range(n)]
+        )
+        # sentences after 20 seconds are kept
+        start = next(i for i in range(n) if i * 0.6 >= 20)
+        self.assert_window(window, start, n)
+        with self.assertRaises(ValueError):
+            WindowedMiner(size=0)
+        # sentences are not dropped silently
+        for timestamps in ([0.0], [0.0] * (n + 1)):
+            with self.assertRaises(ValueError):
+                window.update(self.answers, self.predicts, self.sentences, timestamps)
+        with self.assertRaises(ValueError):
+            window.update(self.answers, self.predicts[1:], self.sentences)
+        self.assert_window(window, start, n)
+
+
+if __name__ == "__main__":
+    unittest.main()